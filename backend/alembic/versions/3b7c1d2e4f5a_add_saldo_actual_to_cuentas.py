@@ -0,0 +1,38 @@
+"""Add saldo_actual to cuentas
+
+Revision ID: 3b7c1d2e4f5a
+Revises: 8f936f88e11b
+Create Date: 2026-10-18 09:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7c1d2e4f5a'
+down_revision: Union[str, Sequence[str], None] = '8f936f88e11b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('cuentas', sa.Column('saldo_actual', sa.Float(), nullable=False, server_default='0'))
+
+    # Rellenamos el saldo de las cuentas existentes a partir de su historial.
+    # Es la misma fórmula que antes se calculaba en cada lectura.
+    op.execute(
+        """
+        UPDATE cuentas SET saldo_actual = saldo_inicial
+            + COALESCE((SELECT SUM(t.valor) FROM transacciones t
+                        WHERE t.cuenta_destino_id = cuentas.id AND t.estado = 'Confirmado'), 0)
+            - COALESCE((SELECT SUM(t.valor) FROM transacciones t
+                        WHERE t.cuenta_origen_id = cuentas.id AND t.estado = 'Confirmado'), 0)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('cuentas', 'saldo_actual')
@@ -0,0 +1,64 @@
+"""Create agregados_mensuales rollup table
+
+Revision ID: 5e2a9c7b1d04
+Revises: 3b7c1d2e4f5a
+Create Date: 2026-10-18 10:03:27.114920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2a9c7b1d04'
+down_revision: Union[str, Sequence[str], None] = '3b7c1d2e4f5a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    agregados = op.create_table('agregados_mensuales',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('anio', sa.Integer(), nullable=False),
+    sa.Column('mes', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(), nullable=False),
+    sa.Column('categoria_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('cantidad', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['usuario_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ux_agregados_mensuales_clave', 'agregados_mensuales',
+                    ['usuario_id', 'anio', 'mes', 'tipo', 'categoria_id'], unique=True)
+
+    # Rellenamos la tabla con el historial existente (solo transacciones confirmadas).
+    transacciones = sa.table('transacciones',
+        sa.column('usuario_id', sa.Integer()),
+        sa.column('fecha', sa.Date()),
+        sa.column('tipo', sa.String()),
+        sa.column('categoria_id', sa.Integer()),
+        sa.column('valor', sa.Float()),
+        sa.column('estado', sa.String()),
+    )
+    anio = sa.extract('year', transacciones.c.fecha)
+    mes = sa.extract('month', transacciones.c.fecha)
+    categoria = sa.func.coalesce(transacciones.c.categoria_id, 0)
+    op.execute(
+        agregados.insert().from_select(
+            ['usuario_id', 'anio', 'mes', 'tipo', 'categoria_id', 'total', 'cantidad'],
+            sa.select(
+                transacciones.c.usuario_id, anio, mes, transacciones.c.tipo, categoria,
+                sa.func.sum(transacciones.c.valor), sa.func.count(),
+            )
+            .where(transacciones.c.estado == 'Confirmado')
+            .group_by(transacciones.c.usuario_id, anio, mes, transacciones.c.tipo, categoria)
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ux_agregados_mensuales_clave', table_name='agregados_mensuales')
+    op.drop_table('agregados_mensuales')
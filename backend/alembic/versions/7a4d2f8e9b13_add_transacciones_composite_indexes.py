@@ -0,0 +1,35 @@
+"""Add composite indexes for transacciones hot paths
+
+Revision ID: 7a4d2f8e9b13
+Revises: 5e2a9c7b1d04
+Create Date: 2026-10-18 11:20:54.302871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4d2f8e9b13'
+down_revision: Union[str, Sequence[str], None] = '5e2a9c7b1d04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Historial por período y paginación: WHERE usuario_id = ? AND fecha ... ORDER BY fecha, id
+    op.create_index('ix_transacciones_usuario_fecha_id', 'transacciones', ['usuario_id', 'fecha', 'id'], unique=False)
+    # Saldo inicial del período, últimas confirmadas y borrado de planeadas por mes
+    op.create_index('ix_transacciones_usuario_estado_fecha', 'transacciones', ['usuario_id', 'estado', 'fecha', 'id'], unique=False)
+    # Saldos por cuenta (solo transacciones confirmadas)
+    op.create_index('ix_transacciones_origen_estado', 'transacciones', ['cuenta_origen_id', 'estado'], unique=False)
+    op.create_index('ix_transacciones_destino_estado', 'transacciones', ['cuenta_destino_id', 'estado'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transacciones_destino_estado', table_name='transacciones')
+    op.drop_index('ix_transacciones_origen_estado', table_name='transacciones')
+    op.drop_index('ix_transacciones_usuario_estado_fecha', table_name='transacciones')
+    op.drop_index('ix_transacciones_usuario_fecha_id', table_name='transacciones')
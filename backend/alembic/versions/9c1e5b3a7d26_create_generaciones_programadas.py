@@ -0,0 +1,33 @@
+"""Create generaciones_programadas scheduler checkpoint table
+
+Revision ID: 9c1e5b3a7d26
+Revises: 7a4d2f8e9b13
+Create Date: 2026-10-18 13:41:09.627530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1e5b3a7d26'
+down_revision: Union[str, Sequence[str], None] = '7a4d2f8e9b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('generaciones_programadas',
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('firma_reglas', sa.String(), nullable=False),
+    sa.Column('generado_hasta', sa.Date(), nullable=False),
+    sa.Column('ultima_ejecucion', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['usuario_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('usuario_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('generaciones_programadas')
@@ -0,0 +1,40 @@
+"""Create correos_salientes email outbox table
+
+Revision ID: b4f8e2a6c310
+Revises: 9c1e5b3a7d26
+Create Date: 2026-10-18 15:02:44.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4f8e2a6c310'
+down_revision: Union[str, Sequence[str], None] = '9c1e5b3a7d26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('correos_salientes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('destinatario', sa.String(), nullable=False),
+    sa.Column('asunto', sa.String(), nullable=False),
+    sa.Column('html', sa.Text(), nullable=False),
+    sa.Column('estado', sa.String(), nullable=False),
+    sa.Column('intentos', sa.Integer(), nullable=False),
+    sa.Column('proximo_intento', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('ultimo_error', sa.Text(), nullable=True),
+    sa.Column('creado_en', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('enviado_en', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_correos_salientes_estado_proximo', 'correos_salientes', ['estado', 'proximo_intento'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_correos_salientes_estado_proximo', table_name='correos_salientes')
+    op.drop_table('correos_salientes')
@@ -5,8 +5,9 @@ from app.schemas.categoria import CategoriaCreate, CategoriaResponse, CategoriaU
 from app.models.usuario import User
 from app.auth import current_active_user
 import app.crud.crud_categoria as crud
+from app.services.metricas import RutaMedida
 
-router = APIRouter(prefix="/categorias", tags=["categorias"])
+router = APIRouter(prefix="/categorias", tags=["categorias"], route_class=RutaMedida)
 
 @router.post("/", response_model=CategoriaResponse)
 async def crear_categoria(
@@ -5,8 +5,10 @@ from app.schemas.cuenta import CuentaCreate, CuentaResponse, CuentaUpdate
 from app.models.usuario import User
 from app.auth import current_active_user
 import app.crud.crud_cuenta as crud
+from app.services.serializacion import serializacion_rapida, RespuestaJSONRapida, a_plano
+from app.services.metricas import RutaMedida
 
-router = APIRouter(prefix="/cuentas", tags=["cuentas"])
+router = APIRouter(prefix="/cuentas", tags=["cuentas"], route_class=RutaMedida)
 
 @router.post("/", response_model=CuentaResponse)
 async def crear_cuenta(
@@ -21,7 +23,10 @@ async def listar_cuentas(
     db: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_active_user),
 ):
-    return await crud.get_cuentas_by_usuario(db, user.id)
+    cuentas = await crud.get_cuentas_by_usuario(db, user.id)
+    if serializacion_rapida():
+        return RespuestaJSONRapida(a_plano(list[CuentaResponse], cuentas))
+    return cuentas
 
 @router.get("/{cuenta_id}", response_model=CuentaResponse)
 async def obtener_cuenta(
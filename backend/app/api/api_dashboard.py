@@ -1,15 +1,25 @@
-from fastapi import APIRouter, Depends
+import asyncio
+import os
+from datetime import date, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Literal, Optional
 
-from app.db.session import get_async_session
+from app.db.session import get_async_session, get_engine, get_sessionmaker
 from app.models.usuario import User
 from app.auth import current_active_user
 import app.crud.crud_dashboard as crud
-from app.schemas.dashboard import ResumenMensual, ResumenPorCategoria # <-- Importar el nuevo schema
+import app.crud.crud_cuenta as crud_cuenta
+import app.crud.crud_categoria as crud_categoria
+import app.crud.crud_transaccion as crud_transaccion
+from app.schemas.dashboard import ResumenMensual, ResumenPorCategoria, DashboardBundle, AnaliticaResponse, DimensionAnalitica, MedidaAnalitica, PronosticoResponse # <-- Importar el nuevo schema
+from app.services.limitador import LimitadorPorUsuario, conexiones_por_usuario
+from app.services.serializacion import serializacion_rapida, RespuestaJSONRapida, a_plano
+from app.services.referencias import mapa_referencias
+from app.services.metricas import RutaMedida
 
 
-router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+router = APIRouter(prefix="/dashboard", tags=["dashboard"], route_class=RutaMedida)
 
 @router.get("/resumen-mensual/{year}", response_model=List[ResumenMensual])
 async def obtener_resumen_mensual(
@@ -20,7 +30,10 @@ async def obtener_resumen_mensual(
     """
     Devuelve un resumen de ingresos y gastos totales para cada mes del año especificado.
     """
-    return await crud.get_resumen_mensual_por_ano(db=db, usuario_id=user.id, year=year)
+    resumen = await crud.get_resumen_mensual_por_ano(db=db, usuario_id=user.id, year=year)
+    if serializacion_rapida():
+        return RespuestaJSONRapida(a_plano(List[ResumenMensual], resumen))
+    return resumen
 
 
 @router.get("/gastos-por-categoria/{year}/{month}", response_model=List[ResumenPorCategoria])
@@ -34,4 +47,136 @@ async def obtener_gastos_por_categoria(
     Devuelve un resumen de los gastos totales agrupados por categoría
     para un mes y año específicos.
     """
-    return await crud.get_resumen_gastos_por_categoria(db=db, usuario_id=user.id, year=year, month=month)
\ No newline at end of file
+    gastos = await crud.get_resumen_gastos_por_categoria(db=db, usuario_id=user.id, year=year, month=month)
+    if serializacion_rapida():
+        return RespuestaJSONRapida(a_plano(List[ResumenPorCategoria], gastos))
+    return gastos
+
+
+# Se crea con la primera petición, cuando ya existe el engine y se conoce el tamaño del pool.
+_limitador_bundle: Optional[LimitadorPorUsuario] = None
+
+
+def _get_limitador_bundle() -> LimitadorPorUsuario:
+    global _limitador_bundle
+    if _limitador_bundle is None:
+        maximo = int(os.getenv("DASHBOARD_BUNDLE_CONCURRENCIA", "5"))
+        _limitador_bundle = LimitadorPorUsuario(conexiones_por_usuario(get_engine(), maximo))
+    return _limitador_bundle
+
+
+@router.get("/bundle", response_model=DashboardBundle)
+async def obtener_dashboard_bundle(
+    year: Optional[int] = None,
+    month: Optional[int] = Query(None, ge=1, le=12),
+    user: User = Depends(current_active_user),
+):
+    """
+    Devuelve en una sola llamada lo que carga la página del dashboard: cuentas,
+    categorías, últimas transacciones, resumen mensual del año y gastos por
+    categoría del mes (por defecto, el año y mes actuales).
+
+    Cada consulta usa su propia sesión (y conexión del pool) y se lanzan a la vez,
+    así que la respuesta tarda más o menos lo que la consulta más lenta. Un mismo
+    usuario no ocupa más de DASHBOARD_BUNDLE_CONCURRENCIA conexiones a la vez.
+    """
+    hoy = date.today()
+    year = year or hoy.year
+    month = month or hoy.month
+    nueva_sesion = get_sessionmaker()
+    limitador = _get_limitador_bundle()
+
+    async def consultar(funcion, **kwargs):
+        async with limitador.turno(user.id):
+            async with nueva_sesion() as db:
+                return await funcion(db=db, usuario_id=user.id, **kwargs)
+
+    cuentas, categorias, ultimas, resumen, gastos = await asyncio.gather(
+        consultar(crud_cuenta.get_cuentas_by_usuario),
+        consultar(crud_categoria.get_categorias_by_usuario),
+        consultar(crud_transaccion.get_latest_confirmed_transactions, limit=10),
+        consultar(crud.get_resumen_mensual_por_ano, year=year),
+        consultar(crud.get_resumen_gastos_por_categoria, year=year, month=month),
+    )
+    bundle = {
+        "cuentas": cuentas,
+        "categorias": categorias,
+        "ultimas_transacciones": ultimas,
+        "resumen_mensual": resumen,
+        "gastos_por_categoria": gastos,
+    }
+    if serializacion_rapida():
+        return RespuestaJSONRapida(a_plano(DashboardBundle, bundle))
+    return bundle
+
+
+@router.get("/analytics", response_model=AnaliticaResponse)
+async def obtener_analitica(
+    dimension: DimensionAnalitica,
+    medida: MedidaAnalitica = "total",
+    pivote: Optional[DimensionAnalitica] = None,
+    tipo: Literal["Gasto", "Ingreso", "Transferencia", "todos"] = "Gasto",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    ventana: Optional[int] = Query(None, ge=1, le=366),
+    db: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_active_user),
+):
+    """
+    Consultas analíticas sobre las transacciones confirmadas del usuario: agrupa por
+    'dimension' (dia, mes, anio, dia_semana, categoria, cuenta o tipo) y calcula la
+    'medida' (total, cantidad o promedio). Con 'pivote' devuelve una tabla dinámica
+    (p. ej. dimension=cuenta&pivote=mes) y con 'ventana' una ventana móvil de N
+    períodos sobre una dimensión de tiempo.
+
+    El historial se carga una vez en memoria (columnas NumPy) y se reutiliza hasta
+    que cambian las transacciones del usuario.
+    """
+    # Se importa aquí y no al cargar el módulo: NumPy tarda en importarse y solo lo
+    # necesitan estos endpoints, no el arranque de la app (ver check_import_time.py).
+    from app.services import analitica
+    from app.services.analitica import motor_analitica
+
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="La fecha de inicio no puede ser posterior a la fecha de fin.")
+    if pivote == dimension:
+        raise HTTPException(status_code=400, detail="El pivote debe ser distinto de la dimensión.")
+    if ventana and dimension not in analitica.DIMENSIONES_TEMPORALES:
+        raise HTTPException(status_code=400, detail="La ventana móvil solo se puede usar con dia, mes o anio.")
+
+    historial = await motor_analitica.historial(db, user.id)
+    referencias = None
+    if {dimension, pivote} & {"categoria", "cuenta"}:
+        referencias = await mapa_referencias.obtener(
+            db, user.id, ids_cuentas=set(historial.cuenta.tolist()) - {0},
+            ids_categorias=set(historial.categoria.tolist()) - {0},
+        )
+    return analitica.consultar(
+        historial, dimension, medida,
+        pivote=pivote,
+        tipo=None if tipo == "todos" else tipo,
+        start_date=start_date,
+        end_date=end_date,
+        ventana=ventana,
+        referencias=referencias,
+    )
+
+
+@router.get("/pronostico", response_model=PronosticoResponse)
+async def obtener_pronostico(
+    meses: int = Query(12, ge=1, le=120),
+    granularidad: Literal["dia", "mes"] = "mes",
+    db: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_active_user),
+):
+    """
+    Proyecta los saldos de los próximos 'meses' meses a partir del saldo actual de
+    las cuentas y de las reglas recurrentes activas (Mensual, Semanal y Anual), por
+    día o por mes. Las reglas se expanden en memoria: a diferencia de generar las
+    transacciones planeadas, no se escribe nada en la base.
+    """
+    from app.services.pronostico import pronosticar  # importa NumPy: solo al usarse
+
+    # Empieza mañana: lo de hoy ya debería estar registrado en los saldos.
+    desde = date.today() + timedelta(days=1)
+    return await pronosticar(db=db, usuario_id=user.id, desde=desde, meses=meses, granularidad=granularidad)
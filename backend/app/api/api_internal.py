@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends
+
+from app.auth import fastapi_users
+from app.services.cache import cache_lecturas
+from app.auth.cache_usuarios import cache_usuarios
+from app.services.referencias import mapa_referencias
+from app.db.session import estadisticas_pool
+
+# Endpoints de diagnóstico. Solo para superusuarios.
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"],
+    dependencies=[Depends(fastapi_users.current_user(active=True, superuser=True))]
+)
+
+
+@router.get("/cache")
+async def get_estadisticas_cache():
+    """
+    Devuelve los contadores de la caché de lecturas (aciertos, fallos, expulsiones...).
+    Sirve para ajustar CACHE_LECTURAS_MAX_ENTRADAS y CACHE_LECTURAS_TTL_SEGUNDOS.
+    """
+    return cache_lecturas.estadisticas()
+
+
+@router.get("/cache/usuarios")
+async def get_estadisticas_cache_usuarios():
+    """
+    Contadores de la caché del usuario autenticado: tasa de aciertos y
+    consultas a 'users' ahorradas.
+    """
+    return cache_usuarios.estadisticas()
+
+
+@router.get("/cache/referencias")
+async def get_estadisticas_referencias():
+    """
+    Contadores del mapa de nombres de cuentas y categorías con el que se
+    rellenan las transacciones (cargas, recargas por ids desconocidos...).
+    """
+    return mapa_referencias.estadisticas()
+
+
+@router.get("/cache/analitica")
+async def get_estadisticas_analitica():
+    """
+    Contadores de la caché de historiales en columnas del endpoint de analítica
+    (cargas, filas cargadas...). Se ajusta con ANALITICA_MAX_USUARIOS y ANALITICA_TTL_SEGUNDOS.
+    """
+    from app.services.analitica import motor_analitica  # importa NumPy: solo al usarse
+    return motor_analitica.estadisticas()
+
+
+@router.get("/db-pool")
+async def get_estadisticas_pool():
+    """
+    Estado del pool de conexiones de este worker: conexiones en uso y libres,
+    overflow, esperas por una conexión libre y timeouts.
+    """
+    return estadisticas_pool()
@@ -1,15 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+from datetime import date
 
 from app.db.session import get_async_session
 from app.models.usuario import User
 from app.auth import current_active_user
 import app.crud.crud_regla_recurrente as crud
 from app.schemas.regla_recurrente import ReglaRecurrenteCreate, ReglaRecurrenteResponse, ReglaRecurrenteUpdate, GeneracionResponse
+from app.services.metricas import RutaMedida
 
 # Creamos un nuevo router
-router = APIRouter(prefix="/reglas-recurrentes", tags=["reglas-recurrentes"])
+router = APIRouter(prefix="/reglas-recurrentes", tags=["reglas-recurrentes"], route_class=RutaMedida)
 
 # --- Endpoint para CREAR una nueva regla ---
 @router.post("/", response_model=ReglaRecurrenteResponse, status_code=201)
@@ -73,4 +75,26 @@ async def generar_transacciones_del_mes(
         db=db, usuario_id=user.id, year=year, month=month
     )
     # Devolvemos el objeto con el formato correcto
-    return GeneracionResponse(transacciones_generadas=count)
\ No newline at end of file
+    return GeneracionResponse(transacciones_generadas=count)
+
+# Límite del rango de generación, para evitar peticiones desmesuradas.
+MAX_DIAS_GENERACION = 366 * 5
+
+@router.post("/generar-transacciones", response_model=GeneracionResponse)
+async def generar_transacciones_rango(
+    desde: date,
+    hasta: date,
+    db: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_active_user),
+):
+    """
+    Genera las transacciones planeadas de todas las reglas activas entre
+    'desde' y 'hasta' (ambos incluidos), en una sola operación.
+    """
+    if desde > hasta:
+        raise HTTPException(status_code=400, detail="La fecha 'desde' no puede ser posterior a 'hasta'.")
+    if (hasta - desde).days > MAX_DIAS_GENERACION:
+        raise HTTPException(status_code=400, detail="El rango de generación no puede superar 5 años.")
+
+    count = await crud.generar_transacciones_rango(db=db, usuario_id=user.id, desde=desde, hasta=hasta)
+    return GeneracionResponse(transacciones_generadas=count)
@@ -1,14 +1,20 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Literal, Optional
+import io
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
-from app.db.session import get_async_session
-from app.schemas.transaccion import TransaccionCreate, TransaccionResponse, TransaccionUpdate, TransaccionPeriodResponse
+from app.db.session import get_async_session, get_sessionmaker
+from app.schemas.transaccion import TransaccionCreate, TransaccionResponse, TransaccionUpdate, TransaccionPeriodResponse, TransaccionPaginaResponse, ImportacionResponse, LoteTransaccionesRequest, LoteTransaccionesResponse
 from app.models.usuario import User
 from app.auth import current_active_user
 import app.crud.crud_transaccion as crud
+import app.crud.crud_cuenta as crud_cuenta
+from app.services import export_service, import_service
+from app.services.serializacion import serializacion_rapida, RespuestaJSONRapida, a_plano
+from app.services.metricas import RutaMedida
 
-router = APIRouter(prefix="/transacciones", tags=["transacciones"])
+router = APIRouter(prefix="/transacciones", tags=["transacciones"], route_class=RutaMedida)
 
 # Crear una transacción
 @router.post("/", response_model=TransaccionResponse)
@@ -17,8 +23,62 @@ async def crear_transaccion(
     db: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_active_user),
 ):
+    errores = await crud.referencias_invalidas(db, user.id, transaccion.model_dump())
+    if errores:
+        raise HTTPException(status_code=400, detail=" ".join(errores))
     return await crud.create_transaccion(db, transaccion, user.id)
 
+# --- IMPORTAR UN EXTRACTO BANCARIO (CSV / OFX) ---
+@router.post("/importar", response_model=ImportacionResponse)
+async def importar_extracto(
+    archivo: UploadFile = File(...),
+    cuenta_id: int = Form(...),
+    formato: Optional[Literal["csv", "ofx"]] = Form(None),
+    categoria_gasto_id: Optional[int] = Form(None),
+    categoria_ingreso_id: Optional[int] = Form(None),
+    db: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_active_user),
+):
+    """
+    Importa los movimientos de un extracto en la cuenta indicada.
+    Los montos negativos se registran como gastos y los positivos como ingresos.
+    Las filas sin categoría usan 'categoria_gasto_id' o 'categoria_ingreso_id'.
+    Devuelve cuántas filas se importaron y el detalle de las que fallaron.
+    """
+    if not await crud_cuenta.get_cuenta(db, cuenta_id, user.id):
+        raise HTTPException(status_code=404, detail="Cuenta no encontrada")
+
+    if formato is None:
+        formato = "ofx" if (archivo.filename or "").lower().endswith((".ofx", ".qfx")) else "csv"
+    leer = import_service.leer_ofx if formato == "ofx" else import_service.leer_csv
+
+    # Leemos el archivo como texto a medida que se recorre, sin cargarlo entero.
+    # La lectura y el parseo van por bloques al threadpool para no bloquear el event loop.
+    texto = io.TextIOWrapper(archivo.file, encoding="utf-8-sig", errors="replace", newline="")
+    filas = import_service.leer_en_hilo(leer(texto, cuenta_id, categoria_gasto_id, categoria_ingreso_id))
+    return await crud.importar_transacciones(db=db, usuario_id=user.id, filas=filas)
+
+# --- CREAR, ACTUALIZAR Y ELIMINAR EN LOTE ---
+@router.post("/batch", response_model=LoteTransaccionesResponse)
+async def aplicar_lote_transacciones(
+    lote: LoteTransaccionesRequest,
+    db: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_active_user),
+):
+    """
+    Aplica varias operaciones ('crear', 'actualizar', 'eliminar') en una sola
+    transacción. Es todo o nada: si alguna operación no es válida se responde 400
+    con el error de cada una (por su índice) y no se guarda ningún cambio.
+    """
+    resultado = await crud.aplicar_lote(db=db, usuario_id=user.id, operaciones=lote.operaciones)
+    if resultado["errores"]:
+        raise HTTPException(
+            status_code=400,
+            detail={"mensaje": "El lote tiene operaciones inválidas; no se aplicó ningún cambio.",
+                    "errores": resultado["errores"]}
+        )
+    return resultado
+
 # ---  ENDPOINT PARA TRANSACCIONES EN EL DASHBOARD --
 @router.get("/latest/", response_model=List[TransaccionResponse])
 async def listar_ultimas_transacciones(
@@ -28,32 +88,127 @@ async def listar_ultimas_transacciones(
     """
     Obtiene las últimas 10 transacciones confirmadas para el dashboard.
     """
-    return await crud.get_latest_confirmed_transactions(db=db, usuario_id=user.id, limit=10)
+    ultimas = await crud.get_latest_confirmed_transactions(db=db, usuario_id=user.id, limit=10)
+    if serializacion_rapida():
+        return RespuestaJSONRapida(a_plano(List[TransaccionResponse], ultimas))
+    return ultimas
 
 # --- ENDPOINT PARA FILTRAR POR PERÍODO PARA EL HISTORIAL ---
 @router.get("/", response_model=TransaccionPeriodResponse)
 async def listar_transacciones_periodo(
     start_date: date,
     end_date: date,
+    cuenta_id: Optional[int] = None,
     db: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_active_user),
 ):
     """
     Obtiene todas las transacciones de un usuario dentro de un rango de fechas
     y calcula el saldo total justo antes de la fecha de inicio.
+    Cada transacción incluye su 'saldo_acumulado'. Con 'cuenta_id' se limita
+    a esa cuenta y los saldos son los de la cuenta.
     """
     if start_date > end_date:
         raise HTTPException(status_code=400, detail="La fecha de inicio no puede ser posterior a la fecha de fin.")
+
+    cuenta = None
+    if cuenta_id is not None:
+        cuenta = await crud_cuenta.get_cuenta(db, cuenta_id=cuenta_id, usuario_id=user.id)
+        if not cuenta:
+            raise HTTPException(status_code=404, detail="Cuenta no encontrada")
     
     # Llamamos la función del crud
+    rapida = serializacion_rapida()
     period_data = await crud.get_transactions_with_starting_balance(
         db=db,
         usuario_id=user.id,
         start_date=start_date,
-        end_date=end_date
+        end_date=end_date,
+        cuenta=cuenta,
+        como_dict=rapida
     )
+    if rapida:
+        # Mismo JSON que TransaccionPeriodResponse, sin pasar por Pydantic.
+        return RespuestaJSONRapida({
+            "saldo_inicial_periodo": float(period_data["saldo_inicial_periodo"]),
+            "transacciones": period_data["transacciones"],
+        })
     return period_data
 
+# --- ENDPOINT PAGINADO POR CURSOR ---
+@router.get("/pagina", response_model=TransaccionPaginaResponse)
+async def listar_transacciones_paginadas(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_active_user),
+):
+    """
+    Devuelve las transacciones del usuario de la más reciente a la más antigua,
+    en páginas de 'limit' filas. Para pedir la siguiente página se envía el
+    'next_cursor' recibido. La primera página incluye 'saldo_inicial_periodo'
+    si se indica 'start_date'.
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="La fecha de inicio no puede ser posterior a la fecha de fin.")
+    rapida = serializacion_rapida()
+    try:
+        pagina = await crud.get_transacciones_pagina(
+            db=db,
+            usuario_id=user.id,
+            limit=limit,
+            cursor=cursor,
+            start_date=start_date,
+            end_date=end_date,
+            como_dict=rapida
+        )
+    except crud.CursorInvalido as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if rapida:
+        # Mismo orden de campos que TransaccionPaginaResponse.
+        saldo = pagina["saldo_inicial_periodo"]
+        return RespuestaJSONRapida({
+            "transacciones": pagina["transacciones"],
+            "next_cursor": pagina["next_cursor"],
+            "saldo_inicial_periodo": float(saldo) if saldo is not None else None,
+        })
+    return pagina
+
+# --- ENDPOINT PARA EXPORTAR EL HISTORIAL (CSV / NDJSON) ---
+@router.get("/export")
+async def exportar_transacciones(
+    formato: Literal["csv", "ndjson"] = "csv",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    user: User = Depends(current_active_user),
+):
+    """
+    Exporta las transacciones del usuario como un flujo CSV o NDJSON.
+    Las filas se leen con un cursor del servidor y se envían a medida que llegan,
+    así que la memoria no depende del tamaño del historial.
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="La fecha de inicio no puede ser posterior a la fecha de fin.")
+
+    usuario_id = user.id
+
+    async def filas():
+        # La sesión de la dependencia se cierra antes de enviar la respuesta,
+        # así que el flujo abre la suya propia y la mantiene mientras dura.
+        async with get_sessionmaker()() as session:
+            async for fila in crud.stream_transacciones(
+                session, usuario_id=usuario_id, start_date=start_date, end_date=end_date
+            ):
+                yield fila
+
+    return StreamingResponse(
+        export_service.exportar(filas(), formato),
+        media_type=export_service.TIPOS_CONTENIDO[formato],
+        headers={"Content-Disposition": f'attachment; filename="transacciones.{formato}"'},
+    )
+
 # Obtener una transacción por ID
 @router.get("/{transaccion_id}", response_model=TransaccionResponse)
 async def obtener_transaccion(
@@ -61,7 +216,7 @@ async def obtener_transaccion(
     db: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_active_user),
 ):
-    transaccion = await crud.get_transaccion(db, transaccion_id, user.id)
+    transaccion = await crud.get_transaccion_respuesta(db, transaccion_id, user.id)
     if not transaccion:
         raise HTTPException(status_code=404, detail="Transacción no encontrada")
     return transaccion
@@ -73,10 +228,8 @@ async def eliminar_transaccion(
     db: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_active_user),
 ):
-    transaccion = await crud.get_transaccion(db, transaccion_id, user.id)
-    if not transaccion:
+    if not await crud.delete_transaccion(db, transaccion_id, user.id):
         raise HTTPException(status_code=404, detail="Transacción no encontrada")
-    await crud.delete_transaccion(db, transaccion_id, user.id)
 
 
 # Actualizar una transacción
@@ -90,4 +243,8 @@ async def actualizar_transaccion(
     db_transaccion = await crud.get_transaccion(db, transaccion_id=transaccion_id, usuario_id=user.id)
     if not db_transaccion:
         raise HTTPException(status_code=404, detail="Transacción no encontrada")
+    # Solo se comprueban las cuentas y la categoría que cambian.
+    errores = await crud.referencias_invalidas(db, user.id, transaccion.model_dump(exclude_unset=True))
+    if errores:
+        raise HTTPException(status_code=400, detail=" ".join(errores))
     return await crud.update_transaccion(db=db, db_obj=db_transaccion, obj_in=transaccion)
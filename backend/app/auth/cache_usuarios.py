@@ -0,0 +1,74 @@
+# backend/app/auth/cache_usuarios.py
+import os
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.models.usuario import User
+from app.services.cache import CacheLRU
+
+# Columnas de User que se guardan en la caché (no se guardan objetos ORM).
+_COLUMNAS = tuple(c.key for c in User.__table__.columns)
+
+
+class CacheUsuarios:
+    """
+    Caché corta del usuario autenticado, para no leer la fila de 'users' en cada petición.
+
+    La clave es (usuario_id, versión, token): un token distinto (otro login) no comparte
+    entrada, y subir la versión del usuario invalida todas sus entradas a la vez.
+    Cada acierto devuelve un User nuevo en estado 'detached', reconstruido con sus
+    columnas, así que nunca se comparte un objeto entre sesiones o peticiones.
+
+    La versión se lee ANTES de ir a la base de datos y la entrada se guarda con esa
+    versión: si alguien invalida mientras tanto, la entrada guardada ya nace obsoleta.
+    """
+
+    def __init__(self, cache: CacheLRU, habilitada: bool = True):
+        self.cache = cache
+        self.habilitada = habilitada
+        self._versiones: Dict[int, int] = {}
+        self.invalidaciones = 0
+
+    def version(self, usuario_id: int) -> int:
+        return self._versiones.get(usuario_id, 0)
+
+    def obtener(self, usuario_id: int, token: str) -> Optional[User]:
+        if not self.habilitada:
+            return None
+        encontrado, datos = self.cache.obtener((usuario_id, self.version(usuario_id), token))
+        if not encontrado:
+            return None
+        usuario = User(**datos)
+        make_transient_to_detached(usuario)
+        return usuario
+
+    def guardar(self, usuario_id: int, token: str, version: int, usuario: User) -> None:
+        if not self.habilitada:
+            return
+        datos = {columna: getattr(usuario, columna) for columna in _COLUMNAS}
+        self.cache.guardar((usuario_id, version, token), datos)
+
+    def invalidar(self, usuario_id: int) -> None:
+        """Llamar después de cualquier cambio en el usuario (activo, verificado, superusuario...)."""
+        self._versiones[usuario_id] = self.version(usuario_id) + 1
+        self.invalidaciones += 1
+
+    def estadisticas(self) -> Dict[str, Any]:
+        return {
+            **self.cache.estadisticas(),
+            "habilitada": self.habilitada,
+            "invalidaciones": self.invalidaciones,
+            # Cada acierto es una lectura de 'users' que no se hizo.
+            "consultas_ahorradas": self.cache.aciertos,
+        }
+
+
+# Instancia única. El TTL acota cuánto tarda en notarse un cambio hecho desde otro proceso.
+cache_usuarios = CacheUsuarios(
+    CacheLRU(
+        max_entradas=int(os.getenv("CACHE_USUARIOS_MAX_ENTRADAS", "10000")),
+        ttl_segundos=float(os.getenv("CACHE_USUARIOS_TTL_SEGUNDOS", "30")),
+    ),
+    habilitada=os.getenv("CACHE_USUARIOS_HABILITADA", "true").lower() == "true",
+)
@@ -1,10 +1,53 @@
 import os
+from typing import Optional
+
+import jwt
+from fastapi_users import exceptions
 from fastapi_users.authentication import AuthenticationBackend, BearerTransport, JWTStrategy
+from fastapi_users.jwt import decode_jwt
+
+from app.auth.cache_usuarios import cache_usuarios
 
 bearer_transport = BearerTransport(tokenUrl="auth/jwt/login")
 
+
+class JWTStrategyCacheada(JWTStrategy):
+    """
+    Igual que JWTStrategy, pero el usuario del token se busca primero en cache_usuarios.
+    El token se sigue verificando (firma y caducidad) en cada petición; lo que se
+    ahorra es la lectura de la fila del usuario.
+    """
+
+    async def read_token(self, token: Optional[str], user_manager):
+        if token is None:
+            return None
+
+        try:
+            data = decode_jwt(
+                token, self.decode_key, self.token_audience, algorithms=[self.algorithm]
+            )
+            user_id = data.get("sub")
+            if user_id is None:
+                return None
+            parsed_id = user_manager.parse_id(user_id)
+        except (jwt.PyJWTError, exceptions.InvalidID):
+            return None
+
+        usuario = cache_usuarios.obtener(parsed_id, token)
+        if usuario is not None:
+            return usuario
+
+        version = cache_usuarios.version(parsed_id)
+        try:
+            usuario = await user_manager.get(parsed_id)
+        except exceptions.UserNotExists:
+            return None
+        cache_usuarios.guardar(parsed_id, token, version, usuario)
+        return usuario
+
+
 def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(
+    return JWTStrategyCacheada(
         secret=os.environ["JWT_SECRET"],
         lifetime_seconds=3600,
     )
@@ -5,11 +5,18 @@ from fastapi_users.manager import BaseUserManager, IntegerIDMixin
 
 from app.models.usuario import User
 from app.db.user_db import get_user_db
-from app.services.email_service import email_service # Usamos nuestro nuevo servicio
+from app.services.email_service import get_email_service # Usamos nuestro nuevo servicio
+from app.auth.cache_usuarios import cache_usuarios
 
 class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
-    reset_password_token_secret = os.environ["JWT_SECRET"]
-    verification_token_secret = os.environ["JWT_SECRET"]
+    # Se leen al usarse y no al importar el módulo.
+    @property
+    def reset_password_token_secret(self) -> str:
+        return os.environ["JWT_SECRET"]
+
+    @property
+    def verification_token_secret(self) -> str:
+        return os.environ["JWT_SECRET"]
 
     async def on_after_register(self, user: User, request: Request | None = None):
         print(f"✅ Usuario '{user.email}' registrado. Solicitando token...")
@@ -22,15 +29,34 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     async def on_after_request_verify(
         self, user: User, token: str, request: Request | None = None
     ):
-        # Paso 2: fastapi-users nos da el token, y ahora sí enviamos el correo
-        print(f"   -> Token generado. Enviando correo de verificación a {user.email}...")
-        email_service.send_verification_email(user, token)
+        # Paso 2: fastapi-users nos da el token y dejamos el correo en la bandeja de salida
+        print(f"   -> Token generado. Encolando correo de verificación para {user.email}...")
+        await get_email_service().send_verification_email(self.user_db.session, user, token)
             
     async def on_after_forgot_password(
         self, user: User, token: str, request: Request | None = None
     ):
-        print(f"Enviando correo de reseteo de contraseña a {user.email}...")
-        email_service.send_reset_password_email(user, token)
+        print(f"Encolando correo de reseteo de contraseña para {user.email}...")
+        try:
+            await get_email_service().send_reset_password_email(self.user_db.session, user, token)
+        except Exception as e:
+            print(f"❌ No se pudo encolar el correo de reseteo para {user.email}: {e}")
+
+    # --- Invalidación de la caché del usuario autenticado ---
+    # Cualquier cambio del usuario (PATCH /users/me, /users/{id}, verificación,
+    # cambio de contraseña o borrado) debe verse en la siguiente petición.
+
+    async def on_after_update(self, user: User, update_dict: dict, request: Request | None = None):
+        cache_usuarios.invalidar(user.id)
+
+    async def on_after_verify(self, user: User, request: Request | None = None):
+        cache_usuarios.invalidar(user.id)
+
+    async def on_after_reset_password(self, user: User, request: Request | None = None):
+        cache_usuarios.invalidar(user.id)
+
+    async def on_after_delete(self, user: User, request: Request | None = None):
+        cache_usuarios.invalidar(user.id)
 
 async def get_user_manager(user_db=Depends(get_user_db)):
     yield UserManager(user_db)
\ No newline at end of file
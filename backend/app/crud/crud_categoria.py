@@ -1,8 +1,10 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import insert, update
 from app.models.categoria import Categoria
 from app.schemas.categoria import CategoriaCreate, CategoriaUpdate
 from typing import List, Optional
+from app.services.cache import cache_lecturas
 
 async def get_categoria(db: AsyncSession, categoria_id: int, usuario_id: int) -> Optional[Categoria]:
     result = await db.execute(
@@ -27,20 +29,22 @@ async def get_categorias_by_usuario(db: AsyncSession, usuario_id: int, skip=0, l
 async def create_categoria(db: AsyncSession, categoria: CategoriaCreate, usuario_id: int) -> Categoria:
     data = categoria.model_dump()
     data["usuario_id"] = usuario_id
-    db_categoria = Categoria(**data)
-    db.add(db_categoria)
+    # INSERT ... RETURNING: la categoría vuelve completa sin un refresh posterior.
+    db_categoria = await db.scalar(insert(Categoria).values(**data).returning(Categoria))
     await db.commit()
-    await db.refresh(db_categoria)
+    cache_lecturas.invalidar(usuario_id, "categorias")
     return db_categoria
 
 # NUEVO: Función para actualizar una categoría
 async def update_categoria(db: AsyncSession, *, db_obj: Categoria, obj_in: CategoriaUpdate) -> Categoria:
     obj_data = obj_in.model_dump(exclude_unset=True)
-    for field in obj_data:
-        setattr(db_obj, field, obj_data[field])
-    db.add(db_obj)
+    if not obj_data:
+        return db_obj
+    db_obj = await db.scalar(
+        update(Categoria).where(Categoria.id == db_obj.id).values(**obj_data).returning(Categoria)
+    )
     await db.commit()
-    await db.refresh(db_obj)
+    cache_lecturas.invalidar(db_obj.usuario_id, "categorias")
     return db_obj
 
 async def delete_categoria(db: AsyncSession, categoria_id: int, usuario_id: int):
@@ -54,3 +58,4 @@ async def delete_categoria(db: AsyncSession, categoria_id: int, usuario_id: int)
     if categoria:
         await db.delete(categoria)
         await db.commit()
+        cache_lecturas.invalidar(usuario_id, "categorias")
@@ -1,16 +1,22 @@
+from collections import defaultdict
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import func, update, insert
 from app.models.cuenta import Cuenta
-from app.schemas.cuenta import CuentaCreate, CuentaUpdate
-from typing import List, Optional
+from app.models.transaccion import Transaccion
+from app.schemas.cuenta import CuentaCreate, CuentaUpdate, CuentaResponse
+from app.services.cache import cache_lecturas
+from typing import List, Optional, Iterable, Mapping, Dict, Any
 
 async def create_cuenta(db: AsyncSession, cuenta: CuentaCreate, usuario_id: int) -> Cuenta:
     data = cuenta.model_dump()
     data["usuario_id"] = usuario_id
-    db_cuenta = Cuenta(**data)
-    db.add(db_cuenta)
+    # Una cuenta nueva no tiene movimientos: su saldo actual es el inicial.
+    data["saldo_actual"] = data["saldo_inicial"]
+    # INSERT ... RETURNING: la cuenta vuelve completa sin un refresh posterior.
+    db_cuenta = await db.scalar(insert(Cuenta).values(**data).returning(Cuenta))
     await db.commit()
-    await db.refresh(db_cuenta)
+    cache_lecturas.invalidar(usuario_id, "cuentas")
     return db_cuenta
 
 async def get_cuenta(db: AsyncSession, cuenta_id: int, usuario_id: int) -> Optional[Cuenta]:
@@ -22,11 +28,11 @@ async def get_cuenta(db: AsyncSession, cuenta_id: int, usuario_id: int) -> Optio
     )
     return result.scalar_one_or_none()
 
+# El saldo_actual cambia con cada transacción, así que también depende de ese espacio.
+@cache_lecturas.cacheado("cuentas", "transacciones", esquema=List[CuentaResponse])
 async def get_cuentas_by_usuario(db: AsyncSession, usuario_id: int, skip: int = 0, limit: int = 100) -> List[Cuenta]:
-    # El único cambio está aquí. La consulta es la misma,
-    # pero SQLAlchemy es lo suficientemente inteligente como para saber que,
-    # como 'saldo_actual' está en el esquema de respuesta, debe calcularlo.
-    # La 'hybrid_property' hace todo el trabajo pesado por nosotros.
+    # 'saldo_actual' es ahora una columna normal, así que listar las cuentas
+    # es una sola consulta sin subconsultas sobre las transacciones.
     # Añadimos .order_by(Cuenta.nombre) para ordenar alfabéticamente
     result = await db.execute(
         select(Cuenta)
@@ -39,11 +45,14 @@ async def get_cuentas_by_usuario(db: AsyncSession, usuario_id: int, skip: int =
 
 async def update_cuenta(db: AsyncSession, *, db_obj: Cuenta, obj_in: CuentaUpdate) -> Cuenta:
     obj_data = obj_in.model_dump(exclude_unset=True)
-    for field in obj_data:
-        setattr(db_obj, field, obj_data[field])
-    db.add(db_obj)
+    if not obj_data:
+        return db_obj
+    # UPDATE ... RETURNING también actualiza 'db_obj' en la sesión.
+    db_obj = await db.scalar(
+        update(Cuenta).where(Cuenta.id == db_obj.id).values(**obj_data).returning(Cuenta)
+    )
     await db.commit()
-    await db.refresh(db_obj)
+    cache_lecturas.invalidar(db_obj.usuario_id, "cuentas")
     return db_obj
 
 
@@ -57,4 +66,100 @@ async def delete_cuenta(db: AsyncSession, cuenta_id: int, usuario_id: int):
     cuenta = result.scalar_one_or_none()
     if cuenta:
         await db.delete(cuenta)
-        await db.commit()
\ No newline at end of file
+        await db.commit()
+        cache_lecturas.invalidar(usuario_id, "cuentas")
+
+# --- MANTENIMIENTO DEL SALDO ACTUAL ---
+
+async def ajustar_saldos(
+    db: AsyncSession,
+    aplicar: Iterable[Mapping[str, Any]] = (),
+    revertir: Iterable[Mapping[str, Any]] = (),
+) -> None:
+    """
+    Actualiza el saldo_actual de las cuentas afectadas por una o varias transacciones.
+    'aplicar' suma el efecto de las transacciones y 'revertir' lo deshace (al borrar,
+    o con los valores anteriores al editar). Solo cuentan las transacciones 'Confirmado':
+    la cuenta de origen pierde el valor y la de destino lo gana.
+
+    No hace commit: el ajuste viaja en la misma transacción que la escritura que lo causa.
+    """
+    deltas: Dict[int, float] = defaultdict(float)
+    for signo, movimientos in ((1, aplicar), (-1, revertir)):
+        for mov in movimientos:
+            if mov["estado"] != 'Confirmado':
+                continue
+            if mov["cuenta_origen_id"]:
+                deltas[mov["cuenta_origen_id"]] -= signo * mov["valor"]
+            if mov["cuenta_destino_id"]:
+                deltas[mov["cuenta_destino_id"]] += signo * mov["valor"]
+
+    # Ordenamos por id para que escrituras concurrentes bloqueen las cuentas en el mismo orden.
+    for cuenta_id in sorted(deltas):
+        delta = deltas[cuenta_id]
+        if delta:
+            await db.execute(
+                update(Cuenta)
+                .where(Cuenta.id == cuenta_id)
+                .values(saldo_actual=Cuenta.saldo_actual + delta)
+            )
+
+async def verificar_saldos(
+    db: AsyncSession, usuario_id: Optional[int] = None, corregir: bool = False, tolerancia: float = 0.005
+) -> List[Dict[str, Any]]:
+    """
+    Recalcula el saldo de cada cuenta a partir de las transacciones confirmadas y lo
+    compara con el saldo_actual guardado. Devuelve las cuentas con diferencias y,
+    si 'corregir' es True, sobrescribe el saldo guardado con el recalculado.
+    """
+    entradas = (
+        select(Transaccion.cuenta_destino_id.label("cuenta_id"), func.sum(Transaccion.valor).label("total"))
+        .where(Transaccion.estado == 'Confirmado', Transaccion.cuenta_destino_id.isnot(None))
+        .group_by(Transaccion.cuenta_destino_id)
+        .subquery()
+    )
+    salidas = (
+        select(Transaccion.cuenta_origen_id.label("cuenta_id"), func.sum(Transaccion.valor).label("total"))
+        .where(Transaccion.estado == 'Confirmado', Transaccion.cuenta_origen_id.isnot(None))
+        .group_by(Transaccion.cuenta_origen_id)
+        .subquery()
+    )
+    saldo_calculado = (
+        Cuenta.saldo_inicial + func.coalesce(entradas.c.total, 0) - func.coalesce(salidas.c.total, 0)
+    ).label("saldo_calculado")
+
+    query = (
+        select(Cuenta.id, Cuenta.nombre, Cuenta.usuario_id, Cuenta.saldo_actual, saldo_calculado)
+        .outerjoin(entradas, entradas.c.cuenta_id == Cuenta.id)
+        .outerjoin(salidas, salidas.c.cuenta_id == Cuenta.id)
+        .order_by(Cuenta.id)
+    )
+    if usuario_id is not None:
+        query = query.where(Cuenta.usuario_id == usuario_id)
+
+    result = await db.execute(query)
+    desviaciones = [
+        {
+            "cuenta_id": row.id,
+            "nombre": row.nombre,
+            "usuario_id": row.usuario_id,
+            "saldo_guardado": row.saldo_actual,
+            "saldo_calculado": row.saldo_calculado,
+            "diferencia": row.saldo_actual - row.saldo_calculado,
+        }
+        for row in result.all()
+        if abs(row.saldo_actual - row.saldo_calculado) > tolerancia
+    ]
+
+    if corregir and desviaciones:
+        for d in desviaciones:
+            await db.execute(
+                update(Cuenta)
+                .where(Cuenta.id == d["cuenta_id"])
+                .values(saldo_actual=d["saldo_calculado"])
+            )
+        await db.commit()
+        for afectado in {d["usuario_id"] for d in desviaciones}:
+            cache_lecturas.invalidar(afectado, "cuentas")
+
+    return desviaciones
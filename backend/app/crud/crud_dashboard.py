@@ -1,37 +1,39 @@
+from collections import defaultdict
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, case, extract
-from typing import List
+from sqlalchemy import select, func, case, extract, delete, insert, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from typing import List, Iterable, Mapping, Optional, Dict, Tuple, Any
 
 from app.models.transaccion import Transaccion
+from app.models.agregado_mensual import AgregadoMensual
 from app.schemas.dashboard import ResumenMensual
 from app.models.categoria import Categoria # <-- Importar Categoria
 from app.schemas.dashboard import ResumenPorCategoria # <-- Importar el nuevo schema
+from app.services.cache import cache_lecturas
 
 
+@cache_lecturas.cacheado("transacciones", esquema=List[ResumenMensual])
 async def get_resumen_mensual_por_ano(db: AsyncSession, usuario_id: int, year: int) -> List[ResumenMensual]:
     """
     Calcula el total de ingresos y gastos para cada mes de un año específico.
     Solo considera transacciones en estado 'Confirmado'.
+    Lee la tabla de agregados mensuales, no las transacciones.
     """
     # Usamos case() para sumar condicionalmente.
-    # Si la transacción es 'Ingreso', sumamos su valor a 'total_ingresos'.
-    # Si es 'Gasto', la sumamos a 'total_gastos'.
-    ingresos = func.sum(case((Transaccion.tipo == 'Ingreso', Transaccion.valor), else_=0)).label('total_ingresos')
-    gastos = func.sum(case((Transaccion.tipo == 'Gasto', Transaccion.valor), else_=0)).label('total_gastos')
-
-    # Extraemos el mes de la fecha de la transacción para poder agrupar.
-    mes = extract('month', Transaccion.fecha).label('mes')
+    # Si la fila es de 'Ingreso', sumamos su total a 'total_ingresos'.
+    # Si es de 'Gasto', lo sumamos a 'total_gastos'.
+    ingresos = func.sum(case((AgregadoMensual.tipo == 'Ingreso', AgregadoMensual.total), else_=0)).label('total_ingresos')
+    gastos = func.sum(case((AgregadoMensual.tipo == 'Gasto', AgregadoMensual.total), else_=0)).label('total_gastos')
 
     # Construimos la consulta principal.
     query = (
-        select(mes, ingresos, gastos)
+        select(AgregadoMensual.mes, ingresos, gastos)
         .where(
-            Transaccion.usuario_id == usuario_id,
-            Transaccion.estado == 'Confirmado',
-            extract('year', Transaccion.fecha) == year
+            AgregadoMensual.usuario_id == usuario_id,
+            AgregadoMensual.anio == year
         )
-        .group_by(mes) # Agrupamos los resultados por mes.
-        .order_by(mes) # Ordenamos por mes.
+        .group_by(AgregadoMensual.mes) # Agrupamos los resultados por mes.
+        .order_by(AgregadoMensual.mes) # Ordenamos por mes.
     )
 
     result = await db.execute(query)
@@ -51,27 +53,128 @@ async def get_resumen_mensual_por_ano(db: AsyncSession, usuario_id: int, year: i
 
 
 
+@cache_lecturas.cacheado("transacciones", "categorias", esquema=List[ResumenPorCategoria])
 async def get_resumen_gastos_por_categoria(
     db: AsyncSession, usuario_id: int, year: int, month: int
 ) -> List[ResumenPorCategoria]:
     """
     Calcula el total de gastos por categoría para un mes y año específicos.
+    Lee la tabla de agregados mensuales, no las transacciones.
     """
-    total_gastado = func.sum(Transaccion.valor).label('total_gastado')
+    total_gastado = func.sum(AgregadoMensual.total).label('total_gastado')
 
     query = (
         select(Categoria.nombre.label('nombre_categoria'), total_gastado)
-        .join(Categoria, Transaccion.categoria_id == Categoria.id) # Unimos las tablas Transaccion y Categoria
+        .join(Categoria, AgregadoMensual.categoria_id == Categoria.id) # Unimos el agregado con Categoria
         .where(
-            Transaccion.usuario_id == usuario_id,
-            Transaccion.estado == 'Confirmado',
-            Transaccion.tipo == 'Gasto', # Solo nos interesan los gastos
-            extract('year', Transaccion.fecha) == year,
-            extract('month', Transaccion.fecha) == month
+            AgregadoMensual.usuario_id == usuario_id,
+            AgregadoMensual.tipo == 'Gasto', # Solo nos interesan los gastos
+            AgregadoMensual.anio == year,
+            AgregadoMensual.mes == month
         )
         .group_by(Categoria.nombre) # Agrupamos por el nombre de la categoría
         .order_by(total_gastado.desc()) # Ordenamos para ver las más importantes primero
     )
 
     result = await db.execute(query)
-    return result.all()
\ No newline at end of file
+    return result.all()
+
+# --- MANTENIMIENTO DE LA TABLA DE AGREGADOS ---
+
+# Módulos de INSERT con soporte de "ON CONFLICT DO UPDATE" según el motor.
+_INSERT_POR_DIALECTO = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+_CLAVE_AGREGADO = ["usuario_id", "anio", "mes", "tipo", "categoria_id"]
+
+async def ajustar_agregados(
+    db: AsyncSession,
+    aplicar: Iterable[Mapping[str, Any]] = (),
+    revertir: Iterable[Mapping[str, Any]] = (),
+) -> None:
+    """
+    Actualiza la tabla de agregados mensuales con el efecto de una o varias transacciones.
+    Funciona igual que crud_cuenta.ajustar_saldos: 'aplicar' suma y 'revertir' resta,
+    y solo cuentan las transacciones 'Confirmado'.
+
+    No hace commit: el ajuste viaja en la misma transacción que la escritura que lo causa.
+    """
+    deltas: Dict[Tuple, List[float]] = defaultdict(lambda: [0.0, 0])
+    for signo, movimientos in ((1, aplicar), (-1, revertir)):
+        for mov in movimientos:
+            if mov["estado"] != 'Confirmado':
+                continue
+            clave = (
+                mov["usuario_id"], mov["fecha"].year, mov["fecha"].month,
+                mov["tipo"], mov["categoria_id"] or 0,
+            )
+            deltas[clave][0] += signo * mov["valor"]
+            deltas[clave][1] += signo
+
+    insert_dialecto = _INSERT_POR_DIALECTO[db.get_bind().dialect.name]
+    hay_restas = False
+    for clave in sorted(deltas):
+        total, cantidad = deltas[clave]
+        if not total and not cantidad:
+            continue
+        hay_restas = hay_restas or cantidad < 0
+        stmt = insert_dialecto(AgregadoMensual).values(
+            **dict(zip(_CLAVE_AGREGADO, clave)), total=total, cantidad=cantidad
+        )
+        # Si la fila ya existe, sumamos el delta en la misma sentencia (atómico).
+        stmt = stmt.on_conflict_do_update(
+            index_elements=_CLAVE_AGREGADO,
+            set_={
+                "total": AgregadoMensual.total + stmt.excluded.total,
+                "cantidad": AgregadoMensual.cantidad + stmt.excluded.cantidad,
+            },
+        )
+        await db.execute(stmt)
+
+    # Quitamos las filas que se quedaron sin transacciones.
+    if hay_restas:
+        usuarios = {clave[0] for clave in deltas}
+        await db.execute(
+            delete(AgregadoMensual)
+            .where(AgregadoMensual.usuario_id.in_(usuarios), AgregadoMensual.cantidad <= 0)
+            .execution_options(synchronize_session=False)
+        )
+
+async def reconstruir_agregados(db: AsyncSession, usuario_id: Optional[int] = None) -> int:
+    """
+    Borra y vuelve a calcular la tabla de agregados a partir de las transacciones
+    confirmadas (de un usuario o de todos). Devuelve el número de filas generadas.
+    """
+    anio = extract('year', Transaccion.fecha)
+    mes = extract('month', Transaccion.fecha)
+    categoria = func.coalesce(Transaccion.categoria_id, literal(0))
+
+    origen = (
+        select(
+            Transaccion.usuario_id, anio, mes, Transaccion.tipo, categoria,
+            func.sum(Transaccion.valor), func.count(Transaccion.id),
+        )
+        .where(Transaccion.estado == 'Confirmado')
+        .group_by(Transaccion.usuario_id, anio, mes, Transaccion.tipo, categoria)
+    )
+    borrado = delete(AgregadoMensual)
+    if usuario_id is not None:
+        origen = origen.where(Transaccion.usuario_id == usuario_id)
+        borrado = borrado.where(AgregadoMensual.usuario_id == usuario_id)
+
+    await db.execute(borrado.execution_options(synchronize_session=False))
+    await db.execute(
+        insert(AgregadoMensual).from_select(_CLAVE_AGREGADO + ["total", "cantidad"], origen)
+    )
+    await db.commit()
+    if usuario_id is not None:
+        cache_lecturas.invalidar(usuario_id, "transacciones")
+    else:
+        cache_lecturas.invalidar_todo()
+
+    conteo = select(func.count(AgregadoMensual.id))
+    if usuario_id is not None:
+        conteo = conteo.where(AgregadoMensual.usuario_id == usuario_id)
+    return (await db.execute(conteo)).scalar_one()
@@ -2,12 +2,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import List, Optional
 import calendar
-from datetime import date
+from datetime import date, timedelta
 from app.models.transaccion import Transaccion # Importante para la validación
 from sqlalchemy.orm import selectinload # Importante para la validación
-from sqlalchemy import delete, extract
+from sqlalchemy import delete, insert, update
 from app.models.regla_recurrente import ReglaRecurrente
 from app.schemas.regla_recurrente import ReglaRecurrenteCreate, ReglaRecurrenteUpdate
+from app.services.cache import cache_lecturas
 
 # --- OBTENER REGLAS ---
 async def get_regla(db: AsyncSession, regla_id: int, usuario_id: int) -> Optional[ReglaRecurrente]:
@@ -37,10 +38,12 @@ async def get_reglas_by_usuario(db: AsyncSession, usuario_id: int, skip: int = 0
 async def create_regla(db: AsyncSession, regla: ReglaRecurrenteCreate, usuario_id: int) -> ReglaRecurrente:
     """Crea una nueva regla recurrente en la base de datos."""
     # Combina los datos del esquema con el usuario_id
-    db_regla = ReglaRecurrente(**regla.model_dump(), usuario_id=usuario_id)
-    db.add(db_regla)
+    # INSERT ... RETURNING: la regla vuelve completa sin un refresh posterior.
+    db_regla = await db.scalar(
+        insert(ReglaRecurrente).values(**regla.model_dump(), usuario_id=usuario_id).returning(ReglaRecurrente)
+    )
     await db.commit()
-    await db.refresh(db_regla)
+    cache_lecturas.invalidar(usuario_id, "reglas")
     return db_regla
 
 # --- ACTUALIZAR REGLA ---
@@ -48,13 +51,17 @@ async def update_regla(db: AsyncSession, *, db_obj: ReglaRecurrente, obj_in: Reg
     """Actualiza una regla existente con los datos proporcionados."""
     # Convierte el esquema de Pydantic a un diccionario
     update_data = obj_in.model_dump(exclude_unset=True)
-    # Itera sobre el diccionario y actualiza los campos del objeto de la base de datos
-    for field, value in update_data.items():
-        setattr(db_obj, field, value)
-
-    db.add(db_obj)
+    if not update_data:
+        return db_obj
+    # Un solo UPDATE ... RETURNING con los campos enviados
+    db_obj = await db.scalar(
+        update(ReglaRecurrente)
+        .where(ReglaRecurrente.id == db_obj.id)
+        .values(**update_data)
+        .returning(ReglaRecurrente)
+    )
     await db.commit()
-    await db.refresh(db_obj)
+    cache_lecturas.invalidar(db_obj.usuario_id, "reglas")
     return db_obj
 
 # --- ELIMINAR REGLA ---
@@ -63,84 +70,161 @@ async def delete_regla(db: AsyncSession, regla_id: int, usuario_id: int) -> Opti
     Elimina una regla de la base de datos.
     MODIFICADO: Ahora hace un "soft delete" poniendo is_active = False.
     """
-    # Primero, busca la regla para asegurarse de que existe y pertenece al usuario
-    regla = await get_regla(db, regla_id, usuario_id)
+    # Un solo UPDATE ... RETURNING que comprueba a la vez que la regla es del usuario
+    regla = await db.scalar(
+        update(ReglaRecurrente)
+        .where(ReglaRecurrente.id == regla_id, ReglaRecurrente.usuario_id == usuario_id)
+        .values(is_active=False)
+        .returning(ReglaRecurrente)
+    )
     if regla:
-        # --- LÍNEAS MODIFICADAS ---
-        regla.is_active = False  # 1. Cambiamos el estado
-        db.add(regla)            # 2. Añadimos el objeto modificado a la sesión
-        await db.commit()        # 3. Guardamos los cambios
-        await db.refresh(regla)  # 4. Refrescamos el objeto
-        # --- FIN DE LAS MODIFICACIONES ---
+        await db.commit()
+        cache_lecturas.invalidar(usuario_id, "reglas")
     return regla
 
-async def generar_transacciones_planeadas(db: AsyncSession, usuario_id: int, year: int, month: int) -> List[Transaccion]:
+def _rango_mes(year: int, month: int):
+    """
+    Devuelve el rango [inicio, fin) de un mes. Filtrar con fecha >= inicio y
+    fecha < fin permite usar los índices sobre 'fecha' (extract() no puede).
+    """
+    inicio = date(year, month, 1)
+    fin = inicio + timedelta(days=calendar.monthrange(year, month)[1])
+    return inicio, fin
+
+def expandir_regla(regla: ReglaRecurrente, desde: date, hasta: date) -> List[date]:
+    """
+    Devuelve las fechas en que una regla genera transacciones dentro de [desde, hasta].
+    - Mensual: el día 'dia' de cada mes (o el último día si el mes es más corto).
+    - Semanal: cada día de la semana 'dia' (0 = lunes ... 6 = domingo).
+    - Anual: el día 'dia' del mes 'mes' de cada año.
+    """
+    if regla.dia is None:
+        return []
+    fechas = []
+
+    if regla.frecuencia == 'Semanal':
+        # Primer día con el día de la semana correcto y, desde ahí, de 7 en 7.
+        fecha = desde + timedelta(days=(regla.dia - desde.weekday()) % 7)
+        while fecha <= hasta:
+            fechas.append(fecha)
+            fecha += timedelta(days=7)
+
+    elif regla.frecuencia in ('Mensual', 'Anual'):
+        year, month = desde.year, desde.month
+        while date(year, month, 1) <= hasta:
+            if regla.frecuencia == 'Mensual' or regla.mes == month:
+                fecha = date(year, month, min(regla.dia, calendar.monthrange(year, month)[1]))
+                if desde <= fecha <= hasta:
+                    fechas.append(fecha)
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    return fechas
+
+async def generar_transacciones_rango(db: AsyncSession, usuario_id: int, desde: date, hasta: date) -> int:
     """
-    Genera transacciones planeadas. Para cada regla, primero elimina las transacciones 
-    planeadas existentes de esa regla para ese mes y luego las recrea.
+    Genera las transacciones planeadas de todas las reglas activas del usuario entre
+    'desde' y 'hasta' (ambos incluidos).
+
+    Las fechas se expanden en memoria; luego se borran las planeadas anteriores de esas
+    reglas en el rango con un único DELETE y se insertan las nuevas con un único INSERT
+    masivo. Las transacciones planeadas no afectan saldos ni agregados (solo cuentan
+    las confirmadas), así que no hay datos derivados que ajustar.
     """
-    reglas = await get_reglas_by_usuario(db=db, usuario_id=usuario_id, limit=1000)
-    nuevas_transacciones = []
-
-    # Itera sobre cada regla para generar sus transacciones
-    for regla in reglas:
-        
-        # --- CORRECCIÓN: Lógica de borrado selectivo ---
-        # Antes de crear nuevas, borramos solo las transacciones planeadas
-        # que pertenecen a ESTA regla específica para el mes y año dados.
-        stmt = delete(Transaccion).where(
+    result = await db.execute(
+        select(ReglaRecurrente).where(
+            ReglaRecurrente.usuario_id == usuario_id,
+            ReglaRecurrente.is_active == True
+        )
+    )
+    reglas = result.scalars().all()
+    if not reglas:
+        return 0
+
+    nuevas_transacciones = [
+        {
+            "fecha": fecha,
+            "valor": regla.valor_predeterminado,
+            "tipo": regla.tipo,
+            "descripcion": regla.descripcion,
+            "estado": 'Planeado',
+            "categoria_id": regla.categoria_predeterminada_id,
+            "usuario_id": usuario_id,
+            "regla_recurrente_id": regla.id,
+        }
+        for regla in reglas
+        for fecha in expandir_regla(regla, desde, hasta)
+    ]
+
+    # Borramos solo las planeadas de las reglas activas, como hacía la versión por mes.
+    await db.execute(
+        delete(Transaccion).where(
             Transaccion.usuario_id == usuario_id,
             Transaccion.estado == 'Planeado',
-            Transaccion.regla_recurrente_id == regla.id, # La condición clave
-            extract('year', Transaccion.fecha) == year,
-            extract('month', Transaccion.fecha) == month
+            Transaccion.regla_recurrente_id.in_([regla.id for regla in reglas]),
+            Transaccion.fecha >= desde,
+            Transaccion.fecha <= hasta
         )
-        await db.execute(stmt)
-
-        # Ahora, creamos las nuevas transacciones para esta regla
-        if regla.frecuencia == 'Mensual':
-            dia = min(regla.dia, calendar.monthrange(year, month)[1])
-            fecha_transaccion = date(year, month, dia)
-            transaccion = Transaccion(
-                fecha=fecha_transaccion,
-                valor=regla.valor_predeterminado,
-                tipo=regla.tipo,
-                descripcion=f"{regla.descripcion}",
-                estado='Planeado',
-                categoria_id=regla.categoria_predeterminada_id,
-                usuario_id=usuario_id,
-                regla_recurrente_id=regla.id
-            )
-            nuevas_transacciones.append(transaccion)
-
-        elif regla.frecuencia == 'Semanal':
-            cal = calendar.Calendar()
-            for week in cal.monthdatescalendar(year, month):
-                for day in week:
-                    if day.weekday() == regla.dia and day.month == month:
-                        nuevas_transacciones.append(Transaccion(
-                            fecha=day, valor=regla.valor_predeterminado, tipo=regla.tipo,
-                            descripcion=f"{regla.descripcion}", estado='Planeado',
-                            categoria_id=regla.categoria_predeterminada_id, usuario_id=usuario_id,
-                            regla_recurrente_id=regla.id
-                        ))
-
-        elif regla.frecuencia == 'Anual':
-            if regla.mes == month:
-                dia = min(regla.dia, calendar.monthrange(year, month)[1])
-                fecha_transaccion = date(year, month, dia)
-                nuevas_transacciones.append(Transaccion(
-                    fecha=fecha_transaccion, valor=regla.valor_predeterminado, tipo=regla.tipo,
-                    descripcion=f"{regla.descripcion}", estado='Planeado',
-                    categoria_id=regla.categoria_predeterminada_id, usuario_id=usuario_id,
-                    regla_recurrente_id=regla.id
-                ))
+    )
+    if nuevas_transacciones:
+        await db.execute(insert(Transaccion), nuevas_transacciones)
+    await db.commit()
+    cache_lecturas.invalidar(usuario_id, "transacciones")
 
-    if not nuevas_transacciones:
+    return len(nuevas_transacciones)
+
+async def completar_transacciones_rango(db: AsyncSession, usuario_id: int, desde: date, hasta: date) -> int:
+    """
+    Como generar_transacciones_rango, pero sin borrar nada. Inserta solo las parejas
+    (regla, fecha) que todavía no tienen una transacción en ningún estado. Así se
+    respetan las planeadas que el usuario editó y las que ya confirmó por adelantado.
+    Es la que usa el planificador en segundo plano. Devuelve cuántas insertó.
+    """
+    result = await db.execute(
+        select(ReglaRecurrente).where(
+            ReglaRecurrente.usuario_id == usuario_id,
+            ReglaRecurrente.is_active == True
+        )
+    )
+    reglas = result.scalars().all()
+    if not reglas:
         return 0
 
-    db.add_all(nuevas_transacciones)
+    existentes = set((await db.execute(
+        select(Transaccion.regla_recurrente_id, Transaccion.fecha).where(
+            Transaccion.usuario_id == usuario_id,
+            Transaccion.regla_recurrente_id.in_([regla.id for regla in reglas]),
+            Transaccion.fecha >= desde,
+            Transaccion.fecha <= hasta
+        )
+    )).tuples())
+    nuevas_transacciones = [
+        {
+            "fecha": fecha,
+            "valor": regla.valor_predeterminado,
+            "tipo": regla.tipo,
+            "descripcion": regla.descripcion,
+            "estado": 'Planeado',
+            "categoria_id": regla.categoria_predeterminada_id,
+            "usuario_id": usuario_id,
+            "regla_recurrente_id": regla.id,
+        }
+        for regla in reglas
+        for fecha in expandir_regla(regla, desde, hasta)
+        if (regla.id, fecha) not in existentes
+    ]
+    if not nuevas_transacciones:
+        return 0
+    await db.execute(insert(Transaccion), nuevas_transacciones)
     await db.commit()
-    
-    # Simplemente devolvemos la cantidad de transacciones en la lista
-    return len(nuevas_transacciones)
\ No newline at end of file
+    cache_lecturas.invalidar(usuario_id, "transacciones")
+    return len(nuevas_transacciones)
+
+async def generar_transacciones_planeadas(db: AsyncSession, usuario_id: int, year: int, month: int) -> int:
+    """
+    Genera las transacciones planeadas de un mes. Para las reglas activas, reemplaza
+    las transacciones planeadas existentes de ese mes por las recalculadas.
+    """
+    inicio_mes, fin_mes = _rango_mes(year, month)
+    return await generar_transacciones_rango(
+        db, usuario_id=usuario_id, desde=inicio_mes, hasta=fin_mes - timedelta(days=1)
+    )
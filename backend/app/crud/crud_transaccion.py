@@ -1,13 +1,133 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-# Se importa 'selectinload' para la carga ansiosa
-from sqlalchemy.orm import selectinload 
-from sqlalchemy import func, case
+from sqlalchemy.orm import aliased
+from sqlalchemy import func, case, tuple_, Row, insert, update, delete, literal
+from pydantic import ValidationError
 from app.models.transaccion import Transaccion
-from app.schemas.transaccion import TransaccionCreate, TransaccionUpdate
+from app.schemas.transaccion import TransaccionCreate, TransaccionUpdate, TransaccionResponse, OperacionLote
+from app.schemas.cuenta import CuentaSimple
+from app.schemas.categoria import CategoriaSimple
 from app.models.cuenta import Cuenta
-from typing import List, Optional, Dict, Any
+from app.models.categoria import Categoria
+import app.crud.crud_cuenta as crud_cuenta
+import app.crud.crud_dashboard as crud_dashboard
+from app.services.cache import cache_lecturas
+from app.services.referencias import Referencias, mapa_referencias
+from typing import List, Optional, Dict, Any, Tuple, AsyncIterator, Iterable, Mapping
 from datetime import date, timedelta
+from types import SimpleNamespace
+import base64
+
+# Campos de una transacción que determinan su efecto sobre los saldos y los agregados.
+_CAMPOS_EFECTO = (
+    "estado", "valor", "tipo", "fecha", "usuario_id",
+    "cuenta_origen_id", "cuenta_destino_id", "categoria_id",
+)
+
+def _efecto(transaccion: Transaccion) -> Dict[str, Any]:
+    """Copia los campos que afectan a los datos derivados, antes de que el objeto cambie."""
+    return {campo: getattr(transaccion, campo) for campo in _CAMPOS_EFECTO}
+
+async def _ajustar_derivados(db: AsyncSession, aplicar=(), revertir=()) -> None:
+    """Mantiene los datos derivados (saldos y agregados mensuales) sin hacer commit."""
+    aplicar, revertir = list(aplicar), list(revertir)
+    await crud_cuenta.ajustar_saldos(db, aplicar=aplicar, revertir=revertir)
+    await crud_dashboard.ajustar_agregados(db, aplicar=aplicar, revertir=revertir)
+
+def _columnas_respuesta(cuenta_origen_id, cuenta_destino_id, categoria_id) -> list:
+    """
+    Columnas para el RETURNING de un INSERT/UPDATE: la fila escrita más los nombres
+    de sus cuentas y categoría. Los ids ya se conocen, así que los nombres salen de
+    subconsultas en la misma sentencia y no hace falta volver a leer la transacción.
+    """
+    def nombre(modelo, id_, etiqueta):
+        if id_ is None:
+            return literal(None).label(etiqueta)
+        return select(modelo.nombre).where(modelo.id == id_).scalar_subquery().label(etiqueta)
+
+    return [
+        *Transaccion.__table__.c,
+        nombre(Cuenta, cuenta_origen_id, "cuenta_origen_nombre"),
+        nombre(Cuenta, cuenta_destino_id, "cuenta_destino_nombre"),
+        nombre(Categoria, categoria_id, "categoria_nombre"),
+    ]
+
+def _respuesta(fila: Mapping[str, Any]) -> TransaccionResponse:
+    """Arma la respuesta de la API a partir de una fila de _columnas_respuesta."""
+    # Un id sin nombre apunta a una cuenta o categoría que ya no existe (SQLite no
+    # aplica las claves foráneas): la relación queda en None, como con selectinload.
+    datos = dict(fila)
+    for relacion in ("cuenta_origen", "cuenta_destino"):
+        nombre = datos.pop(f"{relacion}_nombre")
+        id_ = datos[f"{relacion}_id"]
+        datos[relacion] = CuentaSimple(id=id_, nombre=nombre) if id_ is not None and nombre is not None else None
+    nombre = datos.pop("categoria_nombre")
+    datos["categoria"] = CategoriaSimple(nombre=nombre) if nombre is not None else None
+    # Desde atributos, como si fuera el objeto ORM: los validadores del esquema son para la entrada.
+    return TransaccionResponse.model_validate(SimpleNamespace(**datos))
+
+def _efecto_fila(fila: Row) -> Dict[str, Any]:
+    return {campo: fila._mapping[campo] for campo in _CAMPOS_EFECTO}
+
+def respuestas_desde_filas(filas: Iterable[Mapping[str, Any]], referencias: Referencias) -> List[TransaccionResponse]:
+    """Filas de 'transacciones' -> TransaccionResponse, con los nombres del mapa de referencias."""
+    return [
+        _respuesta({
+            **fila,
+            "cuenta_origen_nombre": referencias.cuentas.get(fila["cuenta_origen_id"]),
+            "cuenta_destino_nombre": referencias.cuentas.get(fila["cuenta_destino_id"]),
+            "categoria_nombre": referencias.categorias.get(fila["categoria_id"]),
+        })
+        for fila in filas
+    ]
+
+def dicts_desde_filas(filas: Iterable[Mapping[str, Any]], referencias: Referencias) -> List[Dict[str, Any]]:
+    """
+    Igual que respuestas_desde_filas pero sin Pydantic: dicts planos listos para
+    RespuestaJSONRapida. Las claves van en el mismo orden que los campos de
+    TransaccionResponse y los floats se fuerzan a float, para que el JSON sea
+    idéntico byte a byte al del camino normal (también con ids huérfanos).
+    """
+    cuentas, categorias = referencias.cuentas, referencias.categorias
+    planas = []
+    for f in filas:
+        origen, destino = cuentas.get(f["cuenta_origen_id"]), cuentas.get(f["cuenta_destino_id"])
+        categoria = categorias.get(f["categoria_id"])
+        saldo = f.get("saldo_acumulado")
+        planas.append({
+            "fecha": f["fecha"],
+            "valor": float(f["valor"]),
+            "tipo": f["tipo"],
+            "descripcion": f["descripcion"],
+            "estado": f["estado"],
+            "cuenta_origen_id": f["cuenta_origen_id"],
+            "cuenta_destino_id": f["cuenta_destino_id"],
+            "categoria_id": f["categoria_id"],
+            "id": f["id"],
+            "usuario_id": f["usuario_id"],
+            "cuenta_origen": {"id": f["cuenta_origen_id"], "nombre": origen} if origen is not None else None,
+            "cuenta_destino": {"id": f["cuenta_destino_id"], "nombre": destino} if destino is not None else None,
+            "categoria": {"nombre": categoria} if categoria is not None else None,
+            "saldo_acumulado": float(saldo) if saldo is not None else None,
+        })
+    return planas
+
+async def _hidratar(
+    db: AsyncSession, usuario_id: int, filas: Iterable[Mapping[str, Any]], como_dict: bool = False
+) -> List[Any]:
+    """
+    Convierte filas de la tabla 'transacciones' en respuestas de la API, poniendo los
+    nombres de cuentas y categoría desde el mapa de referencias del usuario
+    (sin selectinload: la lista cuesta la consulta de las filas y nada más).
+    Con 'como_dict' devuelve dicts planos en lugar de modelos Pydantic.
+    """
+    filas = list(filas)
+    ids_cuentas = {f[c] for f in filas for c in ("cuenta_origen_id", "cuenta_destino_id") if f[c] is not None}
+    ids_categorias = {f["categoria_id"] for f in filas if f["categoria_id"] is not None}
+    referencias = await mapa_referencias.obtener(db, usuario_id, ids_cuentas, ids_categorias)
+    if como_dict:
+        return dicts_desde_filas(filas, referencias)
+    return respuestas_desde_filas(filas, referencias)
 
 async def get_transaccion(db: AsyncSession, transaccion_id: int, usuario_id: int) -> Optional[Transaccion]:
     result = await db.execute(
@@ -15,101 +135,125 @@ async def get_transaccion(db: AsyncSession, transaccion_id: int, usuario_id: int
             Transaccion.id == transaccion_id,
             Transaccion.usuario_id == usuario_id
         )
-        .options(
-            selectinload(Transaccion.cuenta_origen), 
-            selectinload(Transaccion.cuenta_destino),
-            selectinload(Transaccion.categoria)
-        )
     )
     return result.scalar_one_or_none()
 
-async def get_transacciones_by_usuario(db: AsyncSession, usuario_id: int, skip=0, limit=100):
-    # Se utiliza .options(selectinload(...)) para cargar las cuentas
-    # relacionadas en la misma consulta y evitar el error de carga perezosa.
+async def get_transaccion_respuesta(db: AsyncSession, transaccion_id: int, usuario_id: int) -> Optional[TransaccionResponse]:
+    """Como get_transaccion, pero ya lista para la API con los nombres de cuentas y categoría."""
+    result = await db.execute(
+        select(Transaccion.__table__).where(
+            Transaccion.id == transaccion_id,
+            Transaccion.usuario_id == usuario_id
+        )
+    )
+    fila = result.mappings().one_or_none()
+    if fila is None:
+        return None
+    return (await _hidratar(db, usuario_id, [fila]))[0]
+
+async def get_transacciones_by_usuario(db: AsyncSession, usuario_id: int, skip=0, limit=100) -> List[TransaccionResponse]:
     query = (
-        select(Transaccion)
+        select(Transaccion.__table__)
         .where(Transaccion.usuario_id == usuario_id)
-        .options(
-            selectinload(Transaccion.cuenta_origen), 
-            selectinload(Transaccion.cuenta_destino),
-            selectinload(Transaccion.categoria)
-        )
         .order_by(Transaccion.fecha.desc())
         .offset(skip)
         .limit(limit)
     )
     result = await db.execute(query)
-    return result.scalars().all()
+    return await _hidratar(db, usuario_id, result.mappings())
 
-# La función de crear ahora también necesita cargar las relaciones antes de devolver.
-async def create_transaccion(db: AsyncSession, transaccion: TransaccionCreate, usuario_id: int) -> Transaccion:
-    db_transaccion = Transaccion(
-        **transaccion.model_dump(),
-        usuario_id=usuario_id
-    )
-    db.add(db_transaccion)
-    await db.commit()
-    await db.refresh(db_transaccion)
-
-    # Después de crear, volvemos a consultar la transacción con sus
-    # relaciones cargadas para evitar el error 'MissingGreenlet' en la respuesta.
-    result = await db.execute(
-        select(Transaccion)
-        .where(Transaccion.id == db_transaccion.id)
-        .options(
-            selectinload(Transaccion.cuenta_origen),
-            selectinload(Transaccion.cuenta_destino),
-            selectinload(Transaccion.categoria)
+async def referencias_invalidas(db: AsyncSession, usuario_id: int, datos: Mapping[str, Any]) -> List[str]:
+    """
+    Comprueba que las cuentas y la categoría de 'datos' existan y sean del usuario
+    (SQLite no aplica las claves foráneas). Devuelve un mensaje por cada una que no,
+    con los mismos textos que aplicar_lote. Solo mira los campos presentes en 'datos'.
+    """
+    ids_cuentas = {datos.get(campo) for campo in ("cuenta_origen_id", "cuenta_destino_id")} - {None}
+    errores = []
+    if ids_cuentas:
+        propias = set((await db.execute(
+            select(Cuenta.id).where(Cuenta.id.in_(ids_cuentas), Cuenta.usuario_id == usuario_id)
+        )).scalars())
+        errores += [f"La cuenta {id_} no existe." for id_ in sorted(ids_cuentas - propias)]
+    categoria_id = datos.get("categoria_id")
+    if categoria_id is not None:
+        propia = await db.scalar(
+            select(Categoria.id).where(Categoria.id == categoria_id, Categoria.usuario_id == usuario_id)
         )
-    )
-    return result.scalar_one()
+        if propia is None:
+            errores.append(f"La categoría {categoria_id} no existe.")
+    return errores
 
-async def delete_transaccion(db: AsyncSession, transaccion_id: int, usuario_id: int):
-    result = await db.execute(
-        select(Transaccion).where(
+async def create_transaccion(db: AsyncSession, transaccion: TransaccionCreate, usuario_id: int) -> TransaccionResponse:
+    """
+    INSERT ... RETURNING con los nombres de cuentas y categoría: la respuesta sale
+    de la misma sentencia, sin refresh ni nuevo SELECT con selectinload.
+    """
+    datos = transaccion.model_dump()
+    fila = (await db.execute(
+        insert(Transaccion.__table__)
+        .values(**datos, usuario_id=usuario_id)
+        .returning(*_columnas_respuesta(datos["cuenta_origen_id"], datos["cuenta_destino_id"], datos["categoria_id"]))
+    )).one()
+    # Los saldos y agregados se ajustan en la misma transacción que el INSERT.
+    await _ajustar_derivados(db, aplicar=[_efecto_fila(fila)])
+    # La respuesta se arma antes del commit: si fallara, no queda nada escrito.
+    respuesta = _respuesta(fila._mapping)
+    await db.commit()
+    cache_lecturas.invalidar(usuario_id, "transacciones")
+    return respuesta
+
+async def delete_transaccion(db: AsyncSession, transaccion_id: int, usuario_id: int) -> bool:
+    """Borra con DELETE ... RETURNING (sin leerla antes). Devuelve False si no existía."""
+    fila = (await db.execute(
+        delete(Transaccion.__table__)
+        .where(
             Transaccion.id == transaccion_id,
             Transaccion.usuario_id == usuario_id
         )
-    )
-    transaccion = result.scalar_one_or_none()
-    if transaccion:
-        await db.delete(transaccion)
-        await db.commit()
+        .returning(*(Transaccion.__table__.c[campo] for campo in _CAMPOS_EFECTO))
+    )).one_or_none()
+    if fila is None:
+        return False
+    await _ajustar_derivados(db, revertir=[_efecto_fila(fila)])
+    await db.commit()
+    cache_lecturas.invalidar(usuario_id, "transacciones")
+    return True
 
 # La función de actualizar
-async def update_transaccion(db: AsyncSession, *, db_obj: Transaccion, obj_in: TransaccionUpdate) -> Transaccion:
+async def update_transaccion(db: AsyncSession, *, db_obj: Transaccion, obj_in: TransaccionUpdate) -> TransaccionResponse:
+    """
+    UPDATE ... RETURNING. 'db_obj' solo se usa para conocer el efecto anterior,
+    no hace falta que traiga sus relaciones cargadas.
+    """
     obj_data = obj_in.model_dump(exclude_unset=True)
-    for field in obj_data:
-        setattr(db_obj, field, obj_data[field])
-    db.add(db_obj)
-    await db.commit()
-    await db.refresh(db_obj)
-    
-    # --- CORRECCIÓN CLAVE ---
-    # También aplicamos la misma lógica de recarga aquí después de actualizar.
-    # Esto asegura que la respuesta a la API siempre incluya las relaciones.
-    result = await db.execute(
-        select(Transaccion)
+    # Guardamos el efecto anterior para revertirlo; esto cubre también
+    # el paso de 'Planeado' a 'Confirmado' y viceversa.
+    antes = _efecto(db_obj)
+    ids = {campo: obj_data.get(campo, getattr(db_obj, campo))
+           for campo in ("cuenta_origen_id", "cuenta_destino_id", "categoria_id")}
+    columnas = _columnas_respuesta(ids["cuenta_origen_id"], ids["cuenta_destino_id"], ids["categoria_id"])
+    if not obj_data:
+        fila = (await db.execute(select(*columnas).where(Transaccion.id == db_obj.id))).one()
+        return _respuesta(fila._mapping)
+
+    fila = (await db.execute(
+        update(Transaccion.__table__)
         .where(Transaccion.id == db_obj.id)
-        .options(
-            selectinload(Transaccion.cuenta_origen),
-            selectinload(Transaccion.cuenta_destino),
-            selectinload(Transaccion.categoria)
-        )
-    )
-    return result.scalar_one()
+        .values(**obj_data)
+        .returning(*columnas)
+    )).one()
+    await _ajustar_derivados(db, aplicar=[_efecto_fila(fila)], revertir=[antes])
+    respuesta = _respuesta(fila._mapping)
+    await db.commit()
+    cache_lecturas.invalidar(db_obj.usuario_id, "transacciones")
+    return respuesta
 
-async def get_transactions_with_starting_balance(
-    db: AsyncSession, 
-    usuario_id: int, 
-    start_date: date, 
-    end_date: date
-) -> Dict[str, Any]:
+async def _saldo_antes_de(db: AsyncSession, usuario_id: int, start_date: date) -> float:
     """
-    Obtiene todas las transacciones dentro de un rango de fechas y calcula
-    el saldo total del usuario justo antes de la fecha de inicio.
+    Calcula el saldo total del usuario justo antes de 'start_date':
+    saldos iniciales de sus cuentas más ingresos y menos gastos confirmados previos.
     """
-    # 1. Calcular el saldo inicial del período
     # Fecha del día anterior a la fecha de inicio
     previous_day = start_date - timedelta(days=1)
 
@@ -135,24 +279,83 @@ async def get_transactions_with_starting_balance(
     balance_change_result = await db.execute(balance_change_query)
     balance_change = balance_change_result.scalar_one_or_none() or 0.0
 
-    starting_balance = total_saldo_inicial + balance_change
+    return total_saldo_inicial + balance_change
+
+async def _saldo_cuenta_antes_de(db: AsyncSession, cuenta: Cuenta, start_date: date) -> float:
+    """
+    Saldo de una cuenta justo antes de 'start_date': su saldo inicial más
+    entradas y menos salidas confirmadas previas (las transferencias cuentan).
+    """
+    cambio = select(
+        func.sum(
+            case(
+                (Transaccion.cuenta_destino_id == cuenta.id, Transaccion.valor),
+                else_=-Transaccion.valor
+            )
+        )
+    ).where(
+        Transaccion.estado == 'Confirmado',
+        Transaccion.fecha < start_date,
+        (Transaccion.cuenta_origen_id == cuenta.id) | (Transaccion.cuenta_destino_id == cuenta.id)
+    )
+    return cuenta.saldo_inicial + ((await db.execute(cambio)).scalar_one_or_none() or 0.0)
+
+async def get_transactions_with_starting_balance(
+    db: AsyncSession, 
+    usuario_id: int, 
+    start_date: date, 
+    end_date: date,
+    cuenta: Optional[Cuenta] = None,
+    como_dict: bool = False
+) -> Dict[str, Any]:
+    """
+    Obtiene todas las transacciones dentro de un rango de fechas y calcula
+    el saldo total del usuario justo antes de la fecha de inicio.
 
-    # 2. Obtener las transacciones del período solicitado
+    Cada transacción lleva además 'saldo_acumulado': el saldo después de ella,
+    calculado en la misma consulta con SUM(...) OVER (ORDER BY fecha, id).
+    Como hacía el historial en el navegador, dentro del período cuentan todas
+    las transacciones (también las planeadas).
+
+    Si se indica 'cuenta', solo se devuelven las transacciones de esa cuenta y
+    tanto el saldo inicial como el acumulado son los de la cuenta.
+    Con 'como_dict' las transacciones son dicts planos (camino de serialización rápida).
+    """
+    # 1. Calcular el saldo inicial del período y el efecto de cada transacción
+    if cuenta is None:
+        starting_balance = await _saldo_antes_de(db, usuario_id, start_date)
+        efecto = case(
+            (Transaccion.tipo == 'Ingreso', Transaccion.valor),
+            (Transaccion.tipo == 'Gasto', -Transaccion.valor),
+            else_=0
+        )
+        filtro_cuenta = True
+    else:
+        starting_balance = await _saldo_cuenta_antes_de(db, cuenta, start_date)
+        efecto = case(
+            (Transaccion.cuenta_destino_id == cuenta.id, Transaccion.valor),
+            else_=-Transaccion.valor
+        )
+        filtro_cuenta = (Transaccion.cuenta_origen_id == cuenta.id) | (Transaccion.cuenta_destino_id == cuenta.id)
+
+    # 2. Obtener las transacciones del período con su saldo acumulado
+    acumulado = func.sum(efecto).over(order_by=(Transaccion.fecha, Transaccion.id))
     transactions_query = (
-        select(Transaccion)
+        select(Transaccion.__table__, acumulado.label("acumulado"))
         .where(
             Transaccion.usuario_id == usuario_id,
-            Transaccion.fecha.between(start_date, end_date)
-        )
-        .options(
-            selectinload(Transaccion.cuenta_origen),
-            selectinload(Transaccion.cuenta_destino),
-            selectinload(Transaccion.categoria)
+            Transaccion.fecha.between(start_date, end_date),
+            filtro_cuenta
         )
         .order_by(Transaccion.fecha.desc(), Transaccion.id.desc())
     )
     transactions_result = await db.execute(transactions_query)
-    transactions = transactions_result.scalars().all()
+    filas = []
+    for fila in transactions_result.mappings():
+        fila = dict(fila)
+        fila["saldo_acumulado"] = starting_balance + (fila.pop("acumulado") or 0.0)
+        filas.append(fila)
+    transactions = await _hidratar(db, usuario_id, filas, como_dict)
 
     # 3. Devolver el paquete completo de datos
     return {
@@ -160,20 +363,328 @@ async def get_transactions_with_starting_balance(
         "transacciones": transactions
     }
 
-async def get_latest_confirmed_transactions(db: AsyncSession, usuario_id: int, limit: int = 10) -> List[Transaccion]:
+@cache_lecturas.cacheado("transacciones", "cuentas", "categorias", esquema=List[TransaccionResponse])
+async def get_latest_confirmed_transactions(db: AsyncSession, usuario_id: int, limit: int = 10) -> List[TransaccionResponse]:
     """
     Obtiene las últimas N transacciones confirmadas para el resumen del dashboard.
     """
     query = (
-        select(Transaccion)
+        select(Transaccion.__table__)
         .where(Transaccion.usuario_id == usuario_id, Transaccion.estado == 'Confirmado')
-        .options(
-            selectinload(Transaccion.cuenta_origen),
-            selectinload(Transaccion.cuenta_destino),
-            selectinload(Transaccion.categoria)
-        )
         .order_by(Transaccion.fecha.desc(), Transaccion.id.desc())
         .limit(limit)
     )
     result = await db.execute(query)
-    return result.scalars().all()
\ No newline at end of file
+    return await _hidratar(db, usuario_id, result.mappings())
+
+# --- PAGINACIÓN POR CURSOR (KEYSET) ---
+
+def codificar_cursor(fecha: date, transaccion_id: int) -> str:
+    """Convierte la clave de orden (fecha, id) de la última fila en un cursor opaco."""
+    crudo = f"{fecha.isoformat()}|{transaccion_id}".encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+class CursorInvalido(ValueError):
+    pass
+
+def decodificar_cursor(cursor: str) -> Tuple[date, int]:
+    """Inverso de codificar_cursor. Lanza CursorInvalido si el cursor no es válido."""
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        fecha, transaccion_id = base64.urlsafe_b64decode(cursor + relleno).decode().split("|")
+        return date.fromisoformat(fecha), int(transaccion_id)
+    except Exception as e:
+        raise CursorInvalido("Cursor de paginación inválido.") from e
+
+async def get_transacciones_pagina(
+    db: AsyncSession,
+    usuario_id: int,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    como_dict: bool = False,
+) -> Dict[str, Any]:
+    """
+    Devuelve una página de transacciones ordenadas por (fecha DESC, id DESC).
+
+    En lugar de OFFSET se filtra por la clave de la última fila de la página anterior,
+    así que cada página es un solo recorrido del índice (usuario_id, fecha, id) y
+    cuesta lo mismo sin importar lo profundo que se pagine.
+    En la primera página (sin cursor) y con 'start_date', incluye además el
+    'saldo_inicial_periodo', con la misma semántica que get_transactions_with_starting_balance.
+    """
+    query = (
+        select(Transaccion.__table__)
+        .where(Transaccion.usuario_id == usuario_id)
+        .order_by(Transaccion.fecha.desc(), Transaccion.id.desc())
+        .limit(limit + 1) # Pedimos una fila extra para saber si hay más páginas
+    )
+    if start_date is not None:
+        query = query.where(Transaccion.fecha >= start_date)
+    if end_date is not None:
+        query = query.where(Transaccion.fecha <= end_date)
+    if cursor is not None:
+        fecha_cursor, id_cursor = decodificar_cursor(cursor)
+        query = query.where(tuple_(Transaccion.fecha, Transaccion.id) < tuple_(fecha_cursor, id_cursor))
+
+    result = await db.execute(query)
+    filas = result.mappings().all()
+
+    next_cursor = None
+    if len(filas) > limit:
+        filas = filas[:limit]
+        ultima = filas[-1]
+        next_cursor = codificar_cursor(ultima["fecha"], ultima["id"])
+    transacciones = await _hidratar(db, usuario_id, filas, como_dict)
+
+    saldo_inicial_periodo = None
+    if cursor is None and start_date is not None:
+        saldo_inicial_periodo = await _saldo_antes_de(db, usuario_id, start_date)
+
+    return {
+        "saldo_inicial_periodo": saldo_inicial_periodo,
+        "transacciones": transacciones,
+        "next_cursor": next_cursor,
+    }
+
+# --- EXPORTACIÓN ---
+
+async def stream_transacciones(
+    db: AsyncSession,
+    usuario_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    tamano_lote: int = 1000,
+) -> AsyncIterator[Row]:
+    """
+    Recorre las transacciones del usuario (de la más antigua a la más reciente)
+    con un cursor del lado del servidor, trayendo 'tamano_lote' filas por viaje.
+    Devuelve filas planas con los nombres de cuentas y categoría ya resueltos
+    mediante JOIN, sin construir objetos ORM, para que la memoria no crezca
+    con el tamaño del historial.
+    """
+    origen = aliased(Cuenta)
+    destino = aliased(Cuenta)
+    query = (
+        select(
+            Transaccion.id,
+            Transaccion.fecha,
+            Transaccion.tipo,
+            Transaccion.estado,
+            Transaccion.valor,
+            Transaccion.descripcion,
+            origen.nombre.label("cuenta_origen"),
+            destino.nombre.label("cuenta_destino"),
+            Categoria.nombre.label("categoria"),
+        )
+        .outerjoin(origen, Transaccion.cuenta_origen_id == origen.id)
+        .outerjoin(destino, Transaccion.cuenta_destino_id == destino.id)
+        .outerjoin(Categoria, Transaccion.categoria_id == Categoria.id)
+        .where(Transaccion.usuario_id == usuario_id)
+        .order_by(Transaccion.fecha, Transaccion.id)
+        .execution_options(yield_per=tamano_lote)
+    )
+    if start_date is not None:
+        query = query.where(Transaccion.fecha >= start_date)
+    if end_date is not None:
+        query = query.where(Transaccion.fecha <= end_date)
+
+    result = await db.stream(query)
+    async for fila in result:
+        yield fila
+
+# --- IMPORTACIÓN MASIVA ---
+
+# Máximo de errores detallados que se devuelven; el resto solo se cuentan.
+MAX_ERRORES_REPORTADOS = 1000
+
+def _mensaje_validacion(error: ValidationError) -> str:
+    return "; ".join(e["msg"].removeprefix("Value error, ") for e in error.errors())
+
+async def importar_transacciones(
+    db: AsyncSession,
+    usuario_id: int,
+    filas: AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]],
+    tamano_lote: int = 5000,
+) -> Dict[str, Any]:
+    """
+    Inserta en lote las transacciones leídas de un extracto ('filas' es un iterador
+    async, p. ej. import_service.leer_en_hilo).
+
+    Cada fila se valida con las mismas reglas de TransaccionCreate; las válidas se
+    insertan en lotes de 'tamano_lote' filas por viaje a la base de datos, y las
+    inválidas se devuelven en el reporte de errores con su número de fila.
+    Todo ocurre en una sola transacción: saldos y agregados se ajustan una vez
+    por lote y se hace un único commit al final.
+    """
+    categorias_result = await db.execute(select(Categoria.id).where(Categoria.usuario_id == usuario_id))
+    categorias_usuario = set(categorias_result.scalars().all())
+
+    importadas = 0
+    total_errores = 0
+    errores: List[Dict[str, Any]] = []
+    lote: List[Dict[str, Any]] = []
+
+    def registrar_error(fila: int, mensaje: str):
+        nonlocal total_errores
+        total_errores += 1
+        if len(errores) < MAX_ERRORES_REPORTADOS:
+            errores.append({"fila": fila, "error": mensaje})
+
+    async def volcar_lote():
+        nonlocal importadas, lote
+        if lote:
+            await db.execute(insert(Transaccion), lote)
+            await _ajustar_derivados(db, aplicar=lote)
+            importadas += len(lote)
+            lote = []
+
+    async for numero, datos, error in filas:
+        if error is not None:
+            registrar_error(numero, error)
+            continue
+        try:
+            transaccion = TransaccionCreate(**datos)
+        except ValidationError as e:
+            registrar_error(numero, _mensaje_validacion(e))
+            continue
+        if transaccion.categoria_id is not None and transaccion.categoria_id not in categorias_usuario:
+            registrar_error(numero, f"La categoría {transaccion.categoria_id} no existe.")
+            continue
+
+        lote.append({**transaccion.model_dump(), "usuario_id": usuario_id})
+        if len(lote) >= tamano_lote:
+            await volcar_lote()
+
+    await volcar_lote()
+    await db.commit()
+    if importadas:
+        cache_lecturas.invalidar(usuario_id, "transacciones")
+
+    return {"importadas": importadas, "total_errores": total_errores, "errores": errores}
+
+
+# --- OPERACIONES EN LOTE ---
+
+# Campos que se escriben al crear o actualizar desde un lote.
+_CAMPOS_ESCRIBIBLES = tuple(TransaccionCreate.model_fields)
+
+async def aplicar_lote(db: AsyncSession, usuario_id: int, operaciones: List[OperacionLote]) -> Dict[str, Any]:
+    """
+    Crea, actualiza y elimina varias transacciones en una sola transacción de base de datos.
+
+    Primero se validan todas las operaciones (reglas de TransaccionCreate sobre el
+    resultado final, que las transacciones, cuentas y categorías sean del usuario y
+    que ningún id se repita). Si alguna falla no se escribe nada y se devuelven
+    los errores con el índice de cada operación.
+
+    Si todas son válidas se aplican con sentencias de conjunto: un DELETE ... IN,
+    un UPDATE por clave primaria en executemany y un INSERT ... RETURNING en
+    executemany; los saldos y agregados se ajustan una sola vez y hay un único commit.
+    """
+    errores: List[Dict[str, Any]] = []
+
+    ids = [op.id for op in operaciones if op.operacion != "crear" and op.id is not None]
+    existentes: Dict[int, Dict[str, Any]] = {}
+    if ids:
+        result = await db.execute(
+            select(Transaccion.__table__).where(Transaccion.id.in_(ids), Transaccion.usuario_id == usuario_id)
+        )
+        existentes = {fila.id: dict(fila._mapping) for fila in result}
+    cuentas = dict((await db.execute(
+        select(Cuenta.id, Cuenta.nombre).where(Cuenta.usuario_id == usuario_id))).tuples().all())
+    categorias = dict((await db.execute(
+        select(Categoria.id, Categoria.nombre).where(Categoria.usuario_id == usuario_id))).tuples().all())
+
+    crear: List[Tuple[int, Dict[str, Any]]] = []
+    actualizar: List[Tuple[int, Dict[str, Any], Dict[str, Any]]] = []  # (indice, antes, después)
+    eliminar: List[Tuple[int, Dict[str, Any]]] = []
+    vistos = set()
+
+    for indice, op in enumerate(operaciones):
+        if op.operacion != "crear":
+            if op.id is None:
+                errores.append({"indice": indice, "error": f"La operación '{op.operacion}' necesita 'id'."})
+                continue
+            if op.id in vistos:
+                errores.append({"indice": indice, "error": f"La transacción {op.id} aparece más de una vez en el lote."})
+                continue
+            vistos.add(op.id)
+            if op.id not in existentes:
+                errores.append({"indice": indice, "error": f"La transacción {op.id} no existe."})
+                continue
+            if op.operacion == "eliminar":
+                eliminar.append((indice, existentes[op.id]))
+                continue
+
+        # crear / actualizar: se valida la transacción completa tal como quedará.
+        base = {} if op.operacion == "crear" else {k: existentes[op.id][k] for k in _CAMPOS_ESCRIBIBLES}
+        try:
+            datos = TransaccionCreate(**{**base, **(op.datos or {})}).model_dump()
+        except ValidationError as e:
+            errores.append({"indice": indice, "error": _mensaje_validacion(e)})
+            continue
+        ajenos = [f"La cuenta {datos[campo]} no existe."
+                  for campo in ("cuenta_origen_id", "cuenta_destino_id")
+                  if datos[campo] is not None and datos[campo] not in cuentas]
+        if datos["categoria_id"] is not None and datos["categoria_id"] not in categorias:
+            ajenos.append(f"La categoría {datos['categoria_id']} no existe.")
+        if ajenos:
+            errores.append({"indice": indice, "error": " ".join(ajenos)})
+            continue
+
+        datos["usuario_id"] = usuario_id
+        if op.operacion == "crear":
+            crear.append((indice, datos))
+        else:
+            actualizar.append((indice, existentes[op.id], {**existentes[op.id], **datos}))
+
+    if errores:
+        return {"aplicadas": 0, "resultados": [], "errores": errores}
+
+    if eliminar:
+        await db.execute(
+            delete(Transaccion.__table__).where(
+                Transaccion.id.in_([antes["id"] for _, antes in eliminar]),
+                Transaccion.usuario_id == usuario_id
+            )
+        )
+    if actualizar:
+        # UPDATE por clave primaria: una sentencia ejecutada con todas las filas.
+        await db.execute(
+            update(Transaccion),
+            [{"id": despues["id"], **{k: despues[k] for k in _CAMPOS_ESCRIBIBLES}} for _, _, despues in actualizar]
+        )
+    if crear:
+        nuevos_ids = (await db.execute(
+            insert(Transaccion.__table__).returning(Transaccion.id, sort_by_parameter_order=True),
+            [datos for _, datos in crear]
+        )).scalars().all()
+        for (_, datos), nuevo_id in zip(crear, nuevos_ids):
+            datos["id"] = nuevo_id
+
+    await _ajustar_derivados(
+        db,
+        aplicar=[datos for _, datos in crear] + [despues for _, _, despues in actualizar],
+        revertir=[antes for _, antes, _ in actualizar] + [antes for _, antes in eliminar],
+    )
+    await db.commit()
+    cache_lecturas.invalidar(usuario_id, "transacciones")
+
+    def respuesta(datos: Dict[str, Any]) -> TransaccionResponse:
+        # Los nombres ya se leyeron al validar: no hace falta volver a consultar.
+        return _respuesta({
+            **datos,
+            "cuenta_origen_nombre": cuentas.get(datos["cuenta_origen_id"]),
+            "cuenta_destino_nombre": cuentas.get(datos["cuenta_destino_id"]),
+            "categoria_nombre": categorias.get(datos["categoria_id"]),
+        })
+
+    resultados = (
+        [{"indice": i, "operacion": "crear", "id": d["id"], "transaccion": respuesta(d)} for i, d in crear]
+        + [{"indice": i, "operacion": "actualizar", "id": d["id"], "transaccion": respuesta(d)} for i, _, d in actualizar]
+        + [{"indice": i, "operacion": "eliminar", "id": a["id"]} for i, a in eliminar]
+    )
+    resultados.sort(key=lambda r: r["indice"])
+    return {"aplicadas": len(resultados), "resultados": resultados, "errores": []}
@@ -6,6 +6,7 @@ from typing import List, Optional
 
 from app.models.usuario import User
 from app.schemas.usuario import AdminUserUpdate # Usaremos un schema especial para el admin
+from app.auth.cache_usuarios import cache_usuarios
 
 
 async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[User]:
@@ -40,5 +41,7 @@ async def update_user_by_admin(db: AsyncSession, *, db_obj: User, obj_in: AdminU
 
     db.add(db_obj)
     await db.commit()
+    # Que el cambio (p. ej. desactivar al usuario) se note ya en su próxima petición.
+    cache_usuarios.invalidar(db_obj.id)
     await db.refresh(db_obj)
     return db_obj
\ No newline at end of file
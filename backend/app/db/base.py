@@ -3,4 +3,7 @@ from app.models.usuario import User
 from app.models.cuenta import Cuenta
 from app.models.categoria import Categoria
 from app.models.transaccion import Transaccion
-from app.models.regla_recurrente import ReglaRecurrente
\ No newline at end of file
+from app.models.regla_recurrente import ReglaRecurrente
+from app.models.agregado_mensual import AgregadoMensual
+from app.models.generacion_programada import GeneracionProgramada
+from app.models.correo_saliente import CorreoSaliente
\ No newline at end of file
@@ -1,26 +1,211 @@
 import os
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import threading
+import time
+from typing import Any, Dict, Optional
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from dotenv import load_dotenv
 
 # Cargar las variables de entorno desde .env
 load_dotenv()
 
-DATABASE_URL = os.getenv("DATABASE_URL")
-# Asegúrate que la url es tipo 'sqlite+aiosqlite:///ruta' o 'postgresql+asyncpg://...'
+# El engine y la fábrica de sesiones se crean la primera vez que se piden, no al importar.
+# Así importar la app (tests, scripts, arranque de workers) no lee DATABASE_URL ni
+# carga el driver de la base de datos. El lifespan de main.py los crea al arrancar
+# y cierra el engine al apagar.
+_engine: Optional[AsyncEngine] = None
+_async_session: Optional[sessionmaker] = None
 
-if DATABASE_URL and DATABASE_URL.startswith("postgresql://"):
-    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
 
-engine = create_async_engine(
-    DATABASE_URL, echo=False  # Puedes quitar echo=True en producción
-)
-async_session = sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False
-)
+def get_database_url() -> str:
+    database_url = os.getenv("DATABASE_URL")
+    # Asegúrate que la url es tipo 'sqlite+aiosqlite:///ruta' o 'postgresql+asyncpg://...'
+    if not database_url:
+        raise RuntimeError("La variable de entorno DATABASE_URL es necesaria.")
+    if database_url.startswith("postgresql://"):
+        database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return database_url
+
+
+class PoolInstrumentado(AsyncAdaptedQueuePool):
+    """
+    Pool de conexiones que además cuenta cuántas veces hubo que esperar por una
+    conexión libre, cuánto se esperó y cuántas esperas acabaron en timeout.
+    Sirve para dimensionar DB_POOL_SIZE / DB_MAX_OVERFLOW frente a max_connections.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock_estadisticas = threading.Lock()
+        self.peticiones = 0
+        self.esperas = 0
+        self.timeouts = 0
+        self.espera_total_segundos = 0.0
+        self.espera_max_segundos = 0.0
+        self._en_vuelo = 0
+
+    def _do_get(self):
+        # Hay espera si las conexiones en uso más las que ya se están pidiendo cubren
+        # todo lo que el pool puede abrir. Con asyncio varias peticiones entran aquí
+        # antes de que ninguna obtenga su conexión, por eso se cuentan las "en vuelo".
+        with self._lock_estadisticas:
+            saturado = (
+                self._max_overflow > -1
+                and self.checkedout() + self._en_vuelo >= self.size() + self._max_overflow
+            )
+            self._en_vuelo += 1
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._lock_estadisticas:
+                self.timeouts += 1
+            raise
+        finally:
+            with self._lock_estadisticas:
+                self._en_vuelo -= 1
+                self.peticiones += 1
+                if saturado:
+                    espera = time.perf_counter() - inicio
+                    self.esperas += 1
+                    self.espera_total_segundos += espera
+                    self.espera_max_segundos = max(self.espera_max_segundos, espera)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        return {
+            "tamano": self.size(),
+            "max_overflow": self._max_overflow,
+            "timeout_segundos": self._timeout,
+            "en_uso": self.checkedout(),
+            "libres": self.checkedin(),
+            "overflow": self.overflow(),
+            "peticiones": self.peticiones,
+            "esperas": self.esperas,
+            "timeouts": self.timeouts,
+            "espera_media_ms": round(self.espera_total_segundos / self.esperas * 1000, 2) if self.esperas else 0.0,
+            "espera_max_ms": round(self.espera_max_segundos * 1000, 2),
+        }
+
+
+def _env_bool(nombre: str, defecto: str) -> bool:
+    return os.getenv(nombre, defecto).lower() == "true"
+
+
+def _opciones_engine(database_url: str) -> Dict[str, Any]:
+    """
+    Opciones del engine según la base de datos, configurables por variables de entorno.
+
+    Postgres: DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING y DB_STATEMENT_CACHE_SIZE (caché de sentencias preparadas de
+    asyncpg por conexión; 0 para usar pgbouncer en modo transacción).
+    Cada worker abre hasta DB_POOL_SIZE + DB_MAX_OVERFLOW conexiones: la suma de todos
+    los workers debe quedar por debajo de max_connections de Postgres.
+
+    SQLite: un solo archivo y un solo escritor, así que un pool pequeño, espera
+    larga ante bloqueos (DB_SQLITE_TIMEOUT) y modo WAL (DB_SQLITE_WAL).
+    """
+    opciones: Dict[str, Any] = {
+        "echo": False,  # Puedes quitar echo=True en producción
+        "poolclass": PoolInstrumentado,
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+    }
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            # En memoria cada conexión sería una base distinta: dejamos el pool por defecto (StaticPool).
+            return {"echo": False}
+        opciones.update(
+            pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "5")),
+            connect_args={"timeout": float(os.getenv("DB_SQLITE_TIMEOUT", "30"))},
+        )
+        return opciones
+
+    cache_sentencias = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+    opciones.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        pool_pre_ping=_env_bool("DB_POOL_PRE_PING", "true"),
+        connect_args={
+            # Caché del adaptador de SQLAlchemy y caché propia de asyncpg.
+            "prepared_statement_cache_size": cache_sentencias,
+            "statement_cache_size": cache_sentencias,
+        },
+    )
+    return opciones
+
+
+def _configurar_sqlite(engine: AsyncEngine, database_url: str) -> None:
+    """Pragmas de cada conexión SQLite nueva."""
+    en_memoria = make_url(database_url).database in (None, "", ":memory:")
+    if en_memoria or not _env_bool("DB_SQLITE_WAL", "true"):
+        return
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _pragmas(dbapi_connection, connection_record):
+        # WAL deja leer mientras otra conexión escribe.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+
+def get_engine() -> AsyncEngine:
+    global _engine
+    if _engine is None:
+        database_url = get_database_url()
+        _engine = create_async_engine(database_url, **_opciones_engine(database_url))
+        if _engine.dialect.name == "sqlite":
+            _configurar_sqlite(_engine, database_url)
+        # Tiempo y número de sentencias SQL por petición para /metrics.
+        from app.services.metricas import instrumentar_engine
+        instrumentar_engine(_engine)
+    return _engine
+
+
+def estadisticas_pool() -> Dict[str, Any]:
+    """Estado del pool de conexiones del engine de la app (si ya se creó)."""
+    if _engine is None:
+        return {"engine": "sin crear"}
+    pool = _engine.pool
+    if isinstance(pool, PoolInstrumentado):
+        return {"dialecto": _engine.dialect.name, **pool.estadisticas()}
+    return {"dialecto": _engine.dialect.name, "estado": pool.status()}
+
+
+def get_sessionmaker() -> sessionmaker:
+    global _async_session
+    if _async_session is None:
+        _async_session = sessionmaker(
+            bind=get_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False
+        )
+    return _async_session
+
+
+async def dispose_engine() -> None:
+    """Cierra las conexiones del pool. La próxima vez que se pida, se crea de nuevo."""
+    global _engine, _async_session
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = None
+    _async_session = None
+
+
+def __getattr__(name: str):
+    # Compatibilidad con 'from app.db.session import engine, async_session' (scripts).
+    if name == "engine":
+        return get_engine()
+    if name == "async_session":
+        return get_sessionmaker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 async def get_async_session():
-    async with async_session() as session:
+    async with get_sessionmaker()() as session:
         yield session
@@ -1,4 +1,6 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 from dotenv import load_dotenv
 import os
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,15 +12,56 @@ from app.api.api_transaccion  import router as transaccion_router
 from app.api.api_regla_recurrente import router as regla_router
 from app.api.api_dashboard import router as dashboard_router
 from app.api.api_user import router as user_admin_router
+from app.api.api_internal import router as internal_router
 
 from app.auth            import fastapi_users
 from app.auth.jwt        import auth_backend
 from app.auth.user_manager import get_user_manager
 from app.schemas.usuario import UserRead, UserCreate, UserUpdate
+from app.db.session import get_sessionmaker, dispose_engine
+from app.services.email_service import get_email_service
+from app.services.planificador import PlanificadorGeneracion
+from app.services.correo_worker import TrabajadorCorreos
+from app.services.email_transportes import transporte_desde_entorno
+from app.services.metricas import MiddlewareMetricas, registro_metricas
 
 load_dotenv(dotenv_path="../.env")  # carga tus vars de entorno
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Los recursos compartidos (engine, servicio de correo, workers) se crean aquí
+    # y no al importar, para que importar la app sea rápido y sin efectos.
+    async_session = get_sessionmaker()
+
+    # Si el correo está mal configurado la app arranca igual; solo se avisa.
+    try:
+        get_email_service()
+    except Exception as e:
+        print(f"⚠️ Servicio de correo no disponible: {e}")
+
+    # Planificador que genera en segundo plano las transacciones planeadas
+    # de los próximos meses. Se puede desactivar con PLANIFICADOR_HABILITADO=false.
+    planificador = None
+    if os.getenv("PLANIFICADOR_HABILITADO", "true").lower() == "true":
+        planificador = PlanificadorGeneracion.desde_entorno(async_session)
+        planificador.iniciar()
+    # Worker que envía los correos de la bandeja de salida.
+    # Se puede desactivar con CORREOS_WORKER_HABILITADO=false (p. ej. si corre en otro proceso).
+    trabajador_correos = None
+    if os.getenv("CORREOS_WORKER_HABILITADO", "true").lower() == "true":
+        try:
+            trabajador_correos = TrabajadorCorreos.desde_entorno(async_session, transporte_desde_entorno())
+            trabajador_correos.iniciar()
+        except Exception as e:
+            print(f"⚠️ Worker de correos desactivado: {e}")
+    yield
+    if planificador is not None:
+        await planificador.detener()
+    if trabajador_correos is not None:
+        await trabajador_correos.detener()
+    await dispose_engine()
+
+app = FastAPI(lifespan=lifespan)
 
 # Lee los orígenes permitidos desde una variable de entorno
 # El valor por defecto ("http://localhost:5173") es para seguir trabajando en local
@@ -32,6 +75,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Métricas por ruta (latencia, tiempo en SQL y en serialización, sentencias SQL)
+# en formato Prometheus en /metrics. Se pueden apagar con METRICAS_HABILITADAS=false.
+# Como los endpoints de /internal, /metrics exige un superusuario; con
+# METRICAS_PUBLICAS=true queda abierto (solo si el puerto no es accesible desde fuera).
+if os.getenv("METRICAS_HABILITADAS", "true").lower() == "true":
+    app.add_middleware(MiddlewareMetricas)
+    dependencias_metricas = []
+    if os.getenv("METRICAS_PUBLICAS", "false").lower() != "true":
+        dependencias_metricas = [Depends(fastapi_users.current_user(active=True, superuser=True))]
+
+    @app.get("/metrics", include_in_schema=False, dependencies=dependencias_metricas)
+    def metrics():
+        return PlainTextResponse(registro_metricas.exportar(), media_type="text/plain; version=0.0.4")
+
 @app.get("/")
 def read_root():
     return {"msg": "¡Hola, mundo! Proyecto de Presupuestos y Gastos."}
@@ -44,6 +101,7 @@ app.include_router(transaccion_router)
 app.include_router(regla_router)
 app.include_router(dashboard_router)
 app.include_router(user_admin_router)
+app.include_router(internal_router)
 
 # 1. Login JWT (solo usuarios verificados)
 app.include_router(
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
+from app.db.base_class import Base
+
+# Tabla de resumen (rollup) con los totales confirmados por usuario, mes, tipo y categoría.
+# Se mantiene de forma incremental desde crud_transaccion y alimenta el dashboard,
+# de modo que sus consultas no dependen de cuánto historial tenga el usuario.
+# Si se desajusta, scripts/rebuild_monthly_rollup.py la reconstruye desde cero.
+
+class AgregadoMensual(Base):
+    __tablename__ = "agregados_mensuales"
+    id = Column(Integer, primary_key=True)
+
+    usuario_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    anio = Column(Integer, nullable=False)
+    mes = Column(Integer, nullable=False)
+    tipo = Column(String, nullable=False)  # "Ingreso", "Gasto" o "Transferencia"
+
+    # Usamos 0 para "sin categoría" (p. ej. transferencias) en lugar de NULL,
+    # para que la clave única funcione igual en SQLite y en Postgres.
+    # No es una FK: es un dato derivado y no debe impedir borrar categorías.
+    categoria_id = Column(Integer, nullable=False, default=0)
+
+    total = Column(Float, nullable=False, default=0.0)
+    cantidad = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index(
+            "ux_agregados_mensuales_clave",
+            "usuario_id", "anio", "mes", "tipo", "categoria_id",
+            unique=True,
+        ),
+    )
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+# Bandeja de salida (outbox) de correos. Los hooks de usuario solo insertan aquí y
+# el TrabajadorCorreos (app/services/correo_worker.py) los envía en segundo plano,
+# con reintentos. Así ninguna petición espera a SendGrid.
+#
+# Estados:
+#   'Pendiente' -> esperando a 'proximo_intento'
+#   'Enviando'  -> reservado por un worker hasta 'proximo_intento' (si el worker
+#                  muere, al vencer la reserva otro lo vuelve a tomar)
+#   'Enviado'   -> entregado al proveedor
+#   'Fallido'   -> sin más reintentos (dead letter); queda para revisarlo a mano
+
+class CorreoSaliente(Base):
+    __tablename__ = "correos_salientes"
+    id = Column(Integer, primary_key=True)
+
+    destinatario = Column(String, nullable=False)
+    asunto = Column(String, nullable=False)
+    html = Column(Text, nullable=False)
+
+    estado = Column(String, nullable=False, default="Pendiente")
+    intentos = Column(Integer, nullable=False, default=0)
+    proximo_intento = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    ultimo_error = Column(Text, nullable=True)
+    creado_en = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    enviado_en = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # El worker busca por estado los correos cuyo turno ya llegó.
+        Index("ix_correos_salientes_estado_proximo", "estado", "proximo_intento"),
+    )
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, func, select
-from sqlalchemy.orm import relationship, column_property
+from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy.orm import relationship
 # from sqlalchemy.ext.hybrid import hybrid_property
 from app.db.base_class import Base
 from app.models.transaccion import Transaccion # <-- Importante importar Transaccion
@@ -15,34 +15,11 @@ class Cuenta(Base):
     # Relación para acceder al usuario dueño de la cuenta
     usuario = relationship("User", back_populates="cuentas")
 
-     # --- VERSIÓN CORREGIDA de la propiedad ---
-
-    # saldo_actual se define como una propiedad que se calcula con esta "receta"
-    saldo_actual = column_property(
-        
-        # La fórmula principal: empezamos con el saldo inicial de la cuenta...
-        saldo_inicial +
-
-        # ...luego, le sumamos todos los ingresos...
-        func.coalesce(
-            # Para calcular los ingresos, hacemos una mini-búsqueda (una subconsulta)
-            select(func.sum(Transaccion.valor))  # 1. "Suma el valor de todas las transacciones..."
-            .where(Transaccion.cuenta_destino_id == id, Transaccion.estado == 'Confirmado') # 2. "...pero SÓLO de aquellas donde esta cuenta ('id') es el destino."
-            .correlate_except(Transaccion) # 3. (Técnico) "Esta mini-búsqueda está relacionada con la cuenta que estamos calculando ahora."
-            .scalar_subquery(), # 4. "Convierte el resultado de la suma en un solo número."
-            0 # 5. El '0' en coalesce: "Si la suma da 'nada' (null), usa 0 en su lugar."
-        ) -
-
-        # ...y finalmente, le restamos todos los egresos.
-        func.coalesce(
-            # La lógica es idéntica a la de los ingresos...
-            select(func.sum(Transaccion.valor))
-            .where(Transaccion.cuenta_origen_id == id, Transaccion.estado == 'Confirmado') # ...pero aquí buscamos las transacciones donde esta cuenta es el ORIGEN.
-            .correlate_except(Transaccion)
-            .scalar_subquery(),
-            0 # De nuevo, si no hay egresos, usamos 0.
-        )
-    )
+    # saldo_actual se guarda en la tabla y se mantiene de forma incremental
+    # desde crud_transaccion (ver crud_cuenta.ajustar_saldos). Así, leer una
+    # cuenta no obliga a recorrer todo su historial de transacciones.
+    # Si se sospecha una desviación, scripts/rebuild_balances.py lo recalcula.
+    saldo_actual = Column(Float, nullable=False, default=0.0, server_default="0")
 
 
 # --- RELACIONES INVERSAS EN EL MODELO TRANSACCION ---
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey
+from app.db.base_class import Base
+
+# Punto de control del planificador de transacciones planeadas (una fila por usuario).
+# Guarda hasta qué fecha se generaron sus planeadas y con qué versión de sus reglas,
+# para saltar a los usuarios que no cambiaron y retomar el trabajo tras un reinicio.
+
+class GeneracionProgramada(Base):
+    __tablename__ = "generaciones_programadas"
+    usuario_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+
+    # Huella de las reglas activas del usuario en la última generación.
+    firma_reglas = Column(String, nullable=False)
+    # Última fecha (incluida) con transacciones planeadas generadas.
+    generado_hasta = Column(Date, nullable=False)
+    ultima_ejecucion = Column(DateTime(timezone=True), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
@@ -41,3 +41,14 @@ class Transaccion(Base):
     usuario = relationship("User", back_populates="transacciones")
     # Permite que desde una transacción podamos saber qué regla la generó.
     regla_recurrente = relationship("ReglaRecurrente")
+
+    # Índices compuestos para las consultas más frecuentes:
+    # - historial y paginación por fecha de un usuario,
+    # - saldo inicial del período, últimas confirmadas y generación de planeadas,
+    # - cálculo y verificación de saldos por cuenta.
+    __table_args__ = (
+        Index("ix_transacciones_usuario_fecha_id", "usuario_id", "fecha", "id"),
+        Index("ix_transacciones_usuario_estado_fecha", "usuario_id", "estado", "fecha", "id"),
+        Index("ix_transacciones_origen_estado", "cuenta_origen_id", "estado"),
+        Index("ix_transacciones_destino_estado", "cuenta_destino_id", "estado"),
+    )
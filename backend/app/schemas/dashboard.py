@@ -1,4 +1,9 @@
 from pydantic import BaseModel
+from datetime import date
+from typing import List, Literal, Optional, Union
+from .cuenta import CuentaResponse
+from .categoria import CategoriaResponse
+from .transaccion import TransaccionResponse
 
 class ResumenMensual(BaseModel):
     """
@@ -19,4 +24,50 @@ class ResumenPorCategoria(BaseModel):
     total_gastado: float
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class DashboardBundle(BaseModel):
+    """
+    Todo lo que necesita la página del dashboard en una sola respuesta.
+    """
+    cuentas: List[CuentaResponse]
+    categorias: List[CategoriaResponse]
+    ultimas_transacciones: List[TransaccionResponse]
+    resumen_mensual: List[ResumenMensual]
+    gastos_por_categoria: List[ResumenPorCategoria]
+
+DimensionAnalitica = Literal["dia", "mes", "anio", "dia_semana", "categoria", "cuenta", "tipo"]
+MedidaAnalitica = Literal["total", "cantidad", "promedio"]
+
+class AnaliticaResponse(BaseModel):
+    """
+    Resultado de una consulta analítica. 'filas' son las etiquetas de la dimensión.
+    Sin pivote, 'valores' tiene un número por fila; con pivote, una lista por fila
+    con un número por cada etiqueta de 'columnas'.
+    """
+    dimension: DimensionAnalitica
+    medida: MedidaAnalitica
+    pivote: Optional[DimensionAnalitica] = None
+    filas: List[str]
+    columnas: Optional[List[str]] = None
+    valores: Union[List[float], List[List[float]]]
+
+class SerieCuenta(BaseModel):
+    cuenta_id: int
+    nombre: str
+    saldos: List[float]
+
+class PronosticoResponse(BaseModel):
+    """
+    Saldos proyectados a partir de las reglas recurrentes activas, un punto por
+    período ('fechas'). 'ingresos' y 'gastos' son los que generan las reglas en
+    cada período y 'saldo_total' el saldo de todas las cuentas al final del período.
+    """
+    desde: date
+    hasta: date
+    granularidad: Literal["dia", "mes"]
+    fechas: List[date]
+    cuentas: List[SerieCuenta]
+    ingresos: List[float]
+    gastos: List[float]
+    saldo_total: List[float]
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, model_validator
-from typing import List, Optional, Any
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional, Any, Dict, Literal
 from datetime import date
 from .cuenta import CuentaSimple
 from .categoria import CategoriaSimple
@@ -64,6 +64,9 @@ class TransaccionResponse(TransaccionBase):
     cuenta_destino: Optional[CuentaSimple] = None
     categoria: Optional[CategoriaSimple] = None
 
+    # Saldo después de esta transacción. Solo lo rellena el listado por período.
+    saldo_acumulado: Optional[float] = None
+
     class Config:
         from_attributes = True # Reemplaza a orm_mode en Pydantic V2
 
@@ -77,3 +80,47 @@ class TransaccionUpdate(TransaccionBase):
 class TransaccionPeriodResponse(BaseModel):
     saldo_inicial_periodo: float
     transacciones: List[TransaccionResponse]
+
+class TransaccionPaginaResponse(BaseModel):
+    transacciones: List[TransaccionResponse]
+    # Cursor opaco para pedir la siguiente página; None si no hay más.
+    next_cursor: Optional[str] = None
+    # Solo se incluye en la primera página cuando se indica start_date.
+    saldo_inicial_periodo: Optional[float] = None
+
+class ErrorImportacion(BaseModel):
+    fila: int
+    error: str
+
+class ImportacionResponse(BaseModel):
+    importadas: int
+    total_errores: int
+    # Se detallan como máximo los primeros errores; 'total_errores' los cuenta todos.
+    errores: List[ErrorImportacion]
+
+# --- OPERACIONES EN LOTE ---
+
+# Máximo de operaciones aceptadas en una sola petición a /transacciones/batch.
+MAX_OPERACIONES_LOTE = 1000
+
+class OperacionLote(BaseModel):
+    operacion: Literal["crear", "actualizar", "eliminar"]
+    # Obligatorio para 'actualizar' y 'eliminar'.
+    id: Optional[int] = None
+    # Campos de la transacción: todos para 'crear', solo los que cambian para 'actualizar'.
+    # Se validan dentro del lote para poder devolver el error de cada operación.
+    datos: Optional[Dict[str, Any]] = None
+
+class LoteTransaccionesRequest(BaseModel):
+    operaciones: List[OperacionLote] = Field(..., min_length=1, max_length=MAX_OPERACIONES_LOTE)
+
+class ResultadoOperacionLote(BaseModel):
+    indice: int
+    operacion: str
+    id: int
+    # None para las eliminaciones.
+    transaccion: Optional[TransaccionResponse] = None
+
+class LoteTransaccionesResponse(BaseModel):
+    aplicadas: int
+    resultados: List[ResultadoOperacionLote]
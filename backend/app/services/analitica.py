@@ -0,0 +1,246 @@
+# backend/app/services/analitica.py
+import os
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.transaccion import Transaccion
+from app.services.cache import CacheLRU, CacheLecturas, cache_lecturas
+from app.services.referencias import Referencias
+
+TIPOS = ("Ingreso", "Gasto", "Transferencia")
+DIAS_SEMANA = ("lunes", "martes", "miércoles", "jueves", "viernes", "sábado", "domingo")
+DIMENSIONES_TEMPORALES = ("dia", "mes", "anio")
+_EPOCA = date(1970, 1, 1)
+
+
+class HistorialColumnar:
+    """
+    Transacciones confirmadas de un usuario en arrays paralelos (una posición por
+    transacción), ordenadas por fecha:
+      - dias: fecha como días desde 1970-01-01
+      - valor: monto
+      - tipo: índice en TIPOS
+      - categoria / cuenta: ids, 0 si no tiene. La cuenta es la de destino para los
+        ingresos y la de origen para gastos y transferencias.
+    """
+    __slots__ = ("dias", "valor", "tipo", "categoria", "cuenta")
+
+    def __init__(self, dias: np.ndarray, valor: np.ndarray, tipo: np.ndarray,
+                 categoria: np.ndarray, cuenta: np.ndarray):
+        self.dias = dias
+        self.valor = valor
+        self.tipo = tipo
+        self.categoria = categoria
+        self.cuenta = cuenta
+
+    def __len__(self) -> int:
+        return len(self.dias)
+
+    def codigos(self, dimension: str) -> np.ndarray:
+        """Código entero de cada transacción en la dimensión indicada."""
+        if dimension == "dia":
+            return self.dias.astype(np.int64)
+        if dimension == "mes":
+            return self.dias.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        if dimension == "anio":
+            return self.dias.astype("datetime64[D]").astype("datetime64[Y]").astype(np.int64)
+        if dimension == "dia_semana":
+            return (self.dias.astype(np.int64) + 3) % 7  # el 1970-01-01 fue jueves
+        if dimension == "categoria":
+            return self.categoria.astype(np.int64)
+        if dimension == "cuenta":
+            return self.cuenta.astype(np.int64)
+        if dimension == "tipo":
+            return self.tipo.astype(np.int64)
+        raise ValueError(f"Dimensión desconocida: {dimension}")
+
+
+def _etiqueta(dimension: str, codigo: int, referencias: Optional[Referencias]) -> str:
+    if dimension == "dia":
+        return str(np.datetime64(codigo, "D"))
+    if dimension == "mes":
+        return str(np.datetime64(codigo, "M"))
+    if dimension == "anio":
+        return str(np.datetime64(codigo, "Y"))
+    if dimension == "dia_semana":
+        return DIAS_SEMANA[codigo]
+    if dimension == "tipo":
+        return TIPOS[codigo]
+    if dimension == "categoria":
+        return referencias.categorias.get(codigo, "Sin categoría")
+    return referencias.cuentas.get(codigo, "Sin cuenta")
+
+
+def _agrupar(codigos: np.ndarray, dimension: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Devuelve (claves, indice): las claves del grupo y, para cada transacción, la
+    posición de su grupo. Las dimensiones de tiempo usan el rango completo entre la
+    primera y la última fecha, para que los huecos salgan en cero y las ventanas
+    móviles tengan sentido.
+    """
+    if dimension in DIMENSIONES_TEMPORALES:
+        if not len(codigos):
+            return np.empty(0, dtype=np.int64), codigos
+        inicio = codigos.min()
+        return np.arange(inicio, codigos.max() + 1), codigos - inicio
+    if dimension == "dia_semana":
+        return np.arange(7), codigos
+    return np.unique(codigos, return_inverse=True)
+
+
+def _movil(matriz: np.ndarray, ventana: int) -> np.ndarray:
+    """Suma móvil de 'ventana' filas (las primeras filas usan una ventana incompleta)."""
+    acumulado = np.cumsum(matriz, axis=0)
+    resultado = acumulado.copy()
+    resultado[ventana:] -= acumulado[:-ventana]
+    return resultado
+
+
+def consultar(
+    historial: HistorialColumnar,
+    dimension: str,
+    medida: str = "total",
+    *,
+    pivote: Optional[str] = None,
+    tipo: Optional[str] = "Gasto",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    ventana: Optional[int] = None,
+    referencias: Optional[Referencias] = None,
+) -> Dict[str, Any]:
+    """
+    Agrupa el historial por 'dimension' (y por 'pivote' si se indica, como una tabla
+    dinámica) y calcula la 'medida' de cada grupo: 'total', 'cantidad' o 'promedio'.
+
+    - 'tipo' filtra por tipo de transacción (None para todas).
+    - 'ventana' convierte el resultado en una ventana móvil de N períodos sobre la
+      dimensión, que debe ser de tiempo (dia, mes o anio).
+    - 'referencias' hace falta para poner nombre a categorías y cuentas.
+
+    Todo el cálculo son operaciones vectorizadas sobre los arrays del historial.
+    """
+    # Las fechas están ordenadas: el rango se recorta con búsqueda binaria.
+    izquierda = 0 if start_date is None else np.searchsorted(historial.dias, (start_date - _EPOCA).days, side="left")
+    derecha = len(historial) if end_date is None else np.searchsorted(historial.dias, (end_date - _EPOCA).days, side="right")
+    seleccion = slice(izquierda, derecha)
+    valores = historial.valor[seleccion]
+    codigos = historial.codigos(dimension)[seleccion]
+    codigos_pivote = historial.codigos(pivote)[seleccion] if pivote else None
+    if tipo is not None:
+        mascara = historial.tipo[seleccion] == TIPOS.index(tipo)
+        valores = valores[mascara]
+        codigos = codigos[mascara]
+        if codigos_pivote is not None:
+            codigos_pivote = codigos_pivote[mascara]
+
+    claves, indice = _agrupar(codigos, dimension)
+    if pivote:
+        claves_pivote, indice_pivote = _agrupar(codigos_pivote, pivote)
+        forma = (len(claves), len(claves_pivote))
+        plano = indice * forma[1] + indice_pivote
+        total = np.bincount(plano, weights=valores, minlength=forma[0] * forma[1]).reshape(forma)
+        cantidad = np.bincount(plano, minlength=forma[0] * forma[1]).reshape(forma).astype(np.float64)
+    else:
+        claves_pivote = None
+        total = np.bincount(indice, weights=valores, minlength=len(claves))
+        cantidad = np.bincount(indice, minlength=len(claves)).astype(np.float64)
+
+    if ventana:
+        total = _movil(total, ventana)
+        cantidad = _movil(cantidad, ventana)
+
+    if medida == "total":
+        resultado = total
+    elif medida == "cantidad":
+        resultado = cantidad
+    else:
+        resultado = np.divide(total, cantidad, out=np.zeros_like(total), where=cantidad > 0)
+
+    # Categorías, cuentas y tipos se ordenan de mayor a menor; el tiempo, en su orden.
+    if dimension in ("categoria", "cuenta", "tipo") and len(claves):
+        orden = np.argsort(-(resultado.sum(axis=1) if pivote else resultado), kind="stable")
+        claves = claves[orden]
+        resultado = resultado[orden]
+
+    return {
+        "dimension": dimension,
+        "medida": medida,
+        "pivote": pivote,
+        "filas": [_etiqueta(dimension, int(c), referencias) for c in claves],
+        "columnas": [_etiqueta(pivote, int(c), referencias) for c in claves_pivote] if pivote else None,
+        "valores": np.round(resultado, 2).tolist(),
+    }
+
+
+class MotorAnalitica:
+    """
+    Caché en memoria, por usuario, del historial de transacciones confirmadas en
+    forma de columnas NumPy, para responder consultas analíticas sin ir a la base.
+
+    La clave incluye la versión del espacio 'transacciones' de la caché de lecturas,
+    que ya suben todas las escrituras de transacciones después del commit: cualquier
+    cambio hace que la siguiente consulta recargue el historial. Los nombres de
+    cuentas y categorías no se guardan aquí (se ponen al responder con el mapa de
+    referencias), así que renombrarlas no obliga a recargar.
+    """
+
+    def __init__(self, cache: CacheLRU, lecturas: CacheLecturas):
+        self.cache = cache
+        self.lecturas = lecturas
+        self.cargas = 0
+        self.filas_cargadas = 0
+
+    async def historial(self, db: AsyncSession, usuario_id: int) -> HistorialColumnar:
+        clave = (usuario_id, self.lecturas.version(usuario_id, "transacciones"))
+        encontrado, historial = self.cache.obtener(clave)
+        if not encontrado:
+            historial = await self._cargar(db, usuario_id)
+            self.cache.guardar(clave, historial)
+        return historial
+
+    async def _cargar(self, db: AsyncSession, usuario_id: int) -> HistorialColumnar:
+        query = (
+            select(
+                Transaccion.fecha, Transaccion.valor, Transaccion.tipo, Transaccion.categoria_id,
+                Transaccion.cuenta_origen_id, Transaccion.cuenta_destino_id,
+            )
+            .where(Transaccion.usuario_id == usuario_id, Transaccion.estado == 'Confirmado')
+            .order_by(Transaccion.fecha)
+        )
+        filas = (await db.execute(query)).all()
+        self.cargas += 1
+        self.filas_cargadas += len(filas)
+
+        n = len(filas)
+        codigo_tipo = {t: i for i, t in enumerate(TIPOS)}
+        return HistorialColumnar(
+            dias=np.fromiter(((f.fecha - _EPOCA).days for f in filas), dtype=np.int32, count=n),
+            valor=np.fromiter((f.valor for f in filas), dtype=np.float64, count=n),
+            tipo=np.fromiter((codigo_tipo[f.tipo] for f in filas), dtype=np.int8, count=n),
+            categoria=np.fromiter((f.categoria_id or 0 for f in filas), dtype=np.int32, count=n),
+            cuenta=np.fromiter(
+                ((f.cuenta_destino_id if f.tipo == "Ingreso" else f.cuenta_origen_id) or 0 for f in filas),
+                dtype=np.int32, count=n,
+            ),
+        )
+
+    def estadisticas(self) -> Dict[str, Any]:
+        return {
+            **self.cache.estadisticas(),
+            "cargas": self.cargas,
+            "filas_cargadas": self.filas_cargadas,
+        }
+
+
+# Instancia única para toda la app.
+motor_analitica = MotorAnalitica(
+    CacheLRU(
+        max_entradas=int(os.getenv("ANALITICA_MAX_USUARIOS", "1000")),
+        ttl_segundos=float(os.getenv("ANALITICA_TTL_SEGUNDOS", "300")),
+    ),
+    cache_lecturas,
+)
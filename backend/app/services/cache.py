@@ -0,0 +1,171 @@
+# backend/app/services/cache.py
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+
+class CacheLRU:
+    """
+    Caché en memoria con expulsión LRU, caducidad por TTL y un número máximo de entradas.
+    Lleva contadores de aciertos, fallos, expulsiones y caducidades para poder dimensionarla.
+    """
+
+    def __init__(self, max_entradas: int = 10_000, ttl_segundos: float = 30.0):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self._datos: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+        self.caducadas = 0
+
+    def obtener(self, clave: Hashable) -> Tuple[bool, Any]:
+        """Devuelve (True, valor) si la clave está vigente, o (False, None) si no."""
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return False, None
+            expira, valor = entrada
+            if expira <= ahora:
+                del self._datos[clave]
+                self.caducadas += 1
+                self.fallos += 1
+                return False, None
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return True, valor
+
+    def guardar(self, clave: Hashable, valor: Any) -> None:
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + self.ttl_segundos, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+                self.expulsiones += 1
+
+    def eliminar(self, clave: Hashable) -> None:
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def vaciar(self) -> None:
+        with self._lock:
+            self._datos.clear()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        consultas = self.aciertos + self.fallos
+        return {
+            "entradas": len(self._datos),
+            "max_entradas": self.max_entradas,
+            "ttl_segundos": self.ttl_segundos,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+            "expulsiones": self.expulsiones,
+            "caducadas": self.caducadas,
+        }
+
+
+class CacheLecturas:
+    """
+    Caché de lecturas por usuario delante de las funciones crud.
+
+    Los datos de cada usuario se agrupan en "espacios" ('transacciones', 'cuentas',
+    'categorias', 'reglas'). Cada espacio tiene un número de versión por usuario y
+    la clave de una entrada incluye la versión de los espacios de los que depende.
+    Invalidar es subir esas versiones: las entradas viejas dejan de encontrarse y
+    salen solas por LRU o TTL. Así una escritura solo invalida lo que depende de ella.
+
+    La invalidación debe hacerse después del commit: una lectura que empezó antes
+    guarda su resultado bajo la versión vieja y nadie lo vuelve a leer.
+    """
+
+    def __init__(self, cache: CacheLRU, habilitada: bool = True):
+        self.cache = cache
+        self.habilitada = habilitada
+        self._versiones: Dict[Tuple[int, str], int] = {}
+        self._epoca = 0
+        self.invalidaciones = 0
+
+    def _version(self, usuario_id: int, espacio: str) -> int:
+        return self._versiones.get((usuario_id, espacio), 0)
+
+    def version(self, usuario_id: int, *espacios: str) -> Tuple[int, ...]:
+        """Versión actual de los espacios indicados; cambia con cualquier invalidación."""
+        return (self._epoca, *(self._version(usuario_id, e) for e in espacios))
+
+    def invalidar(self, usuario_id: int, *espacios: str) -> None:
+        """Marca como obsoletos los espacios indicados del usuario."""
+        for espacio in espacios:
+            clave = (usuario_id, espacio)
+            self._versiones[clave] = self._versiones.get(clave, 0) + 1
+        self.invalidaciones += 1
+
+    def invalidar_todo(self) -> None:
+        """Para escrituras que afectan a muchos usuarios (p. ej. scripts de reconstrucción)."""
+        self._epoca += 1
+        self.cache.vaciar()
+        self.invalidaciones += 1
+
+    def cacheado(self, *depende_de: str, esquema: Any = None) -> Callable:
+        """
+        Decorador para funciones crud async que reciben 'db' y 'usuario_id'.
+        La clave se forma con el resto de argumentos y las versiones de 'depende_de'.
+        Si se indica 'esquema', el resultado se convierte a ese tipo Pydantic antes de
+        guardarlo, para no compartir objetos ORM entre sesiones.
+        """
+        def decorador(func: Callable) -> Callable:
+            firma = inspect.signature(func)
+            adaptador = TypeAdapter(esquema) if esquema is not None else None
+
+            @functools.wraps(func)
+            async def envoltura(*args, **kwargs):
+                if not self.habilitada:
+                    return await func(*args, **kwargs)
+
+                argumentos = firma.bind(*args, **kwargs)
+                argumentos.apply_defaults()
+                parametros = {k: v for k, v in argumentos.arguments.items() if k != "db"}
+                usuario_id = parametros["usuario_id"]
+                clave = (
+                    func.__module__, func.__qualname__, self._epoca,
+                    tuple(sorted(parametros.items())),
+                    tuple(self._version(usuario_id, e) for e in depende_de),
+                )
+
+                encontrado, valor = self.cache.obtener(clave)
+                if not encontrado:
+                    valor = await func(*args, **kwargs)
+                    if adaptador is not None:
+                        valor = adaptador.validate_python(valor, from_attributes=True)
+                    self.cache.guardar(clave, valor)
+                # Devolvemos una copia de la lista para que nadie modifique la guardada.
+                return list(valor) if isinstance(valor, list) else valor
+
+            return envoltura
+        return decorador
+
+    def estadisticas(self) -> Dict[str, Any]:
+        return {
+            **self.cache.estadisticas(),
+            "habilitada": self.habilitada,
+            "invalidaciones": self.invalidaciones,
+        }
+
+
+# Instancia única para toda la app. Se configura con variables de entorno.
+cache_lecturas = CacheLecturas(
+    CacheLRU(
+        max_entradas=int(os.getenv("CACHE_LECTURAS_MAX_ENTRADAS", "10000")),
+        ttl_segundos=float(os.getenv("CACHE_LECTURAS_TTL_SEGUNDOS", "30")),
+    ),
+    habilitada=os.getenv("CACHE_LECTURAS_HABILITADA", "true").lower() == "true",
+)
@@ -0,0 +1,150 @@
+# backend/app/services/correo_worker.py
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.correo_saliente import CorreoSaliente
+from app.services.email_transportes import ErrorPermanente
+
+
+class TrabajadorCorreos:
+    """
+    Vacía la bandeja de salida de correos (CorreoSaliente) en segundo plano.
+
+    - Toma lotes de hasta 'tamano_lote' correos cuyo 'proximo_intento' ya pasó y los
+      reserva ('Enviando') durante 'reserva_segundos'. En Postgres usa
+      FOR UPDATE SKIP LOCKED, así que varios workers no se pisan.
+    - Entrega el lote completo al transporte, que lo envía por conexiones persistentes.
+    - Si un envío falla, lo reprograma con espera exponencial (con algo de azar)
+      hasta 'max_intentos'; después, o si el error es permanente, queda 'Fallido'.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        transporte,
+        tamano_lote: int = 50,
+        intervalo_segundos: float = 2.0,
+        max_intentos: int = 6,
+        espera_base_segundos: float = 30.0,
+        espera_max_segundos: float = 3600.0,
+        reserva_segundos: float = 300.0,
+    ):
+        self.session_factory = session_factory
+        self.transporte = transporte
+        self.tamano_lote = tamano_lote
+        self.intervalo_segundos = intervalo_segundos
+        self.max_intentos = max_intentos
+        self.espera_base_segundos = espera_base_segundos
+        self.espera_max_segundos = espera_max_segundos
+        self.reserva_segundos = reserva_segundos
+        self._tarea: Optional[asyncio.Task] = None
+
+    @classmethod
+    def desde_entorno(cls, session_factory: Callable[[], AsyncSession], transporte) -> "TrabajadorCorreos":
+        return cls(
+            session_factory,
+            transporte,
+            tamano_lote=int(os.getenv("CORREOS_TAMANO_LOTE", "50")),
+            intervalo_segundos=float(os.getenv("CORREOS_INTERVALO_SEGUNDOS", "2")),
+            max_intentos=int(os.getenv("CORREOS_MAX_INTENTOS", "6")),
+        )
+
+    # --- Ciclo de vida ---
+
+    def iniciar(self) -> None:
+        if self._tarea is None:
+            self._tarea = asyncio.create_task(self._bucle())
+
+    async def detener(self) -> None:
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+        await self.transporte.cerrar()
+
+    async def _bucle(self) -> None:
+        while True:
+            try:
+                resumen = await self.procesar_lote()
+                if resumen["reintentos"] or resumen["fallidos"]:
+                    print(f"📮 Correos: {resumen}")
+                # Si el lote vino lleno probablemente hay más esperando: seguimos sin dormir.
+                if resumen["tomados"] == self.tamano_lote:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Error en el worker de correos: {e}")
+            await asyncio.sleep(self.intervalo_segundos)
+
+    # --- Trabajo ---
+
+    def _espera(self, intentos: int) -> timedelta:
+        segundos = min(self.espera_max_segundos, self.espera_base_segundos * 2 ** (intentos - 1))
+        return timedelta(seconds=segundos * random.uniform(0.8, 1.2))
+
+    async def procesar_lote(self) -> Dict[str, int]:
+        """Toma un lote de correos pendientes, los envía y guarda el resultado."""
+        resumen = {"tomados": 0, "enviados": 0, "reintentos": 0, "fallidos": 0}
+
+        async with self.session_factory() as session:
+            # 1. Reservar el lote. Se incluyen los 'Enviando' con la reserva vencida
+            #    (su worker murió a medio enviar).
+            ahora = datetime.now(timezone.utc)
+            consulta = (
+                select(CorreoSaliente)
+                .where(
+                    CorreoSaliente.estado.in_(("Pendiente", "Enviando")),
+                    CorreoSaliente.proximo_intento <= ahora
+                )
+                .order_by(CorreoSaliente.proximo_intento, CorreoSaliente.id)
+                .limit(self.tamano_lote)
+            )
+            if session.get_bind().dialect.name == "postgresql":
+                consulta = consulta.with_for_update(skip_locked=True)
+            correos = (await session.execute(consulta)).scalars().all()
+            if not correos:
+                return resumen
+            for correo in correos:
+                correo.estado = "Enviando"
+                correo.proximo_intento = ahora + timedelta(seconds=self.reserva_segundos)
+            await session.commit()
+            resumen["tomados"] = len(correos)
+
+            # 2. Enviar fuera de cualquier transacción abierta. El transporte manda
+            #    el lote entero reutilizando sus conexiones.
+            errores = await self.transporte.enviar_lote(
+                [(c.destinatario, c.asunto, c.html) for c in correos]
+            )
+
+            # 3. Guardar el resultado de todo el lote en un solo commit.
+            ahora = datetime.now(timezone.utc)
+            for correo, error in zip(correos, errores):
+                if error is None:
+                    correo.estado = "Enviado"
+                    correo.enviado_en = ahora
+                    correo.ultimo_error = None
+                    resumen["enviados"] += 1
+                    continue
+                correo.intentos += 1
+                correo.ultimo_error = f"{type(error).__name__}: {error}"[:2000]
+                if isinstance(error, ErrorPermanente) or correo.intentos >= self.max_intentos:
+                    correo.estado = "Fallido"
+                    resumen["fallidos"] += 1
+                    print(f"❌ Correo {correo.id} para '{correo.destinatario}' descartado: {correo.ultimo_error}")
+                else:
+                    correo.estado = "Pendiente"
+                    correo.proximo_intento = ahora + self._espera(correo.intentos)
+                    resumen["reintentos"] += 1
+            await session.commit()
+
+        return resumen
@@ -1,49 +1,77 @@
 # backend/app/services/email_service.py
 import os
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
 from jinja2 import Environment, FileSystemLoader
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.usuario import User
+from app.models.correo_saliente import CorreoSaliente
+
+# Carpeta de plantillas, sin depender del directorio desde el que se arranque la app.
+DIRECTORIO_PLANTILLAS = Path(__file__).resolve().parent.parent / "templates" / "email"
+PLANTILLAS = ("verify.html", "reset.html")
 
 class EmailService:
+    """
+    Prepara los correos de la app y los deja en la bandeja de salida (CorreoSaliente).
+    El envío real lo hace TrabajadorCorreos en segundo plano.
+    """
+
     def __init__(self):
-        self.api_key = os.getenv("SENDGRID_API_KEY")
         self.from_email = os.getenv("EMAILS_FROM")
-        self.template_env = Environment(loader=FileSystemLoader("app/templates/email"))
+        # auto_reload=False: las plantillas no cambian en ejecución, así que Jinja
+        # no tiene que revisar el archivo en disco en cada correo.
+        self.template_env = Environment(loader=FileSystemLoader(DIRECTORIO_PLANTILLAS), auto_reload=False)
         
-        if not self.api_key or not self.from_email:
-            raise ValueError("Las variables de entorno SENDGRID_API_KEY y EMAILS_FROM son necesarias.")
-            
-        self.sg_client = SendGridAPIClient(self.api_key)
+        if not self.from_email:
+            raise ValueError("La variable de entorno EMAILS_FROM es necesaria.")
+
+        # Compilamos las plantillas una sola vez al arrancar.
+        self._plantillas = {nombre: self.template_env.get_template(nombre) for nombre in PLANTILLAS}
 
     def _render_template(self, template_name: str, **kwargs) -> str:
-        """Renderiza una plantilla de correo Jinja2."""
-        template = self.template_env.get_template(template_name)
+        """Renderiza una plantilla de correo Jinja2 (ya compilada)."""
+        template = self._plantillas.get(template_name) or self.template_env.get_template(template_name)
         return template.render(**kwargs)
 
-    def send_email(self, to_email: str, subject: str, html_content: str):
+    async def encolar(self, session: AsyncSession, to_email: str, subject: str, html_content: str):
         """
-        Envía un correo electrónico usando la Web API de SendGrid.
+        Guarda el correo en la bandeja de salida. No habla con ningún proveedor,
+        así que la petición que lo llama no espera a la red.
         """
-        message = Mail(
-            from_email=self.from_email,
-            to_emails=to_email,
-            subject=subject,
-            html_content=html_content
-        )
-        try:
-            response = self.sg_client.send(message)
-            if 200 <= response.status_code < 300:
-                print(f"✅ Correo para '{to_email}' aceptado por SendGrid (Estado: {response.status_code}).")
-            else:
-                print(f"❌ Error al enviar correo a '{to_email}'. SendGrid respondió con estado {response.status_code}.")
-                print(f"   Respuesta: {response.body}")
-        except Exception as e:
-            print(f"❌ Excepción al intentar enviar correo a '{to_email}': {e}")
+        session.add(CorreoSaliente(
+            destinatario=to_email,
+            asunto=subject,
+            html=html_content,
+            estado="Pendiente",
+            intentos=0,
+            proximo_intento=datetime.now(timezone.utc),
+        ))
+        await session.commit()
+        print(f"📬 Correo para '{to_email}' en cola.")
 
-    def send_verification_email(self, user: User, token: str):
+    async def encolar_varios(self, session: AsyncSession, correos: Iterable[Tuple[str, str, str]]) -> int:
         """
-        Envía el correo de verificación de cuenta.
+        Encola muchos correos (destinatario, asunto, html) con un solo INSERT en bloque.
+        Pensado para envíos masivos, p. ej. pedir de nuevo la verificación a muchos usuarios.
+        """
+        ahora = datetime.now(timezone.utc)
+        filas = [
+            {"destinatario": destinatario, "asunto": asunto, "html": html,
+             "estado": "Pendiente", "intentos": 0, "proximo_intento": ahora}
+            for destinatario, asunto, html in correos
+        ]
+        if filas:
+            await session.execute(insert(CorreoSaliente), filas)
+            await session.commit()
+        print(f"📬 {len(filas)} correos en cola.")
+        return len(filas)
+
+    async def send_verification_email(self, session: AsyncSession, user: User, token: str):
+        """
+        Encola el correo de verificación de cuenta.
         """
         frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
         link = f"{frontend_url}/verify-email?token={token}"
@@ -54,15 +82,16 @@ class EmailService:
             link=link
         )
         
-        self.send_email(
+        await self.encolar(
+            session,
             to_email=user.email,
             subject="Activa tu cuenta",
             html_content=html_content
         )
 
-    def send_reset_password_email(self, user: User, token: str):
+    async def send_reset_password_email(self, session: AsyncSession, user: User, token: str):
         """
-        Envía el correo para restablecer la contraseña.
+        Encola el correo para restablecer la contraseña.
         """
         frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
         link = f"{frontend_url}/auth/reset-password?token={token}"
@@ -73,11 +102,19 @@ class EmailService:
             link=link
         )
         
-        self.send_email(
+        await self.encolar(
+            session,
             to_email=user.email,
             subject="Recupera tu contraseña",
             html_content=html_content
         )
 
-# Creamos una única instancia del servicio para ser usada en toda la app
-email_service = EmailService()
\ No newline at end of file
+# Instancia única del servicio. Se crea la primera vez que se pide (o al arrancar la app,
+# desde el lifespan), no al importar: así un EMAILS_FROM ausente no impide importar la app.
+_email_service: Optional[EmailService] = None
+
+def get_email_service() -> EmailService:
+    global _email_service
+    if _email_service is None:
+        _email_service = EmailService()
+    return _email_service
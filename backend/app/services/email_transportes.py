@@ -0,0 +1,198 @@
+# backend/app/services/email_transportes.py
+import asyncio
+import os
+from email.message import EmailMessage
+from typing import List, Optional, Sequence, Tuple
+
+import aiosmtplib
+import httpx
+
+# (destinatario, asunto, html)
+Mensaje = Tuple[str, str, str]
+
+
+class ErrorPermanente(Exception):
+    """El proveedor rechazó el correo y reintentar no lo va a arreglar (p. ej. dirección inválida)."""
+
+
+class TransporteSendGrid:
+    """
+    Envía por la Web API de SendGrid con un cliente httpx asíncrono que mantiene
+    abiertas las conexiones entre envíos (keep-alive), en vez de un cliente
+    bloqueante nuevo por correo.
+    'host' permite apuntar a un servidor HTTP local de pruebas.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        from_email: str,
+        host: Optional[str] = None,
+        max_conexiones: int = 5,
+        timeout: float = 30.0,
+    ):
+        self.from_email = from_email
+        self.max_conexiones = max_conexiones
+        self.cliente = httpx.AsyncClient(
+            base_url=host or "https://api.sendgrid.com",
+            headers={"Authorization": f"Bearer {api_key}"},
+            limits=httpx.Limits(max_connections=max_conexiones, max_keepalive_connections=max_conexiones),
+            timeout=timeout,
+        )
+
+    async def enviar(self, destinatario: str, asunto: str, html: str) -> None:
+        cuerpo = {
+            "personalizations": [{"to": [{"email": destinatario}]}],
+            "from": {"email": self.from_email},
+            "subject": asunto,
+            "content": [{"type": "text/html", "value": html}],
+        }
+        respuesta = await self.cliente.post("/v3/mail/send", json=cuerpo)
+        if respuesta.is_success:
+            return
+        # 4xx (salvo 429, límite de peticiones) no se arregla reintentando.
+        error = f"SendGrid respondió {respuesta.status_code}: {respuesta.text[:500]}"
+        if 400 <= respuesta.status_code < 500 and respuesta.status_code != 429:
+            raise ErrorPermanente(error)
+        raise RuntimeError(error)
+
+    async def enviar_lote(self, mensajes: Sequence[Mensaje]) -> List[Optional[Exception]]:
+        """
+        Envía varios correos reutilizando las conexiones del cliente, como mucho
+        'max_conexiones' en vuelo. Devuelve el error de cada uno (None si salió bien).
+        """
+        semaforo = asyncio.Semaphore(self.max_conexiones)
+
+        async def enviar_uno(mensaje: Mensaje) -> Optional[Exception]:
+            async with semaforo:
+                try:
+                    await self.enviar(*mensaje)
+                    return None
+                except Exception as e:
+                    return e
+
+        return list(await asyncio.gather(*(enviar_uno(m) for m in mensajes)))
+
+    async def cerrar(self) -> None:
+        await self.cliente.aclose()
+
+
+class TransporteSMTP:
+    """
+    Envía por SMTP con aiosmtplib sobre una única conexión persistente: se abre
+    en el primer envío, se reutiliza para los siguientes y se reabre si el
+    servidor la cierra. Un lote viaja entero por esa conexión, un mensaje detrás
+    de otro, sin repetir el saludo, TLS ni login.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        from_email: str,
+        usuario: Optional[str] = None,
+        password: Optional[str] = None,
+        usar_tls: bool = False,
+        timeout: float = 30.0,
+    ):
+        self.from_email = from_email
+        self._smtp = aiosmtplib.SMTP(
+            hostname=host,
+            port=port,
+            username=usuario or None,
+            password=password if usuario else None,
+            start_tls=usar_tls,
+            timeout=timeout,
+        )
+        # Una conexión SMTP solo puede llevar una conversación a la vez.
+        self._lock = asyncio.Lock()
+
+    def _mensaje(self, destinatario: str, asunto: str, html: str) -> EmailMessage:
+        mensaje = EmailMessage()
+        mensaje["From"] = self.from_email
+        mensaje["To"] = destinatario
+        mensaje["Subject"] = asunto
+        mensaje.set_content(html, subtype="html")
+        return mensaje
+
+    async def _enviar_conectado(self, destinatario: str, asunto: str, html: str) -> None:
+        """Envía por la conexión abierta (reabriéndola si hace falta). Requiere el lock."""
+        mensaje = self._mensaje(destinatario, asunto, html)
+        for intento in range(2):
+            if not self._smtp.is_connected:
+                await self._smtp.connect()
+            try:
+                await self._smtp.send_message(mensaje)
+                return
+            except aiosmtplib.SMTPServerDisconnected:
+                # El servidor cerró la conexión inactiva: reconectamos una vez.
+                self._smtp.close()
+                if intento:
+                    raise
+            except aiosmtplib.SMTPRecipientsRefused as e:
+                raise ErrorPermanente(f"Destinatario rechazado: {[r.recipient for r in e.recipients]}") from e
+            except aiosmtplib.SMTPResponseException as e:
+                # Los códigos 5xx son rechazos definitivos; los 4xx, temporales.
+                # Tras un error devolvemos la sesión a su estado inicial para el siguiente mensaje.
+                try:
+                    await self._smtp.rset()
+                except aiosmtplib.SMTPException:
+                    self._smtp.close()
+                if e.code >= 500:
+                    raise ErrorPermanente(f"SMTP respondió {e.code}: {e.message}") from e
+                raise
+
+    async def enviar(self, destinatario: str, asunto: str, html: str) -> None:
+        async with self._lock:
+            await self._enviar_conectado(destinatario, asunto, html)
+
+    async def enviar_lote(self, mensajes: Sequence[Mensaje]) -> List[Optional[Exception]]:
+        """Envía todo el lote por la misma conexión. Devuelve el error de cada mensaje (None si salió bien)."""
+        errores: List[Optional[Exception]] = []
+        async with self._lock:
+            for mensaje in mensajes:
+                try:
+                    await self._enviar_conectado(*mensaje)
+                    errores.append(None)
+                except Exception as e:
+                    errores.append(e)
+        return errores
+
+    async def cerrar(self) -> None:
+        async with self._lock:
+            if self._smtp.is_connected:
+                try:
+                    await self._smtp.quit()
+                except aiosmtplib.SMTPException:
+                    self._smtp.close()
+
+
+def transporte_desde_entorno():
+    """
+    Elige el transporte con EMAIL_TRANSPORT: 'sendgrid' (por defecto) o 'smtp'.
+    """
+    from_email = os.getenv("EMAILS_FROM")
+    if not from_email:
+        raise ValueError("La variable de entorno EMAILS_FROM es necesaria.")
+
+    tipo = os.getenv("EMAIL_TRANSPORT", "sendgrid").lower()
+    if tipo == "smtp":
+        return TransporteSMTP(
+            host=os.getenv("SMTP_HOST", "localhost"),
+            port=int(os.getenv("SMTP_PORT", "25")),
+            from_email=from_email,
+            usuario=os.getenv("SMTP_USER"),
+            password=os.getenv("SMTP_PASSWORD"),
+            usar_tls=os.getenv("SMTP_STARTTLS", "false").lower() == "true",
+        )
+    if tipo == "sendgrid":
+        api_key = os.getenv("SENDGRID_API_KEY")
+        if not api_key:
+            raise ValueError("La variable de entorno SENDGRID_API_KEY es necesaria.")
+        return TransporteSendGrid(
+            api_key,
+            from_email,
+            host=os.getenv("SENDGRID_API_HOST"),
+            max_conexiones=int(os.getenv("SENDGRID_MAX_CONEXIONES", "5")),
+        )
+    raise ValueError(f"EMAIL_TRANSPORT desconocido: '{tipo}'. Usa 'sendgrid' o 'smtp'.")
@@ -0,0 +1,57 @@
+# backend/app/services/export_service.py
+import csv
+import io
+import json
+from typing import AsyncIterator, Iterable
+
+from sqlalchemy import Row
+
+# Columnas de la exportación, en el orden en que se escriben.
+COLUMNAS = [
+    "id", "fecha", "tipo", "estado", "valor", "descripcion",
+    "cuenta_origen", "cuenta_destino", "categoria",
+]
+
+# Cuántas filas se agrupan en cada fragmento enviado al cliente.
+# Fragmentos muy pequeños multiplican las escrituras al socket;
+# muy grandes retrasan el primer byte.
+FILAS_POR_FRAGMENTO = 500
+
+TIPOS_CONTENIDO = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _en_csv(filas: Iterable[Row]) -> str:
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    for fila in filas:
+        escritor.writerow(fila)
+    return buffer.getvalue()
+
+
+def _en_ndjson(filas: Iterable[Row]) -> str:
+    return "".join(
+        json.dumps(dict(zip(COLUMNAS, fila)), ensure_ascii=False, default=str) + "\n"
+        for fila in filas
+    )
+
+
+async def exportar(filas: AsyncIterator[Row], formato: str) -> AsyncIterator[str]:
+    """
+    Convierte un flujo de filas en fragmentos de texto CSV o NDJSON.
+    Solo mantiene en memoria un fragmento a la vez.
+    """
+    serializar = _en_csv if formato == "csv" else _en_ndjson
+    if formato == "csv":
+        yield _en_csv([COLUMNAS])
+
+    pendientes = []
+    async for fila in filas:
+        pendientes.append(fila)
+        if len(pendientes) >= FILAS_POR_FRAGMENTO:
+            yield serializar(pendientes)
+            pendientes = []
+    if pendientes:
+        yield serializar(pendientes)
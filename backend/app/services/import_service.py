@@ -0,0 +1,149 @@
+# backend/app/services/import_service.py
+import csv
+import re
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, IO, Iterator, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+# Cada fila leída se entrega como (número de fila, datos, error).
+# Si la fila no se pudo interpretar, 'datos' es None y 'error' explica por qué.
+FilaImportada = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+_FORMATOS_FECHA = ("%Y-%m-%d", "%d/%m/%Y", "%Y%m%d")
+
+
+def _parsear_fecha(texto: str) -> date:
+    texto = texto.strip()
+    for formato in _FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Fecha no reconocida: '{texto}'.")
+
+
+def _parsear_valor(texto: str) -> float:
+    limpio = texto.strip().replace("$", "").replace(" ", "")
+    # Aceptamos la coma como separador decimal si no hay punto (p. ej. "-1234,50").
+    if "," in limpio and "." not in limpio:
+        limpio = limpio.replace(",", ".")
+    else:
+        limpio = limpio.replace(",", "")
+    try:
+        return float(limpio)
+    except ValueError:
+        raise ValueError(f"Valor no reconocido: '{texto}'.")
+
+
+def _movimiento(
+    fecha: date, monto: float, descripcion: Optional[str], cuenta_id: int,
+    categoria_id: Optional[int], categoria_gasto_id: Optional[int], categoria_ingreso_id: Optional[int],
+) -> Dict[str, Any]:
+    """
+    Convierte un movimiento de extracto en los datos de una transacción:
+    los montos negativos son gastos desde la cuenta y los positivos, ingresos a ella.
+    """
+    if monto < 0:
+        return {
+            "fecha": fecha, "valor": -monto, "tipo": "Gasto", "descripcion": descripcion,
+            "cuenta_origen_id": cuenta_id, "categoria_id": categoria_id or categoria_gasto_id,
+        }
+    return {
+        "fecha": fecha, "valor": monto, "tipo": "Ingreso", "descripcion": descripcion,
+        "cuenta_destino_id": cuenta_id, "categoria_id": categoria_id or categoria_ingreso_id,
+    }
+
+
+def leer_csv(
+    archivo: IO[str], cuenta_id: int,
+    categoria_gasto_id: Optional[int] = None, categoria_ingreso_id: Optional[int] = None,
+) -> Iterator[FilaImportada]:
+    """
+    Lee un extracto CSV fila a fila. Columnas obligatorias: fecha y valor.
+    Opcionales: descripcion y categoria_id (si falta, se usa la categoría por defecto).
+    """
+    lector = csv.DictReader(archivo)
+    columnas = {c.strip().lower() for c in (lector.fieldnames or [])}
+    if not {"fecha", "valor"} <= columnas:
+        yield 1, None, "El CSV debe tener al menos las columnas 'fecha' y 'valor'."
+        return
+
+    for fila in lector:
+        numero = lector.line_num
+        fila = {(k or "").strip().lower(): (v or "").strip() for k, v in fila.items()}
+        try:
+            categoria_id = int(fila["categoria_id"]) if fila.get("categoria_id") else None
+            yield numero, _movimiento(
+                _parsear_fecha(fila["fecha"]), _parsear_valor(fila["valor"]),
+                fila.get("descripcion") or None, cuenta_id,
+                categoria_id, categoria_gasto_id, categoria_ingreso_id,
+            ), None
+        except ValueError as e:
+            yield numero, None, str(e)
+
+
+_ETIQUETA_OFX = re.compile(r"([A-Za-z0-9./]+)>(.*)", re.S)
+
+
+def _etiquetas_ofx(archivo: IO[str], tamano_bloque: int = 64 * 1024) -> Iterator[Tuple[str, str]]:
+    """Recorre el archivo OFX (SGML o XML) por bloques y entrega pares (etiqueta, valor)."""
+    resto = ""
+    while True:
+        bloque = archivo.read(tamano_bloque)
+        if not bloque:
+            break
+        partes = (resto + bloque).split("<")
+        resto = partes.pop()
+        for parte in partes:
+            coincidencia = _ETIQUETA_OFX.match(parte)
+            if coincidencia:
+                yield coincidencia.group(1).upper(), coincidencia.group(2).strip()
+    coincidencia = _ETIQUETA_OFX.match(resto)
+    if coincidencia:
+        yield coincidencia.group(1).upper(), coincidencia.group(2).strip()
+
+
+def leer_ofx(
+    archivo: IO[str], cuenta_id: int,
+    categoria_gasto_id: Optional[int] = None, categoria_ingreso_id: Optional[int] = None,
+) -> Iterator[FilaImportada]:
+    """
+    Lee los movimientos (<STMTTRN>) de un extracto OFX sin cargarlo entero en memoria.
+    El número de fila es la posición del movimiento dentro del archivo.
+    """
+    numero = 0
+    actual: Optional[Dict[str, str]] = None
+    for etiqueta, valor in _etiquetas_ofx(archivo):
+        if etiqueta == "STMTTRN":
+            actual = {}
+            numero += 1
+        elif etiqueta == "/STMTTRN" and actual is not None:
+            try:
+                if "DTPOSTED" not in actual or "TRNAMT" not in actual:
+                    raise ValueError("El movimiento no tiene DTPOSTED o TRNAMT.")
+                descripcion = " - ".join(filter(None, [actual.get("NAME"), actual.get("MEMO")])) or None
+                yield numero, _movimiento(
+                    _parsear_fecha(actual["DTPOSTED"][:8]), _parsear_valor(actual["TRNAMT"]),
+                    descripcion, cuenta_id, None, categoria_gasto_id, categoria_ingreso_id,
+                ), None
+            except ValueError as e:
+                yield numero, None, str(e)
+            actual = None
+        elif actual is not None and not etiqueta.startswith("/"):
+            actual[etiqueta] = valor
+
+
+async def leer_en_hilo(filas: Iterator[FilaImportada], tamano_bloque: int = 1000) -> AsyncIterator[FilaImportada]:
+    """
+    Recorre un lector (leer_csv / leer_ofx) desde código async sin bloquear el event
+    loop: el archivo subido puede estar en disco, así que la lectura y el parseo de
+    cada bloque de 'tamano_bloque' filas se hacen en el threadpool.
+    """
+    while True:
+        bloque = await run_in_threadpool(lambda: list(islice(filas, tamano_bloque)))
+        if not bloque:
+            return
+        for fila in bloque:
+            yield fila
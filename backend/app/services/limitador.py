@@ -0,0 +1,45 @@
+# backend/app/services/limitador.py
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+
+def conexiones_por_usuario(engine: AsyncEngine, maximo: int) -> int:
+    """
+    Cuántas conexiones del pool puede ocupar a la vez una misma petición de un usuario.
+    Nunca más de 'maximo' ni de la mitad del pool, para que un usuario no deje sin
+    conexiones a los demás. Con pools de una sola conexión (SQLite en memoria) es 1.
+    """
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return 1
+    capacidad = pool.size() + max(pool._max_overflow, 0)
+    return max(1, min(maximo, capacidad // 2))
+
+
+class LimitadorPorUsuario:
+    """
+    Un semáforo por usuario: limita cuántas consultas en paralelo lanza un mismo
+    usuario aunque abra varias pestañas. Los semáforos sin uso se descartan.
+    """
+
+    def __init__(self, limite: int):
+        self.limite = limite
+        self._semaforos: Dict[int, List] = {}  # usuario_id -> [semáforo, usos]
+
+    @asynccontextmanager
+    async def turno(self, usuario_id: int):
+        entrada = self._semaforos.get(usuario_id)
+        if entrada is None:
+            entrada = self._semaforos[usuario_id] = [asyncio.Semaphore(self.limite), 0]
+        entrada[1] += 1
+        try:
+            async with entrada[0]:
+                yield
+        finally:
+            entrada[1] -= 1
+            if entrada[1] == 0:
+                self._semaforos.pop(usuario_id, None)
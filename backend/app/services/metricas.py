@@ -0,0 +1,221 @@
+# backend/app/services/metricas.py
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Límites (en segundos) de los buckets de los histogramas de tiempo.
+BUCKETS_SEGUNDOS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Límites de los buckets del número de sentencias SQL por petición.
+BUCKETS_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class MedicionPeticion:
+    """Lo que se va acumulando durante una petición (vive en un ContextVar)."""
+    __slots__ = ("db_segundos", "sql_consultas", "serializacion_segundos", "fin_endpoint")
+
+    def __init__(self):
+        self.db_segundos = 0.0
+        self.sql_consultas = 0
+        self.serializacion_segundos = 0.0
+        self.fin_endpoint: Optional[float] = None  # momento en que el endpoint devolvió su valor
+
+
+_medicion_actual: ContextVar[Optional[MedicionPeticion]] = ContextVar("medicion_actual", default=None)
+
+
+class Histograma:
+    """Histograma acumulativo al estilo Prometheus (buckets 'le', suma y cuenta)."""
+    __slots__ = ("limites", "cuentas", "suma", "total")
+
+    def __init__(self, limites: Tuple[float, ...]):
+        self.limites = limites
+        self.cuentas = [0] * (len(limites) + 1)  # el último es +Inf
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float) -> None:
+        self.cuentas[bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+
+class RegistroMetricas:
+    """
+    Métricas por (método, plantilla de ruta): latencia total, tiempo en la base de
+    datos, tiempo de serialización, sentencias SQL y número de respuestas por estado.
+    Se agrupa por plantilla ('/transacciones/{transaccion_id}') y no por URL,
+    para que el número de series no crezca con los ids.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histogramas: Dict[Tuple[str, str, str], Histograma] = {}
+        self._respuestas: Dict[Tuple[str, str, int], int] = {}
+
+    def _observar(self, nombre: str, metodo: str, ruta: str, valor: float, limites) -> None:
+        clave = (nombre, metodo, ruta)
+        histograma = self._histogramas.get(clave)
+        if histograma is None:
+            histograma = self._histogramas[clave] = Histograma(limites)
+        histograma.observar(valor)
+
+    def registrar(self, metodo: str, ruta: str, estado: int, duracion: float, medicion: MedicionPeticion) -> None:
+        with self._lock:
+            self._observar("http_request_duration_seconds", metodo, ruta, duracion, BUCKETS_SEGUNDOS)
+            self._observar("http_request_db_seconds", metodo, ruta, medicion.db_segundos, BUCKETS_SEGUNDOS)
+            self._observar("http_request_serialization_seconds", metodo, ruta, medicion.serializacion_segundos, BUCKETS_SEGUNDOS)
+            self._observar("http_request_sql_queries", metodo, ruta, medicion.sql_consultas, BUCKETS_CONSULTAS)
+            clave = (metodo, ruta, estado)
+            self._respuestas[clave] = self._respuestas.get(clave, 0) + 1
+
+    def exportar(self) -> str:
+        """Devuelve todas las métricas en formato de texto de Prometheus."""
+        descripciones = {
+            "http_request_duration_seconds": "Latencia total de la petición.",
+            "http_request_db_seconds": "Tiempo ejecutando SQL durante la petición.",
+            "http_request_serialization_seconds": "Tiempo validando y serializando la respuesta con Pydantic.",
+            "http_request_sql_queries": "Sentencias SQL ejecutadas por petición.",
+        }
+        with self._lock:
+            histogramas = sorted(self._histogramas.items())
+            respuestas = sorted(self._respuestas.items())
+            lineas: List[str] = []
+            nombre_anterior = None
+            for (nombre, metodo, ruta), h in histogramas:
+                if nombre != nombre_anterior:
+                    lineas.append(f"# HELP {nombre} {descripciones[nombre]}")
+                    lineas.append(f"# TYPE {nombre} histogram")
+                    nombre_anterior = nombre
+                etiquetas = f'method="{metodo}",route="{_escapar(ruta)}"'
+                acumulado = 0
+                for limite, cuenta in zip(h.limites, h.cuentas):
+                    acumulado += cuenta
+                    lineas.append(f'{nombre}_bucket{{{etiquetas},le="{limite:g}"}} {acumulado}')
+                lineas.append(f'{nombre}_bucket{{{etiquetas},le="+Inf"}} {h.total}')
+                lineas.append(f"{nombre}_sum{{{etiquetas}}} {h.suma}")
+                lineas.append(f"{nombre}_count{{{etiquetas}}} {h.total}")
+
+            lineas.append("# HELP http_responses_total Respuestas por ruta y código de estado.")
+            lineas.append("# TYPE http_responses_total counter")
+            for (metodo, ruta, estado), cuenta in respuestas:
+                lineas.append(
+                    f'http_responses_total{{method="{metodo}",route="{_escapar(ruta)}",status="{estado}"}} {cuenta}'
+                )
+        return "\n".join(lineas) + "\n"
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"')
+
+
+registro_metricas = RegistroMetricas()
+
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI puro (sin BaseHTTPMiddleware, que añade una tarea por petición).
+    Mide la petición y deja un MedicionPeticion en el contexto para que los eventos
+    del engine y la serialización sumen sus tiempos.
+    """
+
+    def __init__(self, app, registro: RegistroMetricas = registro_metricas):
+        self.app = app
+        self.registro = registro
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        medicion = MedicionPeticion()
+        token = _medicion_actual.set(medicion)
+        estado = 500
+
+        async def send_con_estado(message):
+            nonlocal estado
+            if message["type"] == "http.response.start":
+                estado = message["status"]
+            await send(message)
+
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_con_estado)
+        finally:
+            duracion = time.perf_counter() - inicio
+            _medicion_actual.reset(token)
+            # El router deja la ruta encontrada en el scope. Las URLs que no
+            # coinciden con ninguna ruta se agrupan para no crear series sin límite.
+            ruta = scope.get("route")
+            plantilla = getattr(ruta, "path", None) or "<sin_ruta>"
+            self.registro.registrar(scope["method"], plantilla, estado, duracion, medicion)
+
+
+def instrumentar_engine(engine: AsyncEngine) -> None:
+    """Suma el tiempo y el número de sentencias SQL a la petición en curso."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info["metricas_inicio"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _despues(conn, cursor, statement, parameters, context, executemany):
+        medicion = _medicion_actual.get()
+        inicio = conn.info.pop("metricas_inicio", None)
+        if medicion is not None and inicio is not None:
+            medicion.db_segundos += time.perf_counter() - inicio
+            medicion.sql_consultas += 1
+
+
+def _marcar_fin(endpoint: Callable) -> Callable:
+    """Envuelve el endpoint para anotar cuándo devuelve su valor (sync o async)."""
+    def anotar():
+        medicion = _medicion_actual.get()
+        if medicion is not None:
+            medicion.fin_endpoint = time.perf_counter()
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def envoltura(*args, **kwargs):
+            resultado = await endpoint(*args, **kwargs)
+            anotar()
+            return resultado
+    else:
+        @functools.wraps(endpoint)
+        def envoltura(*args, **kwargs):
+            resultado = endpoint(*args, **kwargs)
+            anotar()
+            return resultado
+    return envoltura
+
+
+class RutaMedida(APIRoute):
+    """
+    Ruta que mide la serialización: el tiempo desde que el endpoint devuelve su valor
+    hasta que la respuesta está lista (validación con el response_model y render del
+    JSON). Se activa por router con APIRouter(route_class=RutaMedida), sin tocar nada
+    interno de FastAPI. Los endpoints que devuelven ya una Response (el camino rápido)
+    la renderizan dentro del endpoint, así que ese tiempo no cuenta como serialización.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        super().__init__(path, _marcar_fin(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        manejador = super().get_route_handler()
+
+        async def manejador_medido(request):
+            respuesta = await manejador(request)
+            medicion = _medicion_actual.get()
+            if medicion is not None and medicion.fin_endpoint is not None:
+                medicion.serializacion_segundos += time.perf_counter() - medicion.fin_endpoint
+            return respuesta
+
+        return manejador_medido
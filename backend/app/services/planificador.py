@@ -0,0 +1,192 @@
+# backend/app/services/planificador.py
+import asyncio
+import calendar
+import hashlib
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.regla_recurrente import ReglaRecurrente
+from app.models.generacion_programada import GeneracionProgramada
+import app.crud.crud_regla_recurrente as crud_regla
+
+# Clave del advisory lock de Postgres que evita que varios workers generen a la vez.
+_CLAVE_BLOQUEO_PG = 7_204_118
+
+
+def _ventana(hoy: date, meses: int) -> tuple[date, date]:
+    """
+    Meses que el planificador mantiene generados: desde el primer día del mes siguiente
+    hasta el último día del mes 'meses' posterior. El mes en curso lo sigue generando
+    el usuario a mano. Dentro de la ventana el planificador solo añade las que faltan
+    (ver _procesar_usuario), así que tampoco pisa planeadas editadas de meses futuros.
+    """
+    year, month = (hoy.year + 1, 1) if hoy.month == 12 else (hoy.year, hoy.month + 1)
+    inicio = date(year, month, 1)
+    month_fin = month + meses - 1
+    year_fin, month_fin = year + (month_fin - 1) // 12, (month_fin - 1) % 12 + 1
+    fin = date(year_fin, month_fin, calendar.monthrange(year_fin, month_fin)[1])
+    return inicio, fin
+
+
+def _firma(reglas: List[ReglaRecurrente]) -> str:
+    """Huella de las reglas activas: cambia si se crea, edita o desactiva alguna."""
+    h = hashlib.sha256()
+    for r in sorted(reglas, key=lambda r: r.id):
+        h.update(repr((
+            r.id, r.descripcion, r.valor_predeterminado, r.tipo, r.frecuencia,
+            r.dia, r.mes, r.categoria_predeterminada_id,
+        )).encode())
+    return h.hexdigest()
+
+
+class PlanificadorGeneracion:
+    """
+    Genera en segundo plano las transacciones planeadas de los próximos meses
+    para todos los usuarios con reglas activas.
+
+    - Recorre los usuarios por bloques de 'tamano_bloque' ids, procesando como mucho
+      'concurrencia' usuarios a la vez, cada uno en su propia sesión.
+    - Por usuario guarda un punto de control (GeneracionProgramada). Si sus reglas no
+      cambiaron y la ventana ya está cubierta, lo salta; si solo avanzó la ventana,
+      genera únicamente los meses nuevos. Tras un reinicio, los usuarios ya procesados
+      se saltan solos.
+    - Nunca borra ni reemplaza transacciones: solo inserta las parejas (regla, fecha)
+      que no existen en ningún estado. Para recalcular planeadas después de editar una
+      regla, el usuario sigue usando la generación manual del mes.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        meses_adelante: int = 3,
+        intervalo_segundos: float = 3600,
+        concurrencia: int = 4,
+        tamano_bloque: int = 100,
+    ):
+        self.session_factory = session_factory
+        self.meses_adelante = meses_adelante
+        self.intervalo_segundos = intervalo_segundos
+        self.concurrencia = concurrencia
+        self.tamano_bloque = tamano_bloque
+        self._tarea: Optional[asyncio.Task] = None
+
+    @classmethod
+    def desde_entorno(cls, session_factory: Callable[[], AsyncSession]) -> "PlanificadorGeneracion":
+        return cls(
+            session_factory,
+            meses_adelante=int(os.getenv("PLANIFICADOR_MESES", "3")),
+            intervalo_segundos=float(os.getenv("PLANIFICADOR_INTERVALO_SEGUNDOS", "3600")),
+            concurrencia=int(os.getenv("PLANIFICADOR_CONCURRENCIA", "4")),
+        )
+
+    # --- Ciclo de vida ---
+
+    def iniciar(self) -> None:
+        if self._tarea is None:
+            self._tarea = asyncio.create_task(self._bucle())
+
+    async def detener(self) -> None:
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+    async def _bucle(self) -> None:
+        while True:
+            try:
+                resumen = await self.ejecutar_ciclo()
+                if resumen["generados"] or resumen["errores"]:
+                    print(f"🗓️ Planificador: {resumen}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Error en el ciclo del planificador: {e}")
+            await asyncio.sleep(self.intervalo_segundos)
+
+    # --- Trabajo ---
+
+    async def ejecutar_ciclo(self, hoy: Optional[date] = None) -> Dict[str, int]:
+        """Procesa a todos los usuarios con reglas activas. Devuelve un resumen del ciclo."""
+        inicio, fin = _ventana(hoy or date.today(), self.meses_adelante)
+        resumen = {"usuarios": 0, "generados": 0, "saltados": 0, "errores": 0}
+
+        async with self.session_factory() as session:
+            # En Postgres, solo un worker a la vez ejecuta el ciclo.
+            es_postgres = session.get_bind().dialect.name == "postgresql"
+            if es_postgres:
+                obtenido = (await session.execute(
+                    text("SELECT pg_try_advisory_lock(:clave)"), {"clave": _CLAVE_BLOQUEO_PG}
+                )).scalar()
+                if not obtenido:
+                    return resumen
+            try:
+                semaforo = asyncio.Semaphore(self.concurrencia)
+
+                async def procesar(usuario_id: int):
+                    async with semaforo:
+                        try:
+                            generado = await self._procesar_usuario(usuario_id, inicio, fin)
+                            resumen["generados" if generado else "saltados"] += 1
+                        except Exception as e:
+                            resumen["errores"] += 1
+                            print(f"❌ Planificador: error con el usuario {usuario_id}: {e}")
+
+                ultimo_id = 0
+                while True:
+                    bloque = (await session.execute(
+                        select(ReglaRecurrente.usuario_id)
+                        .where(ReglaRecurrente.is_active == True, ReglaRecurrente.usuario_id > ultimo_id)
+                        .group_by(ReglaRecurrente.usuario_id)
+                        .order_by(ReglaRecurrente.usuario_id)
+                        .limit(self.tamano_bloque)
+                    )).scalars().all()
+                    if not bloque:
+                        break
+                    resumen["usuarios"] += len(bloque)
+                    await asyncio.gather(*(procesar(u) for u in bloque))
+                    ultimo_id = bloque[-1]
+            finally:
+                if es_postgres:
+                    await session.execute(
+                        text("SELECT pg_advisory_unlock(:clave)"), {"clave": _CLAVE_BLOQUEO_PG}
+                    )
+                    await session.commit()
+
+        return resumen
+
+    async def _procesar_usuario(self, usuario_id: int, inicio: date, fin: date) -> bool:
+        """Genera lo que le falte al usuario. Devuelve False si no había nada que hacer."""
+        async with self.session_factory() as session:
+            reglas = (await session.execute(
+                select(ReglaRecurrente).where(
+                    ReglaRecurrente.usuario_id == usuario_id,
+                    ReglaRecurrente.is_active == True
+                )
+            )).scalars().all()
+            firma = _firma(reglas)
+            control = await session.get(GeneracionProgramada, usuario_id)
+
+            if control is not None and control.firma_reglas == firma:
+                if control.generado_hasta >= fin:
+                    return False
+                # Las reglas no cambiaron: solo falta generar los meses nuevos de la ventana.
+                inicio = max(inicio, control.generado_hasta + timedelta(days=1))
+
+            # Solo inserta lo que falta: sin borrar planeadas editadas ni duplicar confirmadas.
+            await crud_regla.completar_transacciones_rango(session, usuario_id=usuario_id, desde=inicio, hasta=fin)
+
+            if control is None:
+                control = GeneracionProgramada(usuario_id=usuario_id)
+                session.add(control)
+            control.firma_reglas = firma
+            control.generado_hasta = fin
+            control.ultima_ejecucion = datetime.now(timezone.utc)
+            await session.commit()
+            return True
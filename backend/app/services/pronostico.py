@@ -0,0 +1,122 @@
+# backend/app/services/pronostico.py
+import calendar
+from datetime import date
+from typing import Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.regla_recurrente import ReglaRecurrente
+from app.schemas.dashboard import PronosticoResponse
+from app.services.cache import cache_lecturas
+import app.crud.crud_cuenta as crud_cuenta
+
+
+def sumar_meses(fecha: date, meses: int) -> date:
+    """La misma fecha 'meses' después (o el último día del mes si es más corto)."""
+    indice = fecha.year * 12 + fecha.month - 1 + meses
+    year, month = divmod(indice, 12)
+    return date(year, month + 1, min(fecha.day, calendar.monthrange(year, month + 1)[1]))
+
+
+def expandir_reglas(reglas: Sequence[ReglaRecurrente], desde: date, hasta: date) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Versión vectorizada de crud_regla_recurrente.expandir_regla para muchas reglas a
+    la vez: devuelve (indices, fechas), dos arrays paralelos con la posición de la regla
+    en 'reglas' y cada fecha (datetime64[D]) en que genera una transacción dentro de
+    [desde, hasta]. Las fechas se calculan como matrices regla x período, sin bucles.
+    """
+    inicio, fin = np.datetime64(desde, "D"), np.datetime64(hasta, "D")
+    frecuencia = np.array([r.frecuencia for r in reglas], dtype=object)
+    dia = np.array([-1 if r.dia is None else r.dia for r in reglas], dtype=np.int64)
+    mes = np.array([-1 if r.mes is None else r.mes for r in reglas], dtype=np.int64)
+    indices, fechas = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype="datetime64[D]")]
+
+    # Semanal: primer día con el día de la semana correcto y, desde ahí, de 7 en 7.
+    semanales = np.flatnonzero((frecuencia == "Semanal") & (dia >= 0))
+    if len(semanales):
+        dia_semana_inicio = (inicio.astype(np.int64) + 3) % 7  # el 1970-01-01 fue jueves
+        primera = inicio + (dia[semanales] - dia_semana_inicio) % 7
+        semanas = np.arange((fin - inicio).astype(np.int64) // 7 + 1)
+        matriz = primera[:, None] + 7 * semanas[None, :]
+        dentro = matriz <= fin
+        indices.append(np.broadcast_to(semanales[:, None], matriz.shape)[dentro])
+        fechas.append(matriz[dentro])
+
+    # Mensual y anual: el día 'dia' de cada mes (o el último si el mes es más corto);
+    # las anuales solo en su mes.
+    por_mes = np.flatnonzero(((frecuencia == "Mensual") | (frecuencia == "Anual")) & (dia >= 1))
+    if len(por_mes):
+        meses = np.arange(np.datetime64(desde, "M"), np.datetime64(hasta, "M") + 1)
+        primer_dia = meses.astype("datetime64[D]")
+        largo = ((meses + 1).astype("datetime64[D]") - primer_dia).astype(np.int64)
+        matriz = primer_dia[None, :] + (np.minimum(dia[por_mes, None], largo[None, :]) - 1)
+        mes_del_anio = meses.astype(np.int64) % 12 + 1
+        toca = (frecuencia[por_mes, None] == "Mensual") | (mes[por_mes, None] == mes_del_anio[None, :])
+        dentro = toca & (matriz >= inicio) & (matriz <= fin)
+        indices.append(np.broadcast_to(por_mes[:, None], matriz.shape)[dentro])
+        fechas.append(matriz[dentro])
+
+    return np.concatenate(indices), np.concatenate(fechas)
+
+
+@cache_lecturas.cacheado("reglas", "cuentas", "transacciones", esquema=PronosticoResponse)
+async def pronosticar(
+    db: AsyncSession, usuario_id: int, desde: date, meses: int, granularidad: str = "mes"
+) -> dict:
+    """
+    Proyecta los saldos desde 'desde' (incluido) hasta 'meses' meses después, partiendo
+    del saldo actual de las cuentas y sumando las transacciones que generarían las
+    reglas activas. Las reglas se expanden en memoria: no se escribe nada en la base.
+
+    Devuelve un punto por día o por mes (el saldo al final del período; el último mes
+    se corta en la fecha final). Las reglas no tienen cuenta asignada, así que cada
+    cuenta mantiene su saldo actual y el efecto de las reglas solo se ve en los
+    ingresos, gastos y saldo total de cada período.
+    """
+    hasta = sumar_meses(desde, meses)
+    cuentas = await crud_cuenta.get_cuentas_by_usuario(db=db, usuario_id=usuario_id)
+    result = await db.execute(
+        select(ReglaRecurrente).where(
+            ReglaRecurrente.usuario_id == usuario_id,
+            ReglaRecurrente.is_active == True
+        )
+    )
+    reglas = result.scalars().all()
+
+    # Cortes: desplazamiento (en días desde 'desde') del último día de cada período.
+    inicio = np.datetime64(desde, "D")
+    if granularidad == "dia":
+        cortes = np.arange((hasta - desde).days + 1)
+    else:
+        meses_rango = np.arange(np.datetime64(desde, "M"), np.datetime64(hasta, "M") + 1)
+        ultimo_dia = np.minimum((meses_rango + 1).astype("datetime64[D]") - 1, np.datetime64(hasta, "D"))
+        cortes = (ultimo_dia - inicio).astype(np.int64)
+
+    # Importe con signo de cada regla: los ingresos suman y los gastos restan.
+    signo = {"Ingreso": 1.0, "Gasto": -1.0}
+    importe = np.array([signo.get(r.tipo, 0.0) * r.valor_predeterminado for r in reglas], dtype=np.float64)
+    indices, fechas = expandir_reglas(reglas, desde, hasta)
+    valores = importe[indices]
+    periodo = np.searchsorted(cortes, (fechas - inicio).astype(np.int64))
+
+    positivos = valores > 0
+    ingresos = np.bincount(periodo[positivos], weights=valores[positivos], minlength=len(cortes))
+    gastos = np.bincount(periodo[~positivos], weights=-valores[~positivos], minlength=len(cortes))
+    saldo_actual = sum(c.saldo_actual for c in cuentas)
+    saldo_total = saldo_actual + np.cumsum(ingresos - gastos)
+
+    return {
+        "desde": desde,
+        "hasta": hasta,
+        "granularidad": granularidad,
+        "fechas": (inicio + cortes).tolist(),
+        "cuentas": [
+            {"cuenta_id": c.id, "nombre": c.nombre, "saldos": [c.saldo_actual] * len(cortes)}
+            for c in cuentas
+        ],
+        "ingresos": np.round(ingresos, 2).tolist(),
+        "gastos": np.round(gastos, 2).tolist(),
+        "saldo_total": np.round(saldo_total, 2).tolist(),
+    }
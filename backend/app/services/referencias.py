@@ -0,0 +1,103 @@
+# backend/app/services/referencias.py
+import os
+from typing import Any, Dict, Iterable
+
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.categoria import Categoria
+from app.models.cuenta import Cuenta
+from app.services.cache import CacheLRU, CacheLecturas, cache_lecturas
+
+
+class Referencias:
+    """
+    Nombres de las cuentas y categorías de un usuario, por id.
+    'recargada' indica que ya se recargó una vez por ids desconocidos.
+    """
+    __slots__ = ("cuentas", "categorias", "recargada")
+
+    def __init__(self, cuentas: Dict[int, str], categorias: Dict[int, str]):
+        self.cuentas = cuentas
+        self.categorias = categorias
+        self.recargada = False
+
+
+class MapaReferencias:
+    """
+    Mapa en memoria, por usuario, de id -> nombre de sus cuentas y categorías.
+
+    Sirve para rellenar 'cuenta_origen', 'cuenta_destino' y 'categoria' de las
+    transacciones sin selectinload ni JOIN: un usuario tiene pocas decenas de cuentas
+    y categorías, así que se cargan todas de una vez con una sola consulta.
+
+    La versión del mapa es la de los espacios 'cuentas' y 'categorias' de la caché
+    de lecturas, que ya suben crud_cuenta y crud_categoria después de cada escritura:
+    no hace falta invalidarlo aparte. Como en la caché de lecturas, la versión se lee
+    antes de cargar, así que una carga que se cruza con una escritura nace obsoleta.
+
+    Si aparece un id que el mapa no conoce (creado desde otro proceso) se recarga,
+    pero solo una vez por versión: un id que sigue sin aparecer es de una cuenta o
+    categoría borrada (SQLite no aplica las claves foráneas) y se queda sin nombre.
+    Un cambio de nombre hecho desde otro proceso se nota, como mucho, al pasar el TTL.
+    """
+
+    def __init__(self, cache: CacheLRU, lecturas: CacheLecturas):
+        self.cache = cache
+        self.lecturas = lecturas
+        self.cargas = 0
+        self.recargas_por_faltantes = 0
+
+    async def obtener(
+        self,
+        db: AsyncSession,
+        usuario_id: int,
+        ids_cuentas: Iterable[int] = (),
+        ids_categorias: Iterable[int] = (),
+    ) -> Referencias:
+        clave = (usuario_id, self.lecturas.version(usuario_id, "cuentas", "categorias"))
+        encontrado, referencias = self.cache.obtener(clave)
+        if encontrado:
+            if referencias.recargada:
+                return referencias
+            faltan = (any(i not in referencias.cuentas for i in ids_cuentas)
+                      or any(i not in referencias.categorias for i in ids_categorias))
+            if not faltan:
+                return referencias
+            self.recargas_por_faltantes += 1
+
+        referencias = await self._cargar(db, usuario_id)
+        referencias.recargada = encontrado
+        self.cache.guardar(clave, referencias)
+        return referencias
+
+    async def _cargar(self, db: AsyncSession, usuario_id: int) -> Referencias:
+        self.cargas += 1
+        query = union_all(
+            select(literal("cuenta").label("clase"), Cuenta.id, Cuenta.nombre)
+            .where(Cuenta.usuario_id == usuario_id),
+            select(literal("categoria").label("clase"), Categoria.id, Categoria.nombre)
+            .where(Categoria.usuario_id == usuario_id),
+        )
+        cuentas: Dict[int, str] = {}
+        categorias: Dict[int, str] = {}
+        for clase, id_, nombre in (await db.execute(query)).tuples():
+            (cuentas if clase == "cuenta" else categorias)[id_] = nombre
+        return Referencias(cuentas, categorias)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        return {
+            **self.cache.estadisticas(),
+            "cargas": self.cargas,
+            "recargas_por_faltantes": self.recargas_por_faltantes,
+        }
+
+
+# Instancia única para toda la app.
+mapa_referencias = MapaReferencias(
+    CacheLRU(
+        max_entradas=int(os.getenv("REFERENCIAS_MAX_USUARIOS", "10000")),
+        ttl_segundos=float(os.getenv("REFERENCIAS_TTL_SEGUNDOS", "60")),
+    ),
+    cache_lecturas,
+)
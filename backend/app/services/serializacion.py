@@ -0,0 +1,49 @@
+# backend/app/services/serializacion.py
+import functools
+import os
+from typing import Any
+
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa siempre la serialización normal
+    orjson = None
+
+
+def serializacion_rapida() -> bool:
+    """
+    True si los endpoints de listas deben usar el camino rápido (SERIALIZACION_RAPIDA=true
+    y orjson instalado). Se lee en cada petición para poder activarlo sin reiniciar en tests.
+    """
+    return orjson is not None and os.getenv("SERIALIZACION_RAPIDA", "false").lower() == "true"
+
+
+class RespuestaJSONRapida(Response):
+    """
+    Respuesta JSON codificada con orjson a partir de datos ya planos (dicts, listas,
+    números, fechas). Produce los mismos bytes que JSONResponse de Starlette
+    (compacto, UTF-8 sin escapar) para los datos que devuelve esta API; solo difiere
+    en la notación de floats muy grandes o muy pequeños (1e16 frente a 1e+16).
+    El contenido NO pasa por el response_model: quien la crea garantiza la forma.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+@functools.lru_cache(maxsize=None)
+def _adaptador(esquema: Any) -> TypeAdapter:
+    return TypeAdapter(esquema)
+
+
+def a_plano(esquema: Any, valor: Any) -> Any:
+    """
+    Convierte 'valor' (objetos ORM o modelos Pydantic) en datos planos con la forma de
+    'esquema', igual que lo haría FastAPI con el response_model. Para listas pequeñas
+    (cuentas, resúmenes del dashboard) que ya vienen de la caché de lecturas.
+    """
+    adaptador = _adaptador(esquema)
+    return adaptador.dump_python(adaptador.validate_python(valor, from_attributes=True), mode="json")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# backend/scripts/benchmark_serialization.py
+"""
+Compara el tiempo de CPU de la serialización normal y del camino rápido
+(SERIALIZACION_RAPIDA) para la respuesta del historial por período.
+
+No necesita base de datos: genera en memoria filas con la misma forma que las
+que devuelve la consulta de 'transacciones' y mide, por separado:
+  - construir: filas -> TransaccionResponse (normal) o -> dicts planos (rápido)
+  - codificar: response_model de FastAPI + JSONResponse (normal) o orjson (rápido)
+Comprueba además que los dos caminos producen exactamente los mismos bytes.
+
+Uso:
+    python scripts/benchmark_serialization.py
+    python scripts/benchmark_serialization.py --filas 50000 --repeticiones 7
+"""
+
+import sys, os
+# Asegura que Python encuentre tu carpeta 'backend/'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.crud.crud_transaccion import respuestas_desde_filas, dicts_desde_filas
+from app.schemas.transaccion import TransaccionPeriodResponse
+from app.services.referencias import Referencias
+from app.services.serializacion import RespuestaJSONRapida, orjson
+
+
+def _filas(cantidad: int, semilla: int):
+    rnd = random.Random(semilla)
+    cuentas = {i: f"Cuenta {i}" for i in range(1, 6)}
+    categorias = {i: n for i, n in enumerate(
+        ["Mercado", "Transporte", "Restaurantes", "Servicios", "Salud", "Ocio", "Salario", "Arriendo"], start=1)}
+    filas, saldo = [], 1_000_000.0
+    for i in range(cantidad):
+        tipo = rnd.choices(["Gasto", "Ingreso", "Transferencia"], [80, 12, 8])[0]
+        valor = round(rnd.uniform(1_000, 400_000), 2)
+        origen = rnd.choice(list(cuentas)) if tipo != "Ingreso" else None
+        destino = rnd.choice(list(cuentas)) if tipo != "Gasto" else None
+        categoria = rnd.choice(list(categorias)) if tipo != "Transferencia" else None
+        saldo += valor if tipo == "Ingreso" else (-valor if tipo == "Gasto" else 0)
+        filas.append({
+            "id": i + 1, "fecha": date(2025, 1, 1) + timedelta(days=i % 365), "valor": valor, "tipo": tipo,
+            "descripcion": rnd.choice([None, "Compra", "Pago con tarjeta", "Transferencia a ahorro"]),
+            "estado": "Confirmado", "regla_recurrente_id": None, "categoria_id": categoria,
+            "cuenta_origen_id": origen, "cuenta_destino_id": destino, "usuario_id": 1,
+            "saldo_acumulado": saldo,
+        })
+    return filas, Referencias(cuentas, categorias)
+
+
+async def _normal(filas, referencias, campo):
+    inicio = time.process_time()
+    contenido = {"saldo_inicial_periodo": 1_000_000.0,
+                 "transacciones": respuestas_desde_filas(filas, referencias)}
+    construido = time.process_time()
+    # Lo mismo que hace FastAPI con el response_model y la respuesta por defecto.
+    datos = await serialize_response(field=campo, response_content=contenido)
+    cuerpo = JSONResponse(datos).body
+    return construido - inicio, time.process_time() - construido, cuerpo
+
+
+def _rapido(filas, referencias):
+    inicio = time.process_time()
+    contenido = {"saldo_inicial_periodo": 1_000_000.0,
+                 "transacciones": dicts_desde_filas(filas, referencias)}
+    construido = time.process_time()
+    cuerpo = RespuestaJSONRapida(contenido).body
+    return construido - inicio, time.process_time() - construido, cuerpo
+
+
+async def main(args) -> int:
+    if orjson is None:
+        print("❌ orjson no está instalado: el camino rápido no está disponible.")
+        return 1
+
+    filas, referencias = _filas(args.filas, args.semilla)
+    campo = create_model_field(name="Response_benchmark", type_=TransaccionPeriodResponse, mode="serialization")
+
+    medidas = {"normal": [], "rapido": []}
+    cuerpos = {}
+    for _ in range(args.repeticiones):
+        *tiempos, cuerpos["normal"] = await _normal(filas, referencias, campo)
+        medidas["normal"].append(tiempos)
+        *tiempos, cuerpos["rapido"] = _rapido(filas, referencias)
+        medidas["rapido"].append(tiempos)
+
+    escala = 10_000 / args.filas * 1000  # segundos totales -> ms por cada 10k filas
+    print(f"📦 {args.filas:,} filas, {len(cuerpos['normal']) / 1e6:.1f} MB de JSON, mediana de {args.repeticiones} repeticiones")
+    print(f"\n{'camino':<10}{'construir':>12}{'codificar':>12}{'total':>12}   (ms de CPU por 10k filas)")
+    totales = {}
+    for camino, tiempos in medidas.items():
+        construir = statistics.median(t[0] for t in tiempos) * escala
+        codificar = statistics.median(t[1] for t in tiempos) * escala
+        totales[camino] = statistics.median(t[0] + t[1] for t in tiempos) * escala
+        print(f"{camino:<10}{construir:>12.1f}{codificar:>12.1f}{totales[camino]:>12.1f}")
+
+    ahorro = totales["normal"] - totales["rapido"]
+    print(f"\n⚡ Ahorro: {ahorro:.1f} ms de CPU por cada 10k filas ({ahorro / totales['normal']:.0%}, "
+          f"{totales['normal'] / totales['rapido']:.1f}x).")
+
+    if cuerpos["normal"] != cuerpos["rapido"]:
+        print("❌ Los dos caminos NO producen los mismos bytes.")
+        return 1
+    print("✅ Los dos caminos producen exactamente los mismos bytes.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la serialización rápida de listas de transacciones.")
+    parser.add_argument("--filas", type=int, default=10_000, help="Transacciones en la respuesta (por defecto 10000).")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Repeticiones; se toma la mediana (por defecto 5).")
+    parser.add_argument("--semilla", type=int, default=42, help="Semilla de los datos generados.")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# backend/scripts/check_import_time.py
+"""
+Presupuesto de tiempo de importación de la app.
+
+Importa 'app.main' en un proceso limpio con 'python -X importtime' y falla si
+tarda más que el presupuesto. El proceso se lanza SIN las variables de entorno
+de la app (DATABASE_URL, JWT_SECRET, EMAILS_FROM, SENDGRID_API_KEY...) para
+comprobar además que importar no tiene efectos: no crea el engine, no lee
+secretos y no construye clientes de correo.
+
+Uso:
+    python scripts/check_import_time.py                 # presupuesto por defecto
+    python scripts/check_import_time.py --budget-ms 800 --top 15
+
+Como el tiempo varía entre ejecuciones, se toma la mejor de '--repeticiones'.
+"""
+
+import sys, os
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import subprocess
+
+# Variables que la app usa en ejecución y que no deben hacer falta para importarla.
+VARIABLES_APP = (
+    "DATABASE_URL", "JWT_SECRET", "EMAILS_FROM", "SENDGRID_API_KEY",
+    "SENDGRID_API_HOST", "EMAIL_TRANSPORT", "SMTP_HOST", "SMTP_PORT",
+)
+
+
+def medir() -> tuple[int, list[tuple[int, str]]]:
+    """Devuelve (microsegundos totales de app.main, [(acumulado_us, modulo), ...])."""
+    entorno = {k: v for k, v in os.environ.items() if k not in VARIABLES_APP}
+    # Ojo: si hay un archivo .env, load_dotenv volverá a poner esas variables.
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND,
+        env=entorno,
+        capture_output=True,
+        text=True,
+    )
+    if proceso.returncode != 0:
+        ultimas = "\n".join(proceso.stderr.strip().splitlines()[-15:])
+        raise RuntimeError(f"No se pudo importar app.main sin configuración:\n{ultimas}")
+
+    modulos = []
+    total = None
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        if not acumulado.strip().isdigit():
+            continue  # cabecera
+        modulos.append((int(acumulado), nombre.rstrip()))
+        if nombre.strip() == "app.main":
+            total = int(acumulado)
+    if total is None:
+        raise RuntimeError("No se encontró 'app.main' en la salida de -X importtime.")
+    return total, modulos
+
+
+def main(presupuesto_ms: float, top: int, repeticiones: int) -> int:
+    mejor_total, mejor_modulos = None, []
+    for _ in range(repeticiones):
+        total, modulos = medir()
+        if mejor_total is None or total < mejor_total:
+            mejor_total, mejor_modulos = total, modulos
+
+    total_ms = mejor_total / 1000
+    print(f"Importar app.main: {total_ms:.0f} ms (presupuesto {presupuesto_ms:.0f} ms)")
+    print("\nMódulos de la app más lentos (acumulado):")
+    propios = sorted((m for m in mejor_modulos if m[1].strip().startswith("app.")), reverse=True)
+    for acumulado, nombre in propios[:top]:
+        print(f"  {acumulado / 1000:8.1f} ms  {nombre.strip()}")
+
+    if total_ms > presupuesto_ms:
+        print(f"\n❌ La importación supera el presupuesto en {total_ms - presupuesto_ms:.0f} ms.")
+        return 1
+    print("\n✅ Importación dentro del presupuesto y sin configuración.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comprueba el tiempo de importación de app.main.")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1500")),
+                        help="Presupuesto en milisegundos (por defecto 1500 o IMPORT_BUDGET_MS).")
+    parser.add_argument("--top", type=int, default=10, help="Cuántos módulos de la app listar.")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Se toma la mejor de N mediciones.")
+    args = parser.parse_args()
+    try:
+        sys.exit(main(args.budget_ms, args.top, args.repeticiones))
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# backend/scripts/check_query_plans.py
+"""
+Prueba de regresión de planes de consulta.
+
+Crea una base de datos con datos sembrados, ejecuta las funciones crud de las
+rutas más frecuentes, captura el SQL que emiten y comprueba con EXPLAIN que
+ninguna consulta sobre 'transacciones' (ni sobre 'agregados_mensuales') hace
+un recorrido completo de la tabla.
+
+Uso:
+    python scripts/check_query_plans.py                        # SQLite temporal
+    python scripts/check_query_plans.py --url postgresql+asyncpg://...
+
+En Postgres se desactiva enable_seqscan para comprobar que existe un índice
+utilizable, ya que con pocas filas el planificador prefiere el recorrido secuencial.
+¡OJO! En Postgres el script crea y borra todas las tablas de la base indicada.
+"""
+
+import sys, os
+# Asegura que Python encuentre tu carpeta 'backend/'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import tempfile
+from datetime import date, timedelta
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base, User, Cuenta, Categoria, Transaccion, ReglaRecurrente
+import app.crud.crud_transaccion as crud_transaccion
+import app.crud.crud_dashboard as crud_dashboard
+import app.crud.crud_regla_recurrente as crud_regla
+from app.services.cache import cache_lecturas
+from app.services.analitica import motor_analitica
+
+TABLAS_VIGILADAS = ("transacciones", "agregados_mensuales")
+USUARIOS = 5
+TRANSACCIONES_POR_USUARIO = 3000
+
+
+async def sembrar(session: AsyncSession):
+    rnd = random.Random(42)
+    for u in range(1, USUARIOS + 1):
+        await session.execute(insert(User), [{
+            "id": u, "email": f"plan{u}@example.com", "hashed_password": "x",
+            "nombre": f"Plan {u}", "is_active": True, "is_superuser": False, "is_verified": True,
+        }])
+        await session.execute(insert(Cuenta), [
+            {"id": u * 10 + c, "nombre": f"Cuenta {c}", "tipo": "Banco", "saldo_inicial": 0.0,
+             "saldo_actual": 0.0, "usuario_id": u} for c in range(3)
+        ])
+        await session.execute(insert(Categoria), [
+            {"id": u * 10 + c, "nombre": f"Categoria {c}", "tipo": "Gasto", "usuario_id": u} for c in range(5)
+        ])
+        await session.execute(insert(ReglaRecurrente), [{
+            "descripcion": "Arriendo", "valor_predeterminado": 100.0, "tipo": "Gasto",
+            "frecuencia": "Mensual", "dia": 5, "is_active": True, "usuario_id": u,
+            "categoria_predeterminada_id": u * 10,
+        }])
+        inicio = date(2020, 1, 1)
+        filas = []
+        for _ in range(TRANSACCIONES_POR_USUARIO):
+            confirmado = rnd.random() < 0.9
+            filas.append({
+                "fecha": inicio + timedelta(days=rnd.randrange(365 * 5)),
+                "valor": round(rnd.uniform(1, 500), 2), "tipo": "Gasto",
+                "estado": "Confirmado" if confirmado else "Planeado",
+                "cuenta_origen_id": u * 10 + rnd.randrange(3),
+                "categoria_id": u * 10 + rnd.randrange(5), "usuario_id": u,
+            })
+        await session.execute(insert(Transaccion), filas)
+    await session.commit()
+    await crud_dashboard.reconstruir_agregados(session)
+
+
+async def consultas_frecuentes(session: AsyncSession):
+    """Las rutas calientes que deben resolverse con índices."""
+    await crud_transaccion.get_transactions_with_starting_balance(
+        session, usuario_id=3, start_date=date(2023, 3, 1), end_date=date(2023, 3, 31)
+    )
+    await crud_transaccion.get_latest_confirmed_transactions(session, usuario_id=3, limit=10)
+    pagina = await crud_transaccion.get_transacciones_pagina(session, usuario_id=3, limit=50)
+    await crud_transaccion.get_transacciones_pagina(
+        session, usuario_id=3, limit=50, cursor=pagina["next_cursor"]
+    )
+    await crud_dashboard.get_resumen_mensual_por_ano(session, usuario_id=3, year=2023)
+    await crud_dashboard.get_resumen_gastos_por_categoria(session, usuario_id=3, year=2023, month=3)
+    await crud_regla.generar_transacciones_planeadas(session, usuario_id=3, year=2023, month=3)
+    await motor_analitica.historial(session, usuario_id=3)
+
+
+def recorridos_completos(dialecto: str, plan: list) -> list:
+    """Devuelve las líneas del plan que recorren completa una tabla vigilada."""
+    malas = []
+    if dialecto == "sqlite":
+        for linea in plan:
+            detalle = linea[-1]
+            for tabla in TABLAS_VIGILADAS:
+                if re.match(rf"SCAN (TABLE )?{tabla}\b(?! USING)", detalle):
+                    malas.append(detalle)
+    else:
+        def recorrer(nodo):
+            if nodo.get("Node Type") == "Seq Scan" and nodo.get("Relation Name") in TABLAS_VIGILADAS:
+                malas.append(f"Seq Scan on {nodo['Relation Name']}")
+            for hijo in nodo.get("Plans", []):
+                recorrer(hijo)
+        for linea in plan:
+            documento = linea[0] if isinstance(linea[0], list) else json.loads(linea[0])
+            recorrer(documento[0]["Plan"])
+    return malas
+
+
+async def main(url: str | None) -> int:
+    temporal = None
+    if url is None:
+        temporal = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        url = f"sqlite+aiosqlite:///{temporal.name}"
+
+    engine = create_async_engine(url)
+    dialecto = engine.dialect.name
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as session:
+        await sembrar(session)
+
+    capturadas = []
+    # Sin caché de lecturas: queremos ver el SQL de cada llamada.
+    cache_lecturas.habilitada = False
+
+    def capturar(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and any(t in statement for t in TABLAS_VIGILADAS):
+            capturadas.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capturar)
+    async with Session() as session:
+        await consultas_frecuentes(session)
+        await session.rollback()
+    event.remove(engine.sync_engine, "before_cursor_execute", capturar)
+
+    fallos = 0
+    async with engine.connect() as conn:
+        if dialecto == "postgresql":
+            await conn.exec_driver_sql("SET enable_seqscan = off")
+        prefijo = "EXPLAIN QUERY PLAN " if dialecto == "sqlite" else "EXPLAIN (FORMAT JSON) "
+        for statement, parameters in capturadas:
+            plan = (await conn.exec_driver_sql(prefijo + statement, parameters)).all()
+            malas = recorridos_completos(dialecto, plan)
+            resumen = " ".join(statement.split())[:110]
+            if malas:
+                fallos += 1
+                print(f"❌ {resumen}...\n   -> {'; '.join(malas)}")
+            else:
+                print(f"✅ {resumen}...")
+        await conn.rollback()
+
+    await engine.dispose()
+    if temporal is not None:
+        os.unlink(temporal.name)
+
+    if fallos:
+        print(f"\n❌ {fallos} consulta(s) recorren tablas completas.")
+        return 1
+    print(f"\n✅ Las {len(capturadas)} consultas vigiladas usan índices.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifica que las consultas frecuentes usen índices.")
+    parser.add_argument("--url", default=None, help="URL async de la base de datos (por defecto, SQLite temporal).")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.url)))
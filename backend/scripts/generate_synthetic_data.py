@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# backend/scripts/generate_synthetic_data.py
+"""
+Genera datos sintéticos y deterministas para pruebas de rendimiento.
+
+Crea N usuarios verificados (sintetico1@example.com, sintetico2@example.com, ...)
+con cuentas, categorías, reglas recurrentes y un historial de transacciones con
+forma realista: nómina mensual, gastos frecuentes pequeños y alguno grande,
+transferencias entre cuentas y algunas planeadas. Con la misma semilla siempre
+salen exactamente los mismos datos, y el usuario i es el mismo aunque cambie N.
+
+Al terminar recalcula los datos derivados (saldo_actual y agregados mensuales).
+
+Uso:
+    python scripts/generate_synthetic_data.py --usuarios 20 --transacciones 50000
+    python scripts/generate_synthetic_data.py --url sqlite+aiosqlite:///./bench.db --crear-tablas
+    python scripts/generate_synthetic_data.py --url postgresql+asyncpg://... --usuarios 200 --transacciones 10000
+
+--transacciones es POR USUARIO (200 x 10000 = 2 millones).
+Los usuarios se crean con la contraseña de --password para poder hacer login
+(p. ej. desde scripts/load_test.py).
+"""
+
+import sys, os
+# Asegura que Python encuentre tu carpeta 'backend/'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import calendar
+import random
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+from fastapi_users.password import PasswordHelper
+from sqlalchemy import delete, insert, select
+
+EMAIL_SINTETICO = "sintetico{}@example.com"
+PASSWORD_POR_DEFECTO = "Sintetico123!"
+
+CUENTAS = [
+    ("Cuenta corriente", "Banco", (500, 5000)),
+    ("Ahorros", "Banco", (1000, 20000)),
+    ("Tarjeta de crédito", "Tarjeta", (0, 0)),
+    ("Efectivo", "Efectivo", (20, 300)),
+]
+
+# (nombre, tipo, peso de frecuencia, valor típico)
+CATEGORIAS = [
+    ("Supermercado", "Gasto", 30, 60),
+    ("Restaurantes", "Gasto", 15, 35),
+    ("Transporte", "Gasto", 15, 20),
+    ("Ocio", "Gasto", 8, 45),
+    ("Salud", "Gasto", 4, 80),
+    ("Hogar", "Gasto", 5, 120),
+    ("Ropa", "Gasto", 4, 70),
+    ("Viajes", "Gasto", 1, 600),
+    ("Nómina", "Ingreso", 0, 0),
+    ("Otros ingresos", "Ingreso", 2, 150),
+]
+
+# (descripcion, tipo, frecuencia, categoria, valor)
+REGLAS = [
+    ("Alquiler", "Gasto", "Mensual", "Hogar", 850),
+    ("Nómina", "Ingreso", "Mensual", "Nómina", 2400),
+    ("Gimnasio", "Gasto", "Mensual", "Salud", 40),
+    ("Streaming", "Gasto", "Mensual", "Ocio", 13),
+    ("Compra semanal", "Gasto", "Semanal", "Supermercado", 75),
+    ("Seguro del coche", "Gasto", "Anual", "Transporte", 420),
+]
+
+
+def _meses(desde: date, hasta: date):
+    year, month = desde.year, desde.month
+    while (year, month) <= (hasta.year, hasta.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _transacciones_usuario(
+    rnd: random.Random,
+    usuario_id: int,
+    cuentas: Dict[str, int],
+    categorias: Dict[str, int],
+    cantidad: int,
+    desde: date,
+    hasta: date,
+) -> List[dict]:
+    """Historial de un usuario: nóminas mensuales, transferencias y gastos aleatorios."""
+    filas: List[dict] = []
+    corriente, ahorros = cuentas["Cuenta corriente"], cuentas["Ahorros"]
+    dias = (hasta - desde).days + 1
+    # Lo último del período puede quedar como planeado, como haría el planificador.
+    limite_planeadas = hasta - timedelta(days=30)
+
+    def fila(fecha, valor, tipo, origen=None, destino=None, categoria=None, descripcion=None):
+        filas.append({
+            "fecha": fecha,
+            "valor": round(valor, 2),
+            "tipo": tipo,
+            "descripcion": descripcion,
+            "estado": "Planeado" if fecha > limite_planeadas and rnd.random() < 0.5 else "Confirmado",
+            "usuario_id": usuario_id,
+            "cuenta_origen_id": origen,
+            "cuenta_destino_id": destino,
+            "categoria_id": categoria,
+            "regla_recurrente_id": None,
+        })
+
+    # Nómina y ahorro de cada mes.
+    nomina = rnd.uniform(1500, 4500)
+    for year, month in _meses(desde, hasta):
+        dia = min(rnd.randint(1, 5), calendar.monthrange(year, month)[1])
+        fecha = date(year, month, dia)
+        if desde <= fecha <= hasta and len(filas) < cantidad:
+            fila(fecha, nomina * rnd.uniform(0.98, 1.05), "Ingreso", destino=corriente,
+                 categoria=categorias["Nómina"], descripcion="Nómina")
+        if desde <= fecha + timedelta(days=2) <= hasta and len(filas) < cantidad and rnd.random() < 0.7:
+            fila(fecha + timedelta(days=2), nomina * rnd.uniform(0.05, 0.2), "Transferencia",
+                 origen=corriente, destino=ahorros, descripcion="Ahorro del mes")
+
+    # El resto, movimientos repartidos por el período según el peso de cada categoría.
+    # Los importes se escalan para que, haya muchos o pocos movimientos, el gasto
+    # total ronde el 85% de lo ingresado y los saldos se mantengan creíbles.
+    variables = [c for c in CATEGORIAS if c[2] > 0]
+    pesos = [c[2] for c in variables]
+    restantes = max(1, cantidad - len(filas))
+    tipico_medio = sum(c[2] * c[3] for c in variables) / sum(pesos)
+    escala = (nomina * len(list(_meses(desde, hasta))) * 0.85) / (restantes * tipico_medio * 1.2)
+    origenes = [corriente] * 6 + [cuentas["Tarjeta de crédito"]] * 3 + [cuentas["Efectivo"]]
+    while len(filas) < cantidad:
+        nombre, tipo, _, tipico = rnd.choices(variables, weights=pesos)[0]
+        fecha = desde + timedelta(days=rnd.randrange(dias))
+        valor = max(0.5, rnd.lognormvariate(0, 0.6) * tipico * escala)
+        if tipo == "Ingreso":
+            fila(fecha, valor, "Ingreso", destino=corriente, categoria=categorias[nombre], descripcion=nombre)
+        else:
+            fila(fecha, valor, "Gasto", origen=rnd.choice(origenes), categoria=categorias[nombre], descripcion=nombre)
+
+    filas.sort(key=lambda f: f["fecha"])
+    return filas
+
+
+async def generar(
+    async_session,
+    usuarios: int,
+    transacciones: int,
+    desde: date,
+    hasta: date,
+    semilla: int = 42,
+    password: str = PASSWORD_POR_DEFECTO,
+    tamano_lote: int = 10_000,
+) -> List[int]:
+    """Crea los usuarios sintéticos (reemplazando los que ya existan). Devuelve sus ids."""
+    from app.models.usuario import User
+    from app.models.cuenta import Cuenta
+    from app.models.categoria import Categoria
+    from app.models.transaccion import Transaccion
+    from app.models.regla_recurrente import ReglaRecurrente
+    from app.models.agregado_mensual import AgregadoMensual
+    from app.models.generacion_programada import GeneracionProgramada
+    import app.crud.crud_cuenta as crud_cuenta
+    import app.crud.crud_dashboard as crud_dashboard
+
+    hash_password = PasswordHelper().hash(password)
+    emails = [EMAIL_SINTETICO.format(i) for i in range(1, usuarios + 1)]
+    ids: List[int] = []
+
+    async with async_session() as session:
+        # 1. Borrar una generación anterior con los mismos emails.
+        anteriores = (await session.execute(select(User.id).where(User.email.in_(emails)))).scalars().all()
+        if anteriores:
+            for modelo in (Transaccion, ReglaRecurrente, AgregadoMensual, GeneracionProgramada, Categoria, Cuenta):
+                await session.execute(delete(modelo).where(modelo.usuario_id.in_(anteriores)))
+            await session.execute(delete(User).where(User.id.in_(anteriores)))
+            await session.commit()
+            print(f"🧹 {len(anteriores)} usuarios sintéticos anteriores eliminados.")
+
+        inicio = time.perf_counter()
+        total = 0
+        for i, email in enumerate(emails, start=1):
+            # Un generador por usuario: el usuario i no depende de cuántos se creen.
+            rnd = random.Random(f"{semilla}-{i}")
+
+            usuario_id = (await session.execute(
+                insert(User).returning(User.id),
+                [{"email": email, "hashed_password": hash_password, "nombre": f"Sintético {i}",
+                  "is_active": True, "is_verified": True, "is_superuser": False}],
+            )).scalar_one()
+            ids.append(usuario_id)
+
+            cuenta_ids = (await session.execute(
+                insert(Cuenta).returning(Cuenta.id, sort_by_parameter_order=True),
+                [{"nombre": n, "tipo": t, "saldo_inicial": round(rnd.uniform(*r), 2), "usuario_id": usuario_id}
+                 for n, t, r in CUENTAS],
+            )).scalars().all()
+            cuentas = dict(zip((c[0] for c in CUENTAS), cuenta_ids))
+
+            categoria_ids = (await session.execute(
+                insert(Categoria).returning(Categoria.id, sort_by_parameter_order=True),
+                [{"nombre": n, "tipo": t, "usuario_id": usuario_id} for n, t, _, _ in CATEGORIAS],
+            )).scalars().all()
+            categorias = dict(zip((c[0] for c in CATEGORIAS), categoria_ids))
+
+            await session.execute(insert(ReglaRecurrente), [
+                {"descripcion": d, "tipo": t, "frecuencia": f, "valor_predeterminado": v,
+                 "dia": rnd.randint(0, 6) if f == "Semanal" else rnd.randint(1, 28),
+                 "mes": rnd.randint(1, 12) if f == "Anual" else None,
+                 "categoria_predeterminada_id": categorias[c], "usuario_id": usuario_id, "is_active": True}
+                for d, t, f, c, v in REGLAS
+            ])
+
+            filas = _transacciones_usuario(rnd, usuario_id, cuentas, categorias, transacciones, desde, hasta)
+            for j in range(0, len(filas), tamano_lote):
+                await session.execute(insert(Transaccion), filas[j:j + tamano_lote])
+            await session.commit()
+            total += len(filas)
+            if i % 10 == 0 or i == usuarios:
+                print(f"   {i}/{usuarios} usuarios, {total:,} transacciones ({time.perf_counter() - inicio:.1f} s)")
+
+        # 2. Datos derivados: saldos y agregados del dashboard.
+        for usuario_id in ids:
+            await crud_cuenta.verificar_saldos(session, usuario_id=usuario_id, corregir=True)
+            await crud_dashboard.reconstruir_agregados(session, usuario_id=usuario_id)
+
+    print(f"✅ {usuarios} usuarios y {total:,} transacciones generados en {time.perf_counter() - inicio:.1f} s.")
+    return ids
+
+
+async def main(args) -> None:
+    if args.url:
+        os.environ["DATABASE_URL"] = args.url
+    from app.db.session import get_engine, get_sessionmaker, dispose_engine
+    from app.db.base import Base
+
+    if args.crear_tablas:
+        async with get_engine().begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    await generar(
+        get_sessionmaker(),
+        usuarios=args.usuarios,
+        transacciones=args.transacciones,
+        desde=date.fromisoformat(args.desde),
+        hasta=date.fromisoformat(args.hasta),
+        semilla=args.semilla,
+        password=args.password,
+    )
+    await dispose_engine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera usuarios y transacciones sintéticas.")
+    parser.add_argument("--usuarios", type=int, default=10, help="Número de usuarios (por defecto 10).")
+    parser.add_argument("--transacciones", type=int, default=5000, help="Transacciones POR usuario (por defecto 5000).")
+    parser.add_argument("--desde", default="2021-01-01", help="Primera fecha del historial (por defecto 2021-01-01).")
+    parser.add_argument("--hasta", default="2025-12-31", help="Última fecha del historial (por defecto 2025-12-31).")
+    parser.add_argument("--semilla", type=int, default=42, help="Semilla del generador aleatorio.")
+    parser.add_argument("--password", default=PASSWORD_POR_DEFECTO, help="Contraseña de los usuarios creados.")
+    parser.add_argument("--url", default=None, help="URL async de la base de datos (por defecto DATABASE_URL).")
+    parser.add_argument("--crear-tablas", action="store_true", help="Crea las tablas si no existen (sin Alembic).")
+    asyncio.run(main(parser.parse_args()))
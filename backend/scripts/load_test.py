@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# backend/scripts/load_test.py
+"""
+Prueba de carga HTTP contra la API en local.
+
+Inicia sesión con los usuarios sintéticos de scripts/generate_synthetic_data.py y
+lanza una mezcla de peticiones (dashboard, historial, crear y editar transacciones)
+a un ritmo fijo de peticiones por segundo, con un máximo de peticiones en curso.
+Al final muestra por endpoint: peticiones, errores, p50/p95/p99 y throughput.
+
+Uso (con la API levantada, p. ej. 'uvicorn app.main:app --workers 2'):
+    python scripts/generate_synthetic_data.py --url sqlite+aiosqlite:///./carga.db --crear-tablas --usuarios 20
+    python scripts/load_test.py --usuarios 20 --tasa 100 --concurrencia 50 --duracion 60
+    python scripts/load_test.py --mezcla dashboard.resumen_mensual=5,transacciones.crear=1 --salida carga.json
+
+El ritmo es de lazo abierto: se intenta lanzar una petición cada 1/tasa segundos
+aunque las anteriores no hayan terminado. Si se alcanza la concurrencia, las nuevas
+esperan turno y se cuentan como 'retrasadas' (señal de que la API no da abasto).
+Las transacciones creadas durante la prueba se borran al final salvo con --conservar.
+"""
+
+import sys, os
+# Asegura que Python encuentre los otros scripts
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import argparse
+import asyncio
+import calendar
+import json
+import random
+import time
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+from generate_synthetic_data import EMAIL_SINTETICO, PASSWORD_POR_DEFECTO
+
+# Peso por defecto de cada operación: sobre todo lecturas, como el uso real.
+MEZCLA_POR_DEFECTO = {
+    "dashboard.resumen_mensual": 4,
+    "dashboard.gastos_por_categoria": 3,
+    "dashboard.ultimas": 4,
+    "historial.mes": 4,
+    "historial.pagina": 2,
+    "cuentas.listar": 2,
+    "transacciones.crear": 1,
+    "transacciones.actualizar": 1,
+}
+
+
+class Usuario:
+    """Token y datos de un usuario sintético ya logueado."""
+
+    def __init__(self, email: str, token: str):
+        self.email = email
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.cuentas: List[int] = []
+        self.categorias_gasto: List[int] = []
+        self.creadas: List[dict] = []
+
+
+class Resultados:
+    def __init__(self):
+        self.latencias: Dict[str, List[float]] = defaultdict(list)
+        self.errores: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.retrasadas = 0
+
+    def anotar(self, operacion: str, segundos: float, error: Optional[str]) -> None:
+        self.latencias[operacion].append(segundos)
+        if error:
+            self.errores[operacion][error] += 1
+
+
+def _percentil(ordenados: List[float], p: float) -> float:
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def _parsear_mezcla(texto: Optional[str]) -> Dict[str, int]:
+    if not texto:
+        return dict(MEZCLA_POR_DEFECTO)
+    mezcla = {}
+    for parte in texto.split(","):
+        nombre, _, peso = parte.partition("=")
+        nombre = nombre.strip()
+        if nombre not in MEZCLA_POR_DEFECTO:
+            raise SystemExit(f"❌ Operación desconocida '{nombre}'. Opciones: {', '.join(MEZCLA_POR_DEFECTO)}")
+        mezcla[nombre] = int(peso or 1)
+    return mezcla
+
+
+async def _login(client: httpx.AsyncClient, email: str, password: str) -> Optional[Usuario]:
+    resp = await client.post("/auth/jwt/login", data={"username": email, "password": password})
+    if resp.status_code != 200:
+        print(f"⚠️  No se pudo iniciar sesión con {email}: {resp.status_code} {resp.text[:120]}")
+        return None
+    usuario = Usuario(email, resp.json()["access_token"])
+    cuentas = await client.get("/cuentas/", headers=usuario.headers)
+    categorias = await client.get("/categorias/", headers=usuario.headers)
+    usuario.cuentas = [c["id"] for c in cuentas.json()]
+    usuario.categorias_gasto = [c["id"] for c in categorias.json() if c["tipo"] == "Gasto"]
+    return usuario
+
+
+def _nuevo_gasto(rnd: random.Random, usuario: Usuario, anio: int) -> dict:
+    return {
+        "fecha": date(anio, rnd.randint(1, 12), rnd.randint(1, 28)).isoformat(),
+        "valor": round(rnd.uniform(5_000, 150_000), 2),
+        "tipo": "Gasto",
+        "descripcion": "Prueba de carga",
+        "estado": "Confirmado",
+        "cuenta_origen_id": rnd.choice(usuario.cuentas),
+        "categoria_id": rnd.choice(usuario.categorias_gasto),
+    }
+
+
+async def _ejecutar(operacion: str, client: httpx.AsyncClient, usuario: Usuario,
+                    rnd: random.Random, anio: int) -> httpx.Response:
+    h = usuario.headers
+    mes = rnd.randint(1, 12)
+    if operacion == "dashboard.resumen_mensual":
+        return await client.get(f"/dashboard/resumen-mensual/{anio}", headers=h)
+    if operacion == "dashboard.gastos_por_categoria":
+        return await client.get(f"/dashboard/gastos-por-categoria/{anio}/{mes}", headers=h)
+    if operacion == "dashboard.ultimas":
+        return await client.get("/transacciones/latest/", headers=h)
+    if operacion == "historial.mes":
+        fin = date(anio, mes, calendar.monthrange(anio, mes)[1])
+        return await client.get("/transacciones/", headers=h, params={
+            "start_date": date(anio, mes, 1).isoformat(), "end_date": fin.isoformat()})
+    if operacion == "historial.pagina":
+        return await client.get("/transacciones/pagina", headers=h, params={"limit": 50})
+    if operacion == "cuentas.listar":
+        return await client.get("/cuentas/", headers=h)
+    if operacion == "transacciones.actualizar" and usuario.creadas:
+        # El esquema valida la coherencia tipo/cuentas, así que se envía la transacción completa.
+        datos = rnd.choice(usuario.creadas)
+        cambios = {k: datos[k] for k in ("fecha", "tipo", "estado", "cuenta_origen_id", "categoria_id")}
+        cambios["valor"] = round(rnd.uniform(5_000, 150_000), 2)
+        cambios["descripcion"] = "Prueba de carga (editada)"
+        return await client.put(f"/transacciones/{datos['id']}", headers=h, json=cambios)
+
+    # transacciones.crear (y actualizar cuando aún no hay nada que editar)
+    resp = await client.post("/transacciones/", headers=h, json=_nuevo_gasto(rnd, usuario, anio))
+    if resp.status_code == 200:
+        usuario.creadas.append(resp.json())
+    return resp
+
+
+async def _una_peticion(operacion, client, usuario, rnd, anio, resultados: Resultados, semaforo):
+    try:
+        inicio = time.perf_counter()
+        try:
+            resp = await _ejecutar(operacion, client, usuario, rnd, anio)
+            error = None if resp.status_code < 400 else str(resp.status_code)
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        resultados.anotar(operacion, time.perf_counter() - inicio, error)
+    finally:
+        semaforo.release()
+
+
+async def correr(args) -> dict:
+    mezcla = _parsear_mezcla(args.mezcla)
+    operaciones, pesos = list(mezcla), list(mezcla.values())
+    rnd = random.Random(args.semilla)
+    limites = httpx.Limits(max_connections=args.concurrencia, max_keepalive_connections=args.concurrencia)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limites) as client:
+        print(f"🔑 Iniciando sesión con {args.usuarios} usuarios sintéticos...")
+        logins = await asyncio.gather(*[
+            _login(client, EMAIL_SINTETICO.format(i), args.password) for i in range(1, args.usuarios + 1)
+        ])
+        usuarios = [u for u in logins if u and u.cuentas and u.categorias_gasto]
+        if not usuarios:
+            raise SystemExit("❌ Ningún usuario pudo iniciar sesión. ¿Generaste los datos sintéticos?")
+
+        print(f"🚀 {args.tasa} peticiones/s, concurrencia {args.concurrencia}, {args.duracion} s "
+              f"con {len(usuarios)} usuarios contra {args.base_url}")
+        resultados = Resultados()
+        semaforo = asyncio.Semaphore(args.concurrencia)
+        tareas = set()
+        intervalo = 1.0 / args.tasa
+        inicio = time.perf_counter()
+        siguiente = inicio
+        while siguiente - inicio < args.duracion:
+            espera = siguiente - time.perf_counter()
+            if espera > 0:
+                await asyncio.sleep(espera)
+            if semaforo.locked():
+                resultados.retrasadas += 1
+            await semaforo.acquire()
+            operacion = rnd.choices(operaciones, pesos)[0]
+            tarea = asyncio.create_task(_una_peticion(
+                operacion, client, rnd.choice(usuarios), rnd, args.anio, resultados, semaforo))
+            tareas.add(tarea)
+            tarea.add_done_callback(tareas.discard)
+            siguiente += intervalo
+        await asyncio.gather(*tareas)
+        duracion_real = time.perf_counter() - inicio
+
+        if not args.conservar:
+            creadas = [(u, t["id"]) for u in usuarios for t in u.creadas]
+            if creadas:
+                print(f"🧹 Borrando {len(creadas)} transacciones creadas por la prueba...")
+                for usuario, transaccion_id in creadas:
+                    await client.delete(f"/transacciones/{transaccion_id}", headers=usuario.headers)
+
+    return _informe(args, resultados, duracion_real, len(usuarios))
+
+
+def _informe(args, resultados: Resultados, duracion: float, usuarios: int) -> dict:
+    endpoints = {}
+    todas: List[float] = []
+    total_errores = 0
+    for operacion in sorted(resultados.latencias):
+        latencias = sorted(resultados.latencias[operacion])
+        todas.extend(latencias)
+        errores = sum(resultados.errores[operacion].values())
+        total_errores += errores
+        endpoints[operacion] = {
+            "peticiones": len(latencias),
+            "errores": errores,
+            "tasa_error": round(errores / len(latencias), 4),
+            "errores_por_tipo": dict(resultados.errores[operacion]),
+            "throughput_rps": round(len(latencias) / duracion, 2),
+            "p50_ms": round(_percentil(latencias, 50) * 1000, 2),
+            "p95_ms": round(_percentil(latencias, 95) * 1000, 2),
+            "p99_ms": round(_percentil(latencias, 99) * 1000, 2),
+            "max_ms": round(latencias[-1] * 1000, 2),
+        }
+    todas.sort()
+    return {
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "base_url": args.base_url,
+        "usuarios": usuarios,
+        "tasa_objetivo": args.tasa,
+        "concurrencia": args.concurrencia,
+        "duracion_s": round(duracion, 2),
+        "total": {
+            "peticiones": len(todas),
+            "errores": total_errores,
+            "tasa_error": round(total_errores / len(todas), 4) if todas else 0.0,
+            "throughput_rps": round(len(todas) / duracion, 2),
+            "retrasadas": resultados.retrasadas,
+            "p50_ms": round(_percentil(todas, 50) * 1000, 2),
+            "p95_ms": round(_percentil(todas, 95) * 1000, 2),
+            "p99_ms": round(_percentil(todas, 99) * 1000, 2),
+        },
+        "endpoints": endpoints,
+    }
+
+
+def imprimir(informe: dict) -> None:
+    print(f"\n{'endpoint':<34}{'peticiones':>11}{'errores':>9}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    filas = list(informe["endpoints"].items()) + [("TOTAL", informe["total"])]
+    for nombre, r in filas:
+        print(f"{nombre:<34}{r['peticiones']:>11}{r['errores']:>9}{r['throughput_rps']:>9.1f}"
+              f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}")
+    total = informe["total"]
+    if total["retrasadas"]:
+        print(f"\n⚠️  {total['retrasadas']} peticiones esperaron por llegar al límite de concurrencia: "
+              f"no se sostuvo la tasa objetivo.")
+    if total["errores"]:
+        print(f"❌ Tasa de error: {total['tasa_error']:.2%}")
+    else:
+        print("✅ Sin errores.")
+
+
+async def main(args) -> None:
+    informe = await correr(args)
+    imprimir(informe)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+        print(f"💾 Informe guardado en {args.salida}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga HTTP con usuarios sintéticos.")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="URL de la API (por defecto http://localhost:8000).")
+    parser.add_argument("--usuarios", type=int, default=10, help="Usuarios sintéticos a usar (por defecto 10).")
+    parser.add_argument("--password", default=PASSWORD_POR_DEFECTO, help="Contraseña de los usuarios sintéticos.")
+    parser.add_argument("--tasa", type=float, default=50, help="Peticiones por segundo objetivo (por defecto 50).")
+    parser.add_argument("--concurrencia", type=int, default=20, help="Máximo de peticiones en curso (por defecto 20).")
+    parser.add_argument("--duracion", type=float, default=30, help="Segundos de prueba (por defecto 30).")
+    parser.add_argument("--mezcla", default=None,
+                        help="Pesos 'operacion=peso,...'. Por defecto: " +
+                             ",".join(f"{k}={v}" for k, v in MEZCLA_POR_DEFECTO.items()))
+    parser.add_argument("--anio", type=int, default=2025, help="Año del dashboard y del historial (por defecto 2025).")
+    parser.add_argument("--timeout", type=float, default=30, help="Timeout de cada petición en segundos.")
+    parser.add_argument("--semilla", type=int, default=1, help="Semilla de la mezcla de peticiones.")
+    parser.add_argument("--conservar", action="store_true", help="No borrar las transacciones creadas.")
+    parser.add_argument("--salida", default=None, help="Guardar el informe en este archivo JSON.")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# backend/scripts/rebuild_balances.py
+"""
+Recalcula el saldo de cada cuenta a partir de sus transacciones confirmadas
+y lo compara con el saldo_actual guardado.
+
+Uso:
+    python scripts/rebuild_balances.py                # solo reporta desviaciones
+    python scripts/rebuild_balances.py --fix          # además las corrige
+    python scripts/rebuild_balances.py --usuario 7    # limita a un usuario
+
+Conviene ejecutarlo con poco tráfico: una transacción registrada mientras
+corre la corrección puede quedar fuera del recálculo.
+"""
+
+import sys, os
+# Asegura que Python encuentre tu carpeta 'backend/'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+
+from app.db.session import async_session
+import app.db.base  # Registra todos los modelos
+import app.crud.crud_cuenta as crud_cuenta
+
+
+async def main(usuario_id: int | None, corregir: bool) -> int:
+    async with async_session() as session:
+        desviaciones = await crud_cuenta.verificar_saldos(
+            session, usuario_id=usuario_id, corregir=corregir
+        )
+
+    if not desviaciones:
+        print("✅ Todos los saldos coinciden con el historial de transacciones.")
+        return 0
+
+    for d in desviaciones:
+        print(
+            f"⚠️ Cuenta {d['cuenta_id']} ({d['nombre']}, usuario {d['usuario_id']}): "
+            f"guardado={d['saldo_guardado']:.2f} calculado={d['saldo_calculado']:.2f} "
+            f"diferencia={d['diferencia']:.2f}"
+        )
+    if corregir:
+        print(f"🔧 {len(desviaciones)} saldo(s) corregido(s).")
+        return 0
+    print(f"❌ {len(desviaciones)} cuenta(s) con desviación. Usa --fix para corregirlas.")
+    return 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifica y reconstruye los saldos de las cuentas.")
+    parser.add_argument("--fix", action="store_true", help="Corrige los saldos con desviación.")
+    parser.add_argument("--usuario", type=int, default=None, help="Limita la verificación a un usuario.")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.usuario, args.fix)))
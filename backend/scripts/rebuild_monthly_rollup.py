@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# backend/scripts/rebuild_monthly_rollup.py
+"""
+Reconstruye la tabla de agregados mensuales (agregados_mensuales) que usa el
+dashboard, a partir de las transacciones confirmadas.
+
+Uso:
+    python scripts/rebuild_monthly_rollup.py              # todos los usuarios
+    python scripts/rebuild_monthly_rollup.py --usuario 7  # un solo usuario
+"""
+
+import sys, os
+# Asegura que Python encuentre tu carpeta 'backend/'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+
+from app.db.session import async_session
+import app.db.base  # Registra todos los modelos
+import app.crud.crud_dashboard as crud_dashboard
+
+
+async def main(usuario_id: int | None):
+    async with async_session() as session:
+        filas = await crud_dashboard.reconstruir_agregados(session, usuario_id=usuario_id)
+    alcance = f"del usuario {usuario_id}" if usuario_id is not None else "de todos los usuarios"
+    print(f"✅ Agregados mensuales {alcance} reconstruidos ({filas} filas).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconstruye la tabla de agregados mensuales del dashboard.")
+    parser.add_argument("--usuario", type=int, default=None, help="Limita la reconstrucción a un usuario.")
+    args = parser.parse_args()
+    asyncio.run(main(args.usuario))
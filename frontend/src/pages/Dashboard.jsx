@@ -28,18 +28,13 @@ function Dashboard() {
   const fetchData = useCallback(async (year, month) => {
     setLoading(true);
     try {
-      const [accRes, catRes, transRes, summaryRes, categoryRes] = await Promise.all([
-        axiosInstance.get('/cuentas/'),
-        axiosInstance.get('/categorias/'),
-        axiosInstance.get('/transacciones/latest/'), // Usamos el nuevo endpoint
-        axiosInstance.get(`/dashboard/resumen-mensual/${year}`),
-        axiosInstance.get(`/dashboard/gastos-por-categoria/${year}/${month}`)
-      ]);
-      setAccounts(accRes.data);
-      setCategories(catRes.data);
-      setTransactions(transRes.data);
-      setSummaryData(summaryRes.data);
-      setCategoryExpenseData(categoryRes.data);
+      // Una sola llamada trae todo lo del dashboard (el backend lanza las consultas en paralelo)
+      const { data } = await axiosInstance.get('/dashboard/bundle', { params: { year, month } });
+      setAccounts(data.cuentas);
+      setCategories(data.categorias);
+      setTransactions(data.ultimas_transacciones);
+      setSummaryData(data.resumen_mensual);
+      setCategoryExpenseData(data.gastos_por_categoria);
     } catch (err) {
       setError('No se pudieron cargar los datos del dashboard.');
     } finally {
@@ -81,27 +81,6 @@ function TransactionsHistory() {
     });
   }, [allTransactions, searchTerm, selectedCategories]);
 
-  const runningBalanceMap = useMemo(() => {
-    const balanceMap = new Map();
-    let currentBalance = startingBalance;
-    
-    [...allTransactions]
-      .sort((a, b) => new Date(a.fecha) - new Date(b.fecha) || a.id - b.id)
-      .forEach(t => {
-        // Se elimina la condición if(t.estado === 'Confirmado')
-        // para que se calcule el saldo para TODAS las transacciones.
-        if (t.tipo === 'Ingreso') {
-          currentBalance += t.valor;
-        } else if (t.tipo === 'Gasto') {
-          currentBalance -= t.valor;
-        }
-        // Las transferencias no afectan el saldo total
-        
-        balanceMap.set(t.id, currentBalance);
-      });
-    return balanceMap;
-  }, [allTransactions, startingBalance]);
-  
   const handleConfirmDelete = async () => {
     if (!transactionToDelete) return;
     try {
@@ -130,7 +109,8 @@ function TransactionsHistory() {
         if (t.tipo === 'Gasto') accountDisplay = t.cuenta_origen?.nombre || 'N/A';
         else if (t.tipo === 'Ingreso') accountDisplay = t.cuenta_destino?.nombre || 'N/A';
         else if (t.tipo === 'Transferencia') accountDisplay = `${t.cuenta_origen?.nombre || '?'} -> ${t.cuenta_destino?.nombre || '?'}`;
-        const balance = runningBalanceMap.get(t.id) || 0;
+        // El saldo acumulado ya viene calculado desde la API
+        const balance = t.saldo_acumulado ?? 0;
         return isMobile ? (
           <Card shadow="sm" padding="lg" radius="md" withBorder key={t.id}>
              <Group justify="space-between" mb="xs">